@@ -5,11 +5,16 @@ from __future__ import annotations
 import json
 import logging
 import re
+import sqlite3
+import uuid
 from typing import Any
 
+from app.config import settings
 from app.models.state import GraphState
 from app.llm.ollama_client import get_chat_model
 from app.tools.db_tools import execute_tool, get_langchain_tools
+from app.tools.write_behind import get_write_behind_queue
+from app.utils.constants import CUSTOM_QUIZ_FORMAT_RE
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -115,7 +120,7 @@ def _run_tool_calling(state: GraphState, db_context: dict[str, Any]) -> dict[str
         {"role": "user", "content": json.dumps(user_payload)},
     ]
 
-    llm = get_chat_model().bind_tools(tools)
+    llm = get_chat_model("db").bind_tools(tools)
     try:
         response = llm.invoke(messages)
     except Exception as exc:
@@ -204,6 +209,13 @@ def _format_tool_error(tool_result: dict[str, Any]) -> str | None:
             return "That request is not supported yet."
         if code == "db_error":
             return "I hit a database error. Please try again."
+        if code == "db_timeout":
+            return "The database is responding slowly right now. Please try again in a moment."
+        if code == "db_write_unconfirmed":
+            return (
+                "The database did not confirm that change in time, so it may or may not be saved. "
+                "Please check before trying again."
+            )
         return error.get("message") or "Something went wrong."
     return None
 
@@ -391,20 +403,35 @@ def _reset_plan_item_context(db_context: dict[str, Any]) -> None:
     db_context.pop("plan_items", None)
 
 
+_QUESTION_COUNT_RE = re.compile(r'\b(?:with\s+)?(\d{1,2})\s+(?:questions?|qs)\b', re.IGNORECASE)
+
+
 def _extract_topic_name(user_input: str) -> str:
-    """Strip common quiz prefixes to get the topic name."""
+    """Strip common quiz prefixes and a question-count phrase to get the topic name."""
     cleaned = re.sub(
         r'^(quiz|test|examine)\s+(me\s+)?(on|about)\s+',
         '', user_input, flags=re.IGNORECASE,
     ).strip()
+    cleaned = _QUESTION_COUNT_RE.sub('', cleaned).strip(' ,')
     return cleaned or user_input
 
 
+def _requested_question_count(user_input: str) -> int | None:
+    match = _QUESTION_COUNT_RE.search(user_input)
+    return int(match.group(1)) if match else None
+
+
 def _handle_quiz_pre_fetch(state: GraphState, db_context: dict[str, Any]) -> dict:
     """Pre-quiz: extract topic, upsert it, fetch previously-wrong questions."""
     user_input = (state.get("user_input") or "").strip()
     topic_name = _extract_topic_name(user_input)
-    result = execute_tool("quiz_pre_fetch", {"topic_name": topic_name}, db_context)
+    args: dict[str, Any] = {"topic_name": topic_name}
+    question_count = _requested_question_count(user_input)
+    if question_count:
+        args["question_count"] = question_count
+    if CUSTOM_QUIZ_FORMAT_RE.search(user_input):
+        args["custom_format"] = True
+    result = execute_tool("quiz_pre_fetch", args, db_context)
     if not result.get("ok"):
         error = _format_tool_error({"results": [{"result": result}]})
         if error:
@@ -413,32 +440,47 @@ def _handle_quiz_pre_fetch(state: GraphState, db_context: dict[str, Any]) -> dic
     db_context["quiz_topic_id"] = data.get("topic_id")
     db_context["quiz_topic_name"] = data.get("topic_name", topic_name)
     db_context["wrong_questions"] = data.get("wrong_questions") or []
+    db_context["bank_quiz"] = data.get("bank_quiz")
     logger.info(
-        "Quiz pre-fetch: topic=%s id=%s wrong_questions=%d",
+        "Quiz pre-fetch: topic=%s id=%s wrong_questions=%d bank_hit=%s",
         db_context.get("quiz_topic_name"),
         db_context.get("quiz_topic_id"),
         len(db_context.get("wrong_questions") or []),
+        db_context["bank_quiz"] is not None,
     )
     return {"db_context": db_context}
 
 
+def _enqueue_quiz_post_save(args: dict[str, Any]) -> str | None:
+    """Queue the save for the write-behind drainer; ``None`` means save inline.
+
+    The job carries a unique ``save_key`` so that retrying it after a timeout
+    whose outcome is unknown cannot store the same attempts twice.
+    """
+    try:
+        get_write_behind_queue().enqueue("quiz_post_save", {**args, "save_key": uuid.uuid4().hex})
+    except (sqlite3.Error, OSError) as exc:
+        logger.warning("Write-behind enqueue failed, saving quiz results inline: %s", exc)
+        return None
+    return "Quiz results recorded."
+
+
 def _handle_quiz_post_save(state: GraphState, db_context: dict[str, Any], quiz_save: dict[str, Any]) -> dict:
     """Post-quiz: persist wrong answers and remove correct retries."""
     db_context.pop("quiz_save", None)
-    result = execute_tool(
-        "quiz_post_save",
-        {
-            "topic_id": quiz_save.get("topic_id"),
-            "wrong_answers": quiz_save.get("wrong_answers") or [],
-            "correct_retries": quiz_save.get("correct_retries") or [],
-        },
-        db_context,
-    )
-    if not result.get("ok"):
-        error = _format_tool_error({"results": [{"result": result}]})
-        if error:
-            return {"user_response": error, "specialist_output": error, "db_context": db_context}
-    confirmation = _format_tool_result_confirmation({"results": [{"name": "quiz_post_save", "result": result}]})
+    args = {
+        "topic_id": quiz_save.get("topic_id"),
+        "wrong_answers": quiz_save.get("wrong_answers") or [],
+        "correct_retries": quiz_save.get("correct_retries") or [],
+    }
+    confirmation = _enqueue_quiz_post_save(args) if settings.quiz_write_behind else None
+    if confirmation is None:
+        result = execute_tool("quiz_post_save", args, db_context)
+        if not result.get("ok"):
+            error = _format_tool_error({"results": [{"result": result}]})
+            if error:
+                return {"user_response": error, "specialist_output": error, "db_context": db_context}
+        confirmation = _format_tool_result_confirmation({"results": [{"name": "quiz_post_save", "result": result}]})
     feedback = state.get("quiz_feedback")
     if feedback and confirmation:
         message = f"{feedback}\n\n{confirmation}"
@@ -7,13 +7,13 @@ from app.llm.ollama_client import get_chat_model
 from app.models.state import GraphState
 from app.prompts.planner import PLANNER_SYSTEM_PROMPT, PLANNER_USER_PROMPT
 from app.schemas.planner import PlannerOutput
-from app.utils.llm_helpers import invoke_llm
-from app.utils.llm_parse import parse_with_retry
+from app.utils.llm_helpers import async_invoke_llm
+from app.utils.llm_parse import async_parse_with_retry
 
 logger = logging.getLogger("uvicorn.error")
 
 
-def planner_node(state: GraphState) -> dict:
+async def planner_node(state: GraphState) -> dict:
     """Generate a study plan based on the user's learning goal.
 
     Populates: specialist_output.
@@ -41,19 +41,19 @@ def planner_node(state: GraphState) -> dict:
         db_context=json.dumps(db_context, ensure_ascii=False),
     )
 
-    llm = get_chat_model()
+    llm = get_chat_model("planner", output_schema=PlannerOutput)
     logger.info("Planner LLM call started")
-    content = invoke_llm(prompt, llm)
+    content = await async_invoke_llm(prompt, llm)
     logger.info("Planner LLM call finished")
 
-    def _retry(raw: str) -> str:
+    async def _retry(raw: str) -> str:
         fix_prompt = (
             "Fix the JSON to match the required schema. Output ONLY JSON."
             f"\nRaw: {raw}"
         )
-        return invoke_llm(fix_prompt, llm)
+        return await async_invoke_llm(fix_prompt, llm)
 
-    parsed = parse_with_retry(content, PlannerOutput, _retry)
+    parsed = await async_parse_with_retry(content, PlannerOutput, _retry)
 
     user_response = parsed.user_response
     plan_draft = parsed.plan_draft.model_dump()
@@ -1,31 +1,40 @@
 """Quiz agent node — generates and evaluates quizzes."""
 
+import json
 import logging
 import re
 from typing import Any
 
+from pydantic import ValidationError
+
+from app.config import settings
 from app.llm.ollama_client import get_chat_model
 from app.models.state import GraphState
 from app.prompts.quiz import (
     QUIZ_EVALUATE_SYSTEM_PROMPT,
     QUIZ_EVALUATE_USER_PROMPT,
+    QUIZ_GENERATE_JSON_SYSTEM_PROMPT,
     QUIZ_GENERATE_SYSTEM_PROMPT,
     QUIZ_GENERATE_USER_PROMPT,
     QUIZ_RAG_RELEVANCE_SYSTEM_PROMPT,
     QUIZ_RAG_RELEVANCE_USER_PROMPT,
 )
+from app.quiz_bank.bank import parse_bank_quiz
+from app.schemas.quiz import QuizOutput
 from app.utils.constants import (
+    CUSTOM_QUIZ_FORMAT_RE,
     LINE_START_ANSWER_RE,
     MIN_KEYWORD_OVERLAP,
     NUMBERED_ANSWER_RE,
     STOPWORDS,
 )
-from app.utils.llm_helpers import invoke_llm
+from app.utils.llm_helpers import async_invoke_llm
+from app.utils.llm_parse import parse_json_with_schema
 
 logger = logging.getLogger("uvicorn.error")
 
 
-def quiz_node(state: GraphState) -> dict:
+async def quiz_node(state: GraphState) -> dict:
     """Generate quiz questions or evaluate a quiz answer.
 
     Populates: specialist_output.
@@ -43,7 +52,7 @@ def quiz_node(state: GraphState) -> dict:
     db_context = state.get("db_context") or {}
     rag_context = state.get("rag_context", "")
 
-    evaluation_result = _handle_evaluation(user_input)
+    evaluation_result = await _handle_evaluation(user_input)
     if evaluation_result is not None:
         return evaluation_result
 
@@ -64,18 +73,24 @@ def quiz_node(state: GraphState) -> dict:
     if answer_key and user_answers:
         return _handle_scoring(quiz_state, answer_key, user_answers, db_context)
 
+    bank_quiz = parse_bank_quiz(db_context.pop("bank_quiz", None) or {})
+    if bank_quiz is not None:
+        return _serve_bank_quiz(bank_quiz, db_context)
+
     wrong_questions_raw = db_context.get("wrong_questions") or []
     wrong_questions_text = _format_wrong_questions(wrong_questions_raw)
     topic_name = db_context.get("quiz_topic_name")
 
-    rag_context = _check_rag_relevance(rag_context, topic_name, user_input)
+    rag_context = await _check_rag_relevance(
+        rag_context, topic_name, user_input, state.get("rag_similarity"),
+    )
 
-    return _generate_quiz(
+    return await _generate_quiz(
         user_input, rag_context, wrong_questions_text, db_context, wrong_questions_raw,
     )
 
 
-def _handle_evaluation(user_input: str) -> dict | None:
+async def _handle_evaluation(user_input: str) -> dict | None:
     """Check for evaluation payload, invoke LLM, return result."""
     evaluation = _extract_evaluation_payload(user_input)
     if not evaluation:
@@ -86,7 +101,7 @@ def _handle_evaluation(user_input: str) -> dict | None:
         user_answer=evaluation["user_answer"],
     )
     logger.info("Quiz evaluation LLM call started")
-    content = invoke_llm(prompt)
+    content = await async_invoke_llm(prompt)
     logger.info("Quiz evaluation LLM call finished")
     logger.info("quiz_node: next_action=format_response (evaluation)")
     return {
@@ -159,13 +174,17 @@ def _handle_scoring(
     }
 
 
-def _check_rag_relevance(rag_context: str, topic_name: str | None, user_input: str) -> str:
-    """Two-pass relevance filter: fast substring match, then LLM judgment.
+async def _check_rag_relevance(
+    rag_context: str, topic_name: str | None, user_input: str, similarity: float | None = None,
+) -> str:
+    """Relevance filter: substring match, embedding similarity, then LLM judgment.
 
     First checks if the topic name appears directly in the RAG context (fast path).
-    If not found, asks the LLM to judge whether the context is relevant to the
-    user's quiz request. Returns the original rag_context if relevant, or empty
-    string if not.
+    Otherwise the query/chunk cosine similarity computed by the retriever is
+    compared with ``rag_relevance_threshold``. The LLM is only asked to judge
+    relevance for borderline scores when ``rag_relevance_llm_check`` is on, or
+    when no similarity score is available. Returns the original rag_context if
+    relevant, or empty string if not.
     """
     if not rag_context.strip():
         return rag_context
@@ -173,6 +192,14 @@ def _check_rag_relevance(rag_context: str, topic_name: str | None, user_input: s
     if topic_hint and topic_hint in rag_context.lower():
         logger.info("quiz_node: rag_context kept (topic match)")
         return rag_context
+    if similarity is not None:
+        if similarity >= settings.rag_relevance_threshold:
+            logger.info("quiz_node: rag_context kept (similarity=%.3f)", similarity)
+            return rag_context
+        borderline = similarity >= settings.rag_relevance_borderline
+        if not (borderline and settings.rag_relevance_llm_check):
+            logger.info("quiz_node: rag_context dropped (similarity=%.3f)", similarity)
+            return ""
     relevance_prompt = (
         QUIZ_RAG_RELEVANCE_SYSTEM_PROMPT
         + "\n\n"
@@ -182,7 +209,8 @@ def _check_rag_relevance(rag_context: str, topic_name: str | None, user_input: s
         )
     )
     logger.info("Quiz RAG relevance check started")
-    relevance = invoke_llm(relevance_prompt).upper()
+    # Short deterministic classification: the router profile fits and is cacheable.
+    relevance = (await async_invoke_llm(relevance_prompt, get_chat_model("router"))).upper()
     logger.info("Quiz RAG relevance check finished")
     if not relevance.startswith("YES"):
         logger.info("quiz_node: rag_context dropped (relevance=%s)", relevance)
@@ -191,33 +219,46 @@ def _check_rag_relevance(rag_context: str, topic_name: str | None, user_input: s
     return rag_context
 
 
-def _generate_quiz(
+async def _generate_quiz(
     user_input: str,
     rag_context: str,
     wrong_questions_text: str,
     db_context: dict[str, Any],
     wrong_questions_raw: list[dict[str, Any]],
 ) -> dict:
-    """Generate quiz, extract/retry answer key."""
-    prompt = QUIZ_GENERATE_SYSTEM_PROMPT + "\n\n" + QUIZ_GENERATE_USER_PROMPT.format(
+    """Generate quiz, extract/retry answer key.
+
+    With ``quiz_structured_output`` a plain multiple-choice request gets a
+    ``QuizOutput`` JSON document in one call and the display text and answer
+    key are rendered from it. Interview, open-ended and other custom formats
+    use the free-text prompt, as do the regex extraction and LLM recovery
+    retries when the model answers in that format.
+    """
+    user_prompt = QUIZ_GENERATE_USER_PROMPT.format(
         user_input=user_input,
         rag_context=rag_context,
         wrong_questions=wrong_questions_text,
     )
-    llm = get_chat_model()
+    use_schema = settings.quiz_structured_output and not CUSTOM_QUIZ_FORMAT_RE.search(user_input)
+    if use_schema:
+        llm = get_chat_model("quiz", output_schema=QuizOutput)
+        prompt = QUIZ_GENERATE_JSON_SYSTEM_PROMPT + "\n\n" + user_prompt
+    else:
+        llm = get_chat_model("quiz")
+        prompt = QUIZ_GENERATE_SYSTEM_PROMPT + "\n\n" + user_prompt
     logger.info("Quiz generation LLM call started")
-    content = invoke_llm(prompt, llm)
+    # Fresh questions on every request, so never served from the response cache.
+    content = await async_invoke_llm(prompt, llm, cache=False)
     logger.info("Quiz generation LLM call finished")
-    generated_answer_key = _extract_answer_key(content)
-    question_count = _count_questions(content)
-    # Two-stage answer key recovery:
-    # 1. Ask the LLM to produce just the answer key for the generated quiz.
-    if not generated_answer_key or (question_count and len(generated_answer_key) != question_count):
-        content, generated_answer_key = _retry_append_answer_key(llm, content, question_count)
-    # 2. If still mismatched, regenerate the entire quiz as MCQ-only with a strict format.
-    if question_count and len(generated_answer_key) != question_count:
-        content, generated_answer_key = _retry_regenerate_mcq_only(llm, user_input, question_count, rag_context)
-        question_count = _count_questions(content)
+    structured = _parse_structured_quiz(content) if use_schema else None
+    if structured is not None:
+        content, generated_answer_key = _render_structured_quiz(structured)
+        question_count = len(generated_answer_key)
+    else:
+        # Recovery prompts expect free text, so use the unconstrained model.
+        content, generated_answer_key, question_count = await _recover_legacy_quiz(
+            get_chat_model("quiz"), content, user_input, rag_context,
+        )
     display_text = _strip_answer_key(content)
 
     # Track which generated questions correspond to retry attempt_ids
@@ -242,6 +283,72 @@ def _generate_quiz(
     }
 
 
+def _serve_bank_quiz(quiz: QuizOutput, db_context: dict[str, Any]) -> dict:
+    """Serve a pre-generated quiz from the bank without any LLM call."""
+    display_text, answer_key = _render_structured_quiz(quiz)
+    quiz_state_update = {
+        "answer_key": answer_key,
+        "quiz_text": display_text,
+        "question_count": len(answer_key),
+        "topic_id": db_context.get("quiz_topic_id"),
+        "topic_name": db_context.get("quiz_topic_name"),
+        "retry_attempt_ids": {},
+    }
+    logger.info("quiz_node: next_action=format_response (quiz bank)")
+    return {
+        "user_response": display_text,
+        "specialist_output": display_text,
+        "quiz_state": quiz_state_update,
+        "db_context": db_context,
+        "quiz_next_action": "format_response",
+    }
+
+
+async def _recover_legacy_quiz(
+    llm, content: str, user_input: str, rag_context: str,
+) -> tuple[str, dict[int, str], int]:
+    """Extract the answer key from free-text quiz output, retrying via the LLM."""
+    if content.lstrip().startswith("{"):
+        # Schema-constrained JSON that failed validation; regex extraction
+        # cannot recover it, so regenerate as strict free text.
+        logger.info("quiz_node: structured quiz invalid, regenerating as text")
+        content, answer_key = await _retry_regenerate_mcq_only(llm, user_input, None, rag_context)
+        return content, answer_key, _count_questions(content)
+    generated_answer_key = _extract_answer_key(content)
+    question_count = _count_questions(content)
+    # Two-stage answer key recovery:
+    # 1. Ask the LLM to produce just the answer key for the generated quiz.
+    if not generated_answer_key or (question_count and len(generated_answer_key) != question_count):
+        content, generated_answer_key = await _retry_append_answer_key(llm, content, question_count)
+    # 2. If still mismatched, regenerate the entire quiz as MCQ-only with a strict format.
+    if question_count and len(generated_answer_key) != question_count:
+        content, generated_answer_key = await _retry_regenerate_mcq_only(llm, user_input, question_count, rag_context)
+        question_count = _count_questions(content)
+    return content, generated_answer_key, question_count
+
+
+def _parse_structured_quiz(content: str) -> QuizOutput | None:
+    try:
+        return parse_json_with_schema(content, QuizOutput)
+    except (json.JSONDecodeError, ValidationError):
+        return None
+
+
+def _render_structured_quiz(quiz: QuizOutput) -> tuple[str, dict[int, str]]:
+    """Render numbered question text and its answer key from a typed quiz."""
+    blocks: list[str] = []
+    answer_key: dict[int, str] = {}
+    for number, item in enumerate(quiz.questions, 1):
+        lines = [f"{number}. {item.question.strip()}"]
+        for letter, option in zip("ABCD", item.options):
+            # Models sometimes keep their own "A) " prefix despite instructions.
+            option = re.sub(r"^\s*[A-D]\s*[\).:]\s*", "", option.strip())
+            lines.append(f"{letter}) {option}")
+        blocks.append("\n".join(lines))
+        answer_key[number] = item.answer
+    return "\n\n".join(blocks), answer_key
+
+
 def _extract_evaluation_payload(text: str) -> dict[str, Any] | None:
     question = None
     correct_answer = None
@@ -362,7 +469,7 @@ def _strip_answer_key(text: str) -> str:
     return "\n".join(cleaned).strip()
 
 
-def _retry_append_answer_key(llm, quiz_text: str, question_count: int | None) -> tuple[str, dict[int, str]]:
+async def _retry_append_answer_key(llm, quiz_text: str, question_count: int | None) -> tuple[str, dict[int, str]]:
     key_example = "Answer key: 1:A, 2:B"
     if question_count and question_count > 2:
         pairs = [f"{i}:A" for i in range(1, question_count + 1)]
@@ -374,7 +481,7 @@ def _retry_append_answer_key(llm, quiz_text: str, question_count: int | None) ->
         f"{quiz_text}"
     )
     logger.info("Quiz answer key retry LLM call started")
-    key_text = invoke_llm(prompt, llm)
+    key_text = await async_invoke_llm(prompt, llm)
     logger.info("Quiz answer key retry LLM call finished")
     answer_key = _extract_answer_key(key_text)
     if answer_key:
@@ -384,7 +491,7 @@ def _retry_append_answer_key(llm, quiz_text: str, question_count: int | None) ->
     return quiz_text, {}
 
 
-def _retry_regenerate_mcq_only(llm, user_input: str, question_count: int | None, rag_context: str = "") -> tuple[str, dict[int, str]]:
+async def _retry_regenerate_mcq_only(llm, user_input: str, question_count: int | None, rag_context: str = "") -> tuple[str, dict[int, str]]:
     count_hint = f"{question_count}" if question_count else "the requested"
     context_block = f"\n\nKnowledge base context:\n{rag_context}" if rag_context.strip() else ""
     prompt = (
@@ -399,7 +506,7 @@ def _retry_regenerate_mcq_only(llm, user_input: str, question_count: int | None,
         f"{context_block}"
     )
     logger.info("Quiz regeneration LLM call started")
-    quiz_text = invoke_llm(prompt, llm)
+    quiz_text = await async_invoke_llm(prompt, llm, cache=False)
     logger.info("Quiz regeneration LLM call finished")
     answer_key = _extract_answer_key(quiz_text)
     return quiz_text, answer_key
@@ -6,17 +6,19 @@ from app.llm.ollama_client import get_chat_model
 from app.models.state import GraphState
 from app.prompts.router import ROUTER_SYSTEM_PROMPT, ROUTER_USER_PROMPT
 from app.schemas.router import RouterOutput
+from app.tools.retrieve_context import start_speculative_retrieval
 from app.utils.constants import HAS_QUIZ_ANSWERS_RE
-from app.utils.llm_helpers import invoke_llm
-from app.utils.llm_parse import parse_with_retry
+from app.utils.llm_helpers import async_invoke_llm
+from app.utils.llm_parse import async_parse_with_retry
 
 logger = logging.getLogger("uvicorn.error")
 
 
-def router_node(state: GraphState) -> dict:
+async def router_node(state: GraphState) -> dict:
     """Classify the user message and decide which tools/agents are needed.
 
-    Populates: intent, needs_rag, needs_web, needs_db.
+    Populates: intent, needs_rag, needs_web, needs_db (and speculative_rag
+    when speculative retrieval is enabled and the turn needs RAG).
     """
     user_input = state.get("user_input", "")
     # Fast-path: if we have a pending quiz and the user answered with numbered choices,
@@ -32,18 +34,19 @@ def router_node(state: GraphState) -> dict:
             "plan_confirmed": False,
             "db_context": state.get("db_context") or {},
         }
+    speculation = start_speculative_retrieval(state)
     plan_draft_present = bool(state.get("plan_draft"))
     prompt = ROUTER_SYSTEM_PROMPT + "\n\n" + ROUTER_USER_PROMPT.format(
         user_input=user_input,
         last_intent=state.get("last_intent"),
         plan_draft_present=plan_draft_present,
     )
-    llm = get_chat_model()
+    llm = get_chat_model("router", output_schema=RouterOutput)
     logger.info("Router LLM call started")
-    content = invoke_llm(prompt, llm)
+    content = await async_invoke_llm(prompt, llm)
     logger.info("Router LLM call finished")
 
-    def _retry(raw: str) -> str:
+    async def _retry(raw: str) -> str:
         fix_prompt = (
             "Fix the JSON to match this exact schema and keys. Output ONLY JSON.\n"
             "Required keys: intent, sub_intent, needs_rag, needs_web, needs_db, plan_title, item_title.\n"
@@ -53,10 +56,10 @@ def router_node(state: GraphState) -> dict:
             '{"intent":"REVIEW","sub_intent":"LIST_ITEMS","needs_rag":false,"needs_web":false,"needs_db":true,"plan_title":"Learning Plan for HTML","item_title":null}\n'
             f"Raw: {raw}"
         )
-        return invoke_llm(fix_prompt, llm)
+        return await async_invoke_llm(fix_prompt, llm)
 
     try:
-        parsed = parse_with_retry(content, RouterOutput, _retry)
+        parsed = await async_parse_with_retry(content, RouterOutput, _retry)
     except ValueError as exc:
         logger.error("Router parse failed, falling back to defaults: %s", exc)
         parsed = RouterOutput(
@@ -104,4 +107,8 @@ def router_node(state: GraphState) -> dict:
         "db_context": db_context,
     }
     logger.info("Router final output: %s", final)
+    if speculation is not None and not parsed.needs_rag:
+        speculation.discard()
+        speculation = None
+    final["speculative_rag"] = speculation
     return final
@@ -8,12 +8,13 @@ from app.prompts.tutor import (
     GENERAL_TUTOR_SYSTEM_PROMPT,
 )
 from app.models.state import GraphState
-from app.utils.llm_helpers import invoke_llm
+from app.llm.ollama_client import get_chat_model
+from app.utils.llm_helpers import async_invoke_llm
 
 logger = logging.getLogger("uvicorn.error")
 
 
-def tutor_node(state: GraphState) -> dict:
+async def tutor_node(state: GraphState) -> dict:
     """Answer the user's question using retrieved RAG context.
 
     Populates: specialist_output.
@@ -40,5 +41,5 @@ def tutor_node(state: GraphState) -> dict:
             user_input=user_input,
             rag_context="",
         )
-    content = invoke_llm(prompt)
+    content = await async_invoke_llm(prompt, get_chat_model("tutor"))
     return {"user_response": content, "specialist_output": content}
@@ -1,8 +1,33 @@
 """Application configuration loaded from environment variables."""
 
+from typing import Any
+
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings
 
 
+class ModelProfile(BaseModel):
+    """Per-call-site model options; ``None`` fields inherit the Ollama defaults."""
+
+    model: str | None = None
+    num_ctx: int | None = None
+    num_predict: int | None = None
+    temperature: float | None = None
+    keep_alive: str | None = None
+
+
+def _default_model_profiles() -> dict[str, ModelProfile]:
+    return {
+        # Short JSON classification: cap output and keep it deterministic.
+        "router": ModelProfile(num_predict=256, temperature=0.0),
+        "planner": ModelProfile(),
+        # Quiz prompts carry RAG context and past wrong answers.
+        "quiz": ModelProfile(num_ctx=8192),
+        "tutor": ModelProfile(),
+        "db": ModelProfile(temperature=0.0),
+    }
+
+
 class Settings(BaseSettings):
     """Type-safe configuration sourced from .env / environment."""
 
@@ -11,9 +36,31 @@ class Settings(BaseSettings):
     ollama_model: str = "llama3.2"
     ollama_embed_model: str = "nomic-embed-text"
     ollama_timeout_seconds: int = 30
+    ollama_max_keepalive_connections: int = 20
+    ollama_keepalive_expiry_seconds: float = 300.0
+    # Named profiles resolved by get_chat_model(profile); set as JSON, e.g.
+    # OLLAMA_PROFILES='{"router": {"model": "llama3.2:1b", "num_predict": 128}}'
+    # Fields given here are merged over the defaults of the same profile.
+    ollama_profiles: dict[str, ModelProfile] = Field(default_factory=_default_model_profiles)
+    # Send Pydantic JSON schemas as Ollama's `format` (needs Ollama >= 0.5).
+    llm_structured_output: bool = True
+    quiz_structured_output: bool = True
     chat_timeout_seconds: int = 30
     db_tool_timeout_seconds: int = 4
 
+    # Chat admission control
+    chat_max_in_flight: int = 4
+    chat_max_queue: int = 16
+    chat_queue_timeout_seconds: float = 10.0
+    chat_retry_after_seconds: int = 5
+
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 2048
+    llm_cache_ttl_seconds: int = 3600
+    llm_cache_sqlite_path: str = ""  # empty = memory tier only
+    llm_cache_sqlite_max_entries: int = 100_000
+
     # PostgreSQL
     pg_host: str = "localhost"
     pg_port: int = 5433
@@ -22,6 +69,15 @@ class Settings(BaseSettings):
     pg_password: str = "postgres"
     pg_pool_min: int = 1
     pg_pool_max: int = 5
+    pg_pool_timeout_seconds: float = 5.0
+    pg_pool_max_age_seconds: float = 1800.0
+    pg_pool_ping_after_seconds: float = 30.0
+
+    # Session state
+    session_store_backend: str = "memory"  # memory | postgres
+    session_max_entries: int = 10_000
+    session_ttl_seconds: int = 86_400
+    session_max_bytes: int = 64 * 1024 * 1024
 
     # Database backend
     db_backend: str = "mcp"  # mcp | psycopg2
@@ -36,10 +92,52 @@ class Settings(BaseSettings):
     mcp_params_key: str = "params"
     mcp_supports_params: bool = False
     mcp_fallback_to_psycopg2: bool = True
+    # Launch an npx-installed server binary directly instead of `npx --yes` on
+    # every boot; the resolved path is cached here.
+    mcp_resolve_binary: bool = True
+    mcp_binary_cache_path: str = "./data/mcp_server_binary.json"
+    # Deadline for one background startup attempt before it is retried.
+    mcp_start_timeout_seconds: float = 60.0
+    # Parallel pg-mcp-server processes; size it to CHAT_MAX_IN_FLIGHT for full DB concurrency.
+    mcp_pool_size: int = 2
+    mcp_session_max_failures: int = 3
+    # Supervision: ping idle sessions, restart dead ones with exponential backoff,
+    # and replay reads that were in flight on a dead session.
+    mcp_supervisor_interval_seconds: float = 10.0
+    mcp_restart_backoff_seconds: float = 1.0
+    mcp_restart_backoff_max_seconds: float = 60.0
+    mcp_replay_wait_seconds: float = 5.0
+    # Circuit breaker: route to psycopg2 after N consecutive failed/slow MCP calls.
+    mcp_breaker_failure_threshold: int = 3
+    mcp_breaker_slow_call_seconds: float = 2.0
+    mcp_breaker_probe_interval_seconds: float = 5.0
 
     # ChromaDB
     chroma_persist_dir: str = "./chroma_data"
     chroma_collection: str = "knowledge_base"
+    # Quiz RAG relevance gate: keep context at/above the threshold. With the
+    # LLM check enabled, scores in [borderline, threshold) are judged by the LLM.
+    rag_relevance_threshold: float = 0.55
+    rag_relevance_borderline: float = 0.45
+    rag_relevance_llm_check: bool = False
+    # Start retrieval at graph entry, in parallel with the router LLM call.
+    rag_speculative_retrieval: bool = False
+
+    # Quiz bank (pre-generated quizzes, refilled by a background worker)
+    quiz_bank_enabled: bool = False
+    quiz_bank_target_per_topic: int = 2
+    quiz_bank_max_topics: int = 10
+    quiz_bank_max_age_seconds: int = 7 * 86_400
+    quiz_bank_refill_interval_seconds: int = 300
+    quiz_bank_include_kb_sections: bool = True
+
+    # Quiz result write-behind (durable local outbox drained in the background)
+    quiz_write_behind: bool = False
+    write_behind_path: str = "./data/write_behind.sqlite"
+    write_behind_batch_size: int = 20
+    write_behind_max_attempts: int = 8
+    write_behind_poll_seconds: float = 1.0
+    write_behind_flush_timeout_seconds: float = 10.0
 
     # Tavily
     tavily_api_key: str = ""
@@ -47,6 +145,25 @@ class Settings(BaseSettings):
     # Knowledge Base
     kb_dir: str = "./kb"
 
+    @field_validator("ollama_profiles", mode="before")
+    @classmethod
+    def _merge_profile_defaults(cls, value: Any) -> Any:
+        """Layer user-supplied profile fields over the built-in profiles."""
+        if not isinstance(value, dict):
+            return value
+        merged = {name: profile.model_dump(exclude_unset=True) for name, profile in _default_model_profiles().items()}
+        for name, override in value.items():
+            if isinstance(override, ModelProfile):
+                override = override.model_dump(exclude_unset=True)
+            if not isinstance(override, dict):
+                return value  # let field validation report the bad entry
+            merged[name] = {**merged.get(name, {}), **override}
+        return merged
+
+    def model_profile(self, name: str) -> ModelProfile:
+        """Return the named profile, or an all-defaults profile if unknown."""
+        return self.ollama_profiles.get(name) or ModelProfile()
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
@@ -0,0 +1,173 @@
+"""Circuit breaker routing DB traffic away from a failing MCP backend."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.mcp.pool import is_transport_failure
+
+logger = logging.getLogger("uvicorn.error")
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    """Trip after consecutive failed or slow calls; close again on a good probe.
+
+    While the breaker is open, callers are expected to use the fallback
+    backend. No trial traffic is sent to the failing backend; instead
+    :meth:`start` runs a background loop that awaits *probe* every
+    ``probe_interval_seconds`` while open and closes the breaker on the first
+    success.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        slow_call_seconds: float = 2.0,
+        probe_interval_seconds: float = 5.0,
+        probe: Callable[[], Awaitable[bool]] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._slow_call_seconds = slow_call_seconds
+        self._probe_interval_seconds = probe_interval_seconds
+        self._probe = probe
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._transitions: Counter[str] = Counter()
+        self._counters = {
+            "calls": 0,
+            "failures": 0,
+            "slow_calls": 0,
+            "short_circuited": 0,
+            "probes": 0,
+            "probe_failures": 0,
+        }
+        self._task: asyncio.Task | None = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Return whether the guarded backend should be used for this call."""
+        with self._lock:
+            if self._state == OPEN:
+                self._counters["short_circuited"] += 1
+                return False
+            return True
+
+    def record(self, seconds: float, *, ok: bool) -> None:
+        """Record one guarded call; slow successes count as failures."""
+        slow = ok and seconds >= self._slow_call_seconds
+        with self._lock:
+            self._counters["calls"] += 1
+            if slow:
+                self._counters["slow_calls"] += 1
+            if ok and not slow:
+                self._consecutive_failures = 0
+                return
+            if not ok:
+                self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == CLOSED and self._consecutive_failures >= self._failure_threshold:
+                self._transition(OPEN)
+
+    async def probe_once(self) -> bool:
+        """Run the probe if the breaker is open; close it when the probe succeeds."""
+        if self._state != OPEN or self._probe is None:
+            return False
+        try:
+            healthy = await self._probe()
+        except Exception as exc:
+            logger.info("MCP breaker probe failed: %s", exc, exc_info=True)
+            healthy = False
+        with self._lock:
+            self._counters["probes"] += 1
+            if not healthy:
+                self._counters["probe_failures"] += 1
+            elif self._state == OPEN:
+                self._transition(CLOSED)
+        return healthy
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="mcp-breaker-probe")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "open_seconds": round(self._clock() - self._opened_at, 1) if self._opened_at else None,
+                "transitions": dict(self._transitions),
+                **self._counters,
+            }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._probe_interval_seconds)
+            await self.probe_once()
+
+    def _transition(self, state: str) -> None:
+        # Caller holds self._lock.
+        self._transitions[f"{self._state}->{state}"] += 1
+        logger.warning("MCP circuit breaker %s -> %s", self._state, state)
+        self._state = state
+        self._consecutive_failures = 0
+        self._opened_at = self._clock() if state == OPEN else None
+
+
+class BreakerGuardedClient:
+    """MCP client wrapper that reports every call's outcome to a breaker.
+
+    Only transport failures and timeouts (``is_transport_failure``) count as
+    failed calls. An SQL error or a write rejected by the server is a
+    prompt answer from a working backend, so it is recorded like a success
+    (still subject to the slow-call check) and re-raised.
+    """
+
+    def __init__(self, client, breaker: CircuitBreaker) -> None:
+        self._client = client
+        self._breaker = breaker
+
+    def query(self, sql: str, params: list[Any] | None = None) -> Any:
+        started = time.monotonic()
+        try:
+            result = self._client.query(sql, params)
+        except Exception as exc:
+            self._breaker.record(time.monotonic() - started, ok=not is_transport_failure(exc))
+            raise
+        self._breaker.record(time.monotonic() - started, ok=True)
+        return result
+
+    async def async_query(self, sql: str, params: list[Any] | None = None) -> Any:
+        started = time.monotonic()
+        try:
+            result = await self._client.async_query(sql, params)
+        except Exception as exc:
+            self._breaker.record(time.monotonic() - started, ok=not is_transport_failure(exc))
+            raise
+        self._breaker.record(time.monotonic() - started, ok=True)
+        return result
@@ -1,37 +1,248 @@
 """PostgreSQL connection pool using psycopg2."""
 
-from psycopg2.pool import SimpleConnectionPool
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 
 from app.config import settings
+from app.db.errors import DBTimeoutError
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class PoolTimeout(DBTimeoutError):
+    """No connection became available within the checkout timeout."""
+
+
+class BlockingConnectionPool:
+    """Thread-safe psycopg2 pool that waits for a free connection.
+
+    Unlike ``SimpleConnectionPool`` (not safe across threads, raises as soon
+    as it is exhausted), checkouts block on a condition variable for up to
+    ``timeout`` seconds and then raise :class:`PoolTimeout`. On checkout a
+    connection is recycled once older than ``max_age_seconds``, and pinged
+    with ``SELECT 1`` when it has been idle longer than ``ping_after_seconds``
+    so a connection dropped by the server is replaced instead of handed out.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        connect: Callable[[], Any],
+        *,
+        timeout: float = 5.0,
+        max_age_seconds: float = 1800.0,
+        ping_after_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._maxconn = maxconn
+        self._connect = connect
+        self._timeout = timeout
+        self._max_age_seconds = max_age_seconds
+        self._ping_after_seconds = ping_after_seconds
+        self._clock = clock
+        self._cond = threading.Condition()
+        # Idle connections as (conn, created_at, returned_at); LIFO keeps the
+        # warmest connections in use and lets the rest age out.
+        self._idle: deque[tuple[Any, float, float]] = deque()
+        self._created_at: dict[int, float] = {}
+        self._size = 0
+        self._waiting = 0
+        self._counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        for _ in range(minconn):
+            conn = self._open()
+            self._idle.append((conn, self._created_at[id(conn)], self._clock()))
+            self._size += 1
+
+    def getconn(self, timeout: float | None = None):
+        """Check out a healthy connection, waiting up to *timeout* seconds."""
+        timeout = self._timeout if timeout is None else timeout
+        started = self._clock()
+        deadline = started + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self._maxconn:
+                    self._size += 1
+                    entry = None
+                    break
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"no connection available within {timeout:.1f}s "
+                        f"(pool size {self._maxconn})"
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._counters["checkouts"] += 1
+            if waited:
+                elapsed = self._clock() - started
+                self._counters["waits"] += 1
+                self._wait_total += elapsed
+                self._wait_max = max(self._wait_max, elapsed)
+        try:
+            return self._open() if entry is None else self._validate(*entry)
+        except BaseException:
+            self._discard_slot()
+            raise
 
-_pool: SimpleConnectionPool | None = None
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return *conn*; broken or mid-transaction connections are closed."""
+        if not close and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                close = True
+        if close or conn.closed:
+            self._close(conn)
+            self._discard_slot()
+            return
+        with self._cond:
+            self._idle.append((conn, self._created_at.get(id(conn), self._clock()), self._clock()))
+            self._cond.notify()
 
+    def closeall(self) -> None:
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _created, _returned in idle:
+            self._close(conn)
 
-def get_pool() -> SimpleConnectionPool:
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            in_use = self._size - len(self._idle)
+            waits = self._counters["waits"]
+            return {
+                **self._counters,
+                "size": self._size,
+                "max_size": self._maxconn,
+                "in_use": in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "utilization": round(in_use / self._maxconn, 3) if self._maxconn else None,
+                "wait_avg_ms": round(self._wait_total / waits * 1000, 1) if waits else None,
+                "wait_max_ms": round(self._wait_max * 1000, 1),
+            }
+
+    def _validate(self, conn, created_at: float, returned_at: float):
+        now = self._clock()
+        if now - created_at >= self._max_age_seconds:
+            self._count("recycled")
+            self._close(conn)
+            return self._open()
+        if conn.closed or (now - returned_at >= self._ping_after_seconds and not self._ping(conn)):
+            self._count("health_check_failures")
+            self._close(conn)
+            return self._open()
+        return conn
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error as exc:
+            logger.warning("Discarding pooled PostgreSQL connection: %s", exc)
+            return False
+
+    def _open(self):
+        conn = self._connect()
+        with self._cond:
+            self._created_at[id(conn)] = self._clock()
+            self._counters["created"] += 1
+        return conn
+
+    def _close(self, conn) -> None:
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except psycopg2.Error as exc:
+            logger.debug("Closing pooled PostgreSQL connection failed: %s", exc)
+
+    def _discard_slot(self) -> None:
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _count(self, name: str) -> None:
+        with self._cond:
+            self._counters[name] += 1
+
+
+_pool: BlockingConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> BlockingConnectionPool:
     """Return the shared connection pool, creating it on first call.
 
     Returns
     -------
-    SimpleConnectionPool
-        A psycopg2 connection pool sized by ``PG_POOL_MIN`` / ``PG_POOL_MAX``.
+    BlockingConnectionPool
+        A thread-safe psycopg2 pool sized by ``PG_POOL_MIN`` / ``PG_POOL_MAX``.
     """
     global _pool
-    if _pool is None:
-        _pool = SimpleConnectionPool(
-            minconn=settings.pg_pool_min,
-            maxconn=settings.pg_pool_max,
-            host=settings.pg_host,
-            port=settings.pg_port,
-            dbname=settings.pg_database,
-            user=settings.pg_user,
-            password=settings.pg_password,
-        )
+    with _pool_lock:
+        if _pool is None:
+            _pool = BlockingConnectionPool(
+                settings.pg_pool_min,
+                settings.pg_pool_max,
+                functools.partial(
+                    psycopg2.connect,
+                    host=settings.pg_host,
+                    port=settings.pg_port,
+                    dbname=settings.pg_database,
+                    user=settings.pg_user,
+                    password=settings.pg_password,
+                    # Server-side deadline for every statement on pooled connections.
+                    options=f"-c statement_timeout={int(settings.db_tool_timeout_seconds * 1000)}",
+                ),
+                timeout=settings.pg_pool_timeout_seconds,
+                max_age_seconds=settings.pg_pool_max_age_seconds,
+                ping_after_seconds=settings.pg_pool_ping_after_seconds,
+            )
+            register_metrics("pg_pool", _pool.stats)
     return _pool
 
 
 def get_connection():
     """Get a connection from the pool.
 
+    Blocks for up to ``PG_POOL_TIMEOUT_SECONDS`` when every connection is in
+    use, then raises :class:`PoolTimeout`.
+
     Returns
     -------
     psycopg2.extensions.connection
@@ -0,0 +1,19 @@
+"""Typed database errors shared by the psycopg2 and MCP backends."""
+
+
+class DBTimeoutError(TimeoutError):
+    """A database call exceeded its deadline (``DB_TOOL_TIMEOUT_SECONDS``).
+
+    Raised directly when the statement was cancelled by psycopg2's
+    ``statement_timeout`` or no pooled connection could be checked out in
+    time. Either way nothing was applied, so the call is safe to retry.
+    """
+
+
+class DBOutcomeUnknownError(DBTimeoutError):
+    """An MCP call overran its deadline and the client stopped waiting.
+
+    Nothing cancels the statement on the server, so it may still run to
+    completion. Reads are safe to retry; a write may already be applied and
+    must only be retried if it is idempotent.
+    """
@@ -3,13 +3,20 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, datetime
 from typing import Any
 
 from app.config import settings
+from app.db import statements
 from app.db.row_extract import extract_rows as _extract_rows
 from app.mcp.client import MCPClient
 
+# Statements queued by an open ``transaction()`` block in this context.
+_tx_statements: ContextVar[list[str] | None] = ContextVar("mcp_tx_statements", default=None)
+
 
 class MCPRepository:
     """Repository implementation backed by MCP server calls."""
@@ -17,6 +24,36 @@ class MCPRepository:
     def __init__(self, client: MCPClient) -> None:
         self._client = client
 
+    @contextmanager
+    def transaction(self) -> Iterator[MCPRepository]:
+        """Unit of work sent as one multi-statement script.
+
+        Statements issued inside the block are queued (parameters inlined)
+        and sent in a single MCP call when the block exits; nothing is sent if
+        the block raises. A multi-statement simple-protocol query runs as one
+        implicit transaction, so a failing statement rolls back the whole
+        script on the server connection that ran it; no explicit
+        ``BEGIN``/``COMMIT`` or follow-up ``ROLLBACK`` is sent, since with a
+        session pool that ``ROLLBACK`` could reach a different connection.
+
+        Because execution is deferred, every repository call inside the
+        block returns ``None`` instead of rows or ids (``create_*`` return
+        ``None``, ``get_*`` return ``[]``), so use it only for writes whose
+        results are not needed. Nested blocks join the outer one.
+        """
+        if _tx_statements.get() is not None:
+            yield self
+            return
+        statements_: list[str] = []
+        token = _tx_statements.set(statements_)
+        try:
+            yield self
+        finally:
+            _tx_statements.reset(token)
+        if not statements_:
+            return
+        self._client.query(";\n".join(statements_) + ";", [])
+
     def create_session(self) -> int | None:
         rows = self._fetch_one(
             "INSERT INTO sessions DEFAULT VALUES RETURNING session_id"
@@ -69,12 +106,28 @@ class MCPRepository:
         )
         return int(rows["item_id"]) if rows else None
 
+    def create_plan_with_items(self, title: str, items: list[dict[str, Any]]) -> dict[str, Any] | None:
+        sql, params = statements.create_plan_with_items(title, items)
+        row = self._fetch_one(sql, params)
+        if not row:
+            return None
+        item_ids = row.get("item_ids") or []
+        if isinstance(item_ids, str):
+            item_ids = item_ids.strip("{}").split(",") if item_ids.strip("{}") else []
+        return {"plan_id": int(row["plan_id"]), "item_ids": [int(i) for i in item_ids]}
+
     def update_plan_item_status(self, item_id: int, status: str) -> None:
         self._execute(
             "UPDATE plan_items SET status = %s WHERE item_id = %s",
             [status, item_id],
         )
 
+    def update_plan_items_status(
+        self, plan_id: int, status: str, current_status: str | None = None
+    ) -> list[int]:
+        sql, params = statements.update_plan_items_status(plan_id, status, current_status)
+        return sorted(int(row["item_id"]) for row in self._fetch_all(sql, params))
+
     def get_plan_items(self, plan_id: int) -> list[dict[str, Any]]:
         return self._fetch_all(
             "SELECT item_id, plan_id, topic_id, title, status, due_date, notes "
@@ -89,11 +142,12 @@ class MCPRepository:
         user_answer: str | None,
         score: float | None,
         feedback: str | None,
+        save_key: str | None = None,
     ) -> int | None:
         rows = self._fetch_one(
-            "INSERT INTO quiz_attempts (topic_id, question, user_answer, score, feedback) "
-            "VALUES (%s, %s, %s, %s, %s) RETURNING attempt_id",
-            [topic_id, question, user_answer, score, feedback],
+            "INSERT INTO quiz_attempts (topic_id, question, user_answer, score, feedback, save_key) "
+            "VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (save_key) DO NOTHING RETURNING attempt_id",
+            [topic_id, question, user_answer, score, feedback, save_key],
         )
         return int(rows["attempt_id"]) if rows else None
 
@@ -106,6 +160,48 @@ class MCPRepository:
             [limit],
         )
 
+    def take_bank_quiz(
+        self, topic_id: int, max_age_seconds: int, question_count: int | None = None
+    ) -> dict[str, Any] | None:
+        count = question_count or None
+        row = self._fetch_one(
+            "UPDATE quiz_bank SET served_at = NOW() WHERE quiz_id = ("
+            " SELECT quiz_id FROM quiz_bank"
+            " WHERE topic_id = %s AND served_at IS NULL"
+            " AND created_at > NOW() - make_interval(secs => %s)"
+            " AND (%s::integer IS NULL OR question_count = %s)"
+            " ORDER BY created_at LIMIT 1 FOR UPDATE SKIP LOCKED) "
+            "RETURNING quiz_id, quiz, EXTRACT(EPOCH FROM NOW() - created_at) AS age_seconds",
+            [topic_id, max_age_seconds, count, count],
+        )
+        if row and isinstance(row.get("quiz"), str):
+            row["quiz"] = json.loads(row["quiz"])
+        return row
+
+    def add_bank_quiz(self, topic_id: int, quiz: dict[str, Any]) -> int | None:
+        rows = self._fetch_one(
+            "INSERT INTO quiz_bank (topic_id, quiz, question_count) VALUES (%s, %s::jsonb, %s) "
+            "RETURNING quiz_id",
+            [topic_id, json.dumps(quiz, ensure_ascii=False), len(quiz.get("questions") or [])],
+        )
+        return int(rows["quiz_id"]) if rows else None
+
+    def count_bank_quizzes(self, topic_id: int, max_age_seconds: int) -> int:
+        rows = self._fetch_one(
+            "SELECT COUNT(*) AS available FROM quiz_bank "
+            "WHERE topic_id = %s AND served_at IS NULL "
+            "AND created_at > NOW() - make_interval(secs => %s)",
+            [topic_id, max_age_seconds],
+        )
+        return int(rows["available"]) if rows else 0
+
+    def purge_bank_quizzes(self, max_age_seconds: int) -> None:
+        self._execute(
+            "DELETE FROM quiz_bank WHERE served_at IS NOT NULL "
+            "OR created_at <= NOW() - make_interval(secs => %s)",
+            [max_age_seconds],
+        )
+
     def create_flashcard(self, topic_id: int | None, front: str, back: str) -> int | None:
         rows = self._fetch_one(
             "INSERT INTO flashcards (topic_id, front, back) VALUES (%s, %s, %s) "
@@ -162,9 +258,14 @@ class MCPRepository:
 
         When ``MCP_SUPPORTS_PARAMS`` is false, parameters are inlined into the
         SQL string via ``_inline_params``. Otherwise, ``%s`` placeholders are
-        converted to ``$N`` dollar-style parameters for pg-mcp-server.
+        converted to ``$N`` dollar-style parameters for pg-mcp-server. Inside
+        ``transaction()`` the inlined statement is queued instead of sent.
         """
         params = params or []
+        queued = _tx_statements.get()
+        if queued is not None:
+            queued.append(_inline_params(sql, params) if params else sql)
+            return None
         if params and not settings.mcp_supports_params:
             sql = _inline_params(sql, params)
             params = []
@@ -2,11 +2,46 @@
 
 from __future__ import annotations
 
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
+from psycopg2 import Binary
+from psycopg2.errors import QueryCanceled
 from psycopg2.extras import RealDictCursor
 
+from app.config import settings
+from app.db import statements
 from app.db.connection import get_connection, put_connection
+from app.db.errors import DBTimeoutError
+
+# Connection pinned by an open ``transaction()`` block in this context.
+_tx_conn: ContextVar[Any | None] = ContextVar("pg_tx_conn", default=None)
+
+
+@contextmanager
+def transaction() -> Iterator[None]:
+    """Run every ``_execute`` call in the block on one connection, committed once.
+
+    On error the whole unit of work is rolled back and the exception
+    re-raised. Nested blocks join the outer transaction.
+    """
+    if _tx_conn.get() is not None:
+        yield
+        return
+    conn = get_connection()
+    token = _tx_conn.set(conn)
+    try:
+        yield
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _tx_conn.reset(token)
+        put_connection(conn)
 
 
 def _execute(sql: str, params: list[Any] | None = None, *, fetch: str | None = None):
@@ -17,27 +52,33 @@ def _execute(sql: str, params: list[Any] | None = None, *, fetch: str | None = N
     - ``"all"``  — ``fetchall()`` (list of row dicts)
     - ``None``   — execute only, return None (for INSERT/UPDATE/DELETE without RETURNING)
 
-    On error the transaction is rolled back and the exception re-raised.
+    On error the transaction is rolled back and the exception re-raised; a
+    statement cancelled by ``statement_timeout`` is raised as
+    :class:`DBTimeoutError`. Inside ``transaction()`` the pinned connection is used and commit /
+    rollback are left to the enclosing block.
     """
-    conn = get_connection()
+    tx_conn = _tx_conn.get()
+    conn = tx_conn or get_connection()
     try:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(sql, params or [])
+            result = None
             if fetch == "one":
-                row = cur.fetchone()
-                conn.commit()
-                return row
-            if fetch == "all":
-                rows = cur.fetchall()
-                conn.commit()
-                return rows
+                result = cur.fetchone()
+            elif fetch == "all":
+                result = cur.fetchall()
+        if tx_conn is None:
             conn.commit()
-            return None
-    except Exception:
-        conn.rollback()
+        return result
+    except Exception as exc:
+        if tx_conn is None:
+            conn.rollback()
+        if isinstance(exc, QueryCanceled):
+            raise DBTimeoutError(f"statement exceeded {settings.db_tool_timeout_seconds}s deadline") from exc
         raise
     finally:
-        put_connection(conn)
+        if tx_conn is None:
+            put_connection(conn)
 
 
 # --------------- sessions ---------------
@@ -51,6 +92,47 @@ def create_session() -> int:
     return int(row["session_id"])
 
 
+# --------------- session_state ---------------
+
+def load_session_state(session_id: int, ttl_seconds: float) -> tuple[str, bytes] | None:
+    """Fetch ``(serde_type, blob)`` for an unexpired session and extend its TTL."""
+    row = _execute(
+        "UPDATE session_state SET expires_at = NOW() + make_interval(secs => %s) "
+        "WHERE session_id = %s AND expires_at > NOW() RETURNING serde_type, state",
+        [ttl_seconds, session_id],
+        fetch="one",
+    )
+    return (row["serde_type"], bytes(row["state"])) if row else None
+
+
+def save_session_state(session_id: int, serde_type: str, state: bytes, ttl_seconds: float) -> None:
+    """Insert or replace the serialized state blob for a session."""
+    _execute(
+        "INSERT INTO session_state (session_id, serde_type, state, updated_at, expires_at) "
+        "VALUES (%s, %s, %s, NOW(), NOW() + make_interval(secs => %s)) "
+        "ON CONFLICT (session_id) DO UPDATE SET serde_type = EXCLUDED.serde_type, "
+        "state = EXCLUDED.state, updated_at = NOW(), expires_at = EXCLUDED.expires_at",
+        [session_id, serde_type, Binary(state), ttl_seconds],
+    )
+
+
+def purge_expired_session_states() -> int:
+    """Delete expired session state rows; returns how many were removed."""
+    rows = _execute(
+        "DELETE FROM session_state WHERE expires_at <= NOW() RETURNING session_id",
+        fetch="all",
+    )
+    return len(rows or [])
+
+
+def delete_session_state(session_id: int) -> None:
+    """Remove the stored state for a session."""
+    _execute(
+        "DELETE FROM session_state WHERE session_id = %s",
+        [session_id],
+    )
+
+
 # --------------- messages ---------------
 
 def save_message(session_id: int, role: str, content: str) -> int:
@@ -114,6 +196,17 @@ def add_plan_item(
     return int(row["item_id"])
 
 
+def create_plan_with_items(title: str, items: list[dict[str, Any]]) -> dict[str, Any]:
+    """Create a plan and all of its items in one statement (one transaction).
+
+    Each item is a dict with ``title`` and optional ``topic_id``, ``due_date``
+    and ``notes``. Returns ``{"plan_id": int, "item_ids": [int, ...]}``.
+    """
+    sql, params = statements.create_plan_with_items(title, items)
+    row = _execute(sql, params, fetch="one")
+    return {"plan_id": int(row["plan_id"]), "item_ids": [int(i) for i in row["item_ids"] or []]}
+
+
 def update_plan_item_status(item_id: int, status: str) -> None:
     """Update a plan item's status ('pending' | 'in_progress' | 'done')."""
     _execute(
@@ -122,6 +215,15 @@ def update_plan_item_status(item_id: int, status: str) -> None:
     )
 
 
+def update_plan_items_status(
+    plan_id: int, status: str, current_status: str | None = None
+) -> list[int]:
+    """Set the status of all items of a plan in one UPDATE; returns item ids."""
+    sql, params = statements.update_plan_items_status(plan_id, status, current_status)
+    rows = _execute(sql, params, fetch="all")
+    return sorted(int(row["item_id"]) for row in rows)
+
+
 def get_plan_items(plan_id: int) -> list[dict[str, Any]]:
     """Fetch all items for a study plan."""
     return _execute(
@@ -156,15 +258,20 @@ def save_quiz_attempt(
     user_answer: str | None,
     score: float | None,
     feedback: str | None,
-) -> int:
-    """Persist a quiz attempt and return the attempt_id."""
+    save_key: str | None = None,
+) -> int | None:
+    """Persist a quiz attempt and return the attempt_id.
+
+    With *save_key* the insert is idempotent: a row already stored under that
+    key is left alone and ``None`` is returned.
+    """
     row = _execute(
-        "INSERT INTO quiz_attempts (topic_id, question, user_answer, score, feedback) "
-        "VALUES (%s, %s, %s, %s, %s) RETURNING attempt_id",
-        [topic_id, question, user_answer, score, feedback],
+        "INSERT INTO quiz_attempts (topic_id, question, user_answer, score, feedback, save_key) "
+        "VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (save_key) DO NOTHING RETURNING attempt_id",
+        [topic_id, question, user_answer, score, feedback, save_key],
         fetch="one",
     )
-    return int(row["attempt_id"])
+    return int(row["attempt_id"]) if row else None
 
 def get_weak_topics(limit: int = 5) -> list[dict[str, Any]]:
     """Return topics with lowest average quiz scores."""
@@ -194,6 +301,61 @@ def delete_quiz_attempt(attempt_id: int) -> None:
     )
 
 
+# --------------- quiz_bank ---------------
+
+def take_bank_quiz(
+    topic_id: int, max_age_seconds: int, question_count: int | None = None
+) -> dict[str, Any] | None:
+    """Claim the oldest fresh, unserved bank quiz for a topic (or None).
+
+    With ``question_count`` only quizzes of exactly that many questions match.
+    """
+    count = question_count or None
+    return _execute(
+        "UPDATE quiz_bank SET served_at = NOW() WHERE quiz_id = ("
+        " SELECT quiz_id FROM quiz_bank"
+        " WHERE topic_id = %s AND served_at IS NULL"
+        " AND created_at > NOW() - make_interval(secs => %s)"
+        " AND (%s::integer IS NULL OR question_count = %s)"
+        " ORDER BY created_at LIMIT 1 FOR UPDATE SKIP LOCKED) "
+        "RETURNING quiz_id, quiz, EXTRACT(EPOCH FROM NOW() - created_at) AS age_seconds",
+        [topic_id, max_age_seconds, count, count],
+        fetch="one",
+    )
+
+
+def add_bank_quiz(topic_id: int, quiz: dict[str, Any]) -> int:
+    """Store a pre-generated quiz document and return its quiz_id."""
+    row = _execute(
+        "INSERT INTO quiz_bank (topic_id, quiz, question_count) VALUES (%s, %s::jsonb, %s) "
+        "RETURNING quiz_id",
+        [topic_id, json.dumps(quiz, ensure_ascii=False), len(quiz.get("questions") or [])],
+        fetch="one",
+    )
+    return int(row["quiz_id"])
+
+
+def count_bank_quizzes(topic_id: int, max_age_seconds: int) -> int:
+    """Count fresh, unserved bank quizzes for a topic."""
+    row = _execute(
+        "SELECT COUNT(*) AS available FROM quiz_bank "
+        "WHERE topic_id = %s AND served_at IS NULL "
+        "AND created_at > NOW() - make_interval(secs => %s)",
+        [topic_id, max_age_seconds],
+        fetch="one",
+    )
+    return int(row["available"]) if row else 0
+
+
+def purge_bank_quizzes(max_age_seconds: int) -> None:
+    """Delete served and expired bank quizzes."""
+    _execute(
+        "DELETE FROM quiz_bank WHERE served_at IS NOT NULL "
+        "OR created_at <= NOW() - make_interval(secs => %s)",
+        [max_age_seconds],
+    )
+
+
 # --------------- flashcards ---------------
 
 def create_flashcard(topic_id: int | None, front: str, back: str) -> int:
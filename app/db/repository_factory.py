@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import logging
+from contextlib import contextmanager
 
 from app.config import settings
 from app.db import repository as psycopg_repo
+from app.db.circuit_breaker import BreakerGuardedClient, CircuitBreaker
 from app.db.mcp_repository import MCPRepository
 from app.mcp.manager import mcp_manager
+from app.utils.metrics import register_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,12 @@ logger = logging.getLogger(__name__)
 class PsycopgRepository:
     """Adapter to expose psycopg2 module functions as an object."""
 
+    @contextmanager
+    def transaction(self):
+        """Unit of work: statements share one pooled connection and one commit."""
+        with psycopg_repo.transaction():
+            yield self
+
     def create_session(self) -> int:
         return psycopg_repo.create_session()
 
@@ -33,9 +42,15 @@ class PsycopgRepository:
     def add_plan_item(self, plan_id: int, title: str, topic_id=None, due_date=None, notes=None) -> int:
         return psycopg_repo.add_plan_item(plan_id, title, topic_id, due_date, notes)
 
+    def create_plan_with_items(self, title: str, items):
+        return psycopg_repo.create_plan_with_items(title, items)
+
     def update_plan_item_status(self, item_id: int, status: str) -> None:
         return psycopg_repo.update_plan_item_status(item_id, status)
 
+    def update_plan_items_status(self, plan_id: int, status: str, current_status=None):
+        return psycopg_repo.update_plan_items_status(plan_id, status, current_status)
+
     def get_plan_items(self, plan_id: int):
         return psycopg_repo.get_plan_items(plan_id)
 
@@ -46,9 +61,9 @@ class PsycopgRepository:
         return psycopg_repo.get_plans()
 
     def save_quiz_attempt(
-        self, topic_id, question: str, user_answer=None, score=None, feedback=None
-    ) -> int:
-        return psycopg_repo.save_quiz_attempt(topic_id, question, user_answer, score, feedback)
+        self, topic_id, question: str, user_answer=None, score=None, feedback=None, save_key=None
+    ) -> int | None:
+        return psycopg_repo.save_quiz_attempt(topic_id, question, user_answer, score, feedback, save_key)
 
     def get_weak_topics(self, limit: int = 5):
         return psycopg_repo.get_weak_topics(limit)
@@ -59,6 +74,18 @@ class PsycopgRepository:
     def delete_quiz_attempt(self, attempt_id: int) -> None:
         return psycopg_repo.delete_quiz_attempt(attempt_id)
 
+    def take_bank_quiz(self, topic_id: int, max_age_seconds: int, question_count: int | None = None):
+        return psycopg_repo.take_bank_quiz(topic_id, max_age_seconds, question_count)
+
+    def add_bank_quiz(self, topic_id: int, quiz) -> int:
+        return psycopg_repo.add_bank_quiz(topic_id, quiz)
+
+    def count_bank_quizzes(self, topic_id: int, max_age_seconds: int) -> int:
+        return psycopg_repo.count_bank_quizzes(topic_id, max_age_seconds)
+
+    def purge_bank_quizzes(self, max_age_seconds: int) -> None:
+        return psycopg_repo.purge_bank_quizzes(max_age_seconds)
+
     def create_flashcard(self, topic_id, front: str, back: str) -> int:
         return psycopg_repo.create_flashcard(topic_id, front, back)
 
@@ -74,6 +101,24 @@ class PsycopgRepository:
 _psycopg_repo = PsycopgRepository()
 
 
+async def _probe_mcp() -> bool:
+    """Same check as ``/health/mcp``: a ``SELECT 1`` through a live session."""
+    client = mcp_manager.get_client()
+    if client is None:
+        return False
+    await client.async_query("SELECT 1 AS ok")
+    return True
+
+
+mcp_breaker = CircuitBreaker(
+    failure_threshold=settings.mcp_breaker_failure_threshold,
+    slow_call_seconds=settings.mcp_breaker_slow_call_seconds,
+    probe_interval_seconds=settings.mcp_breaker_probe_interval_seconds,
+    probe=_probe_mcp,
+)
+register_metrics("mcp_breaker", mcp_breaker.stats)
+
+
 def get_repository():
     if settings.db_backend.lower() != "mcp":
         return _psycopg_repo
@@ -85,7 +130,12 @@ def get_repository():
             return _psycopg_repo
         raise RuntimeError("MCP DB requested but client not available")
 
-    return MCPRepository(client)
+    # While MCP keeps failing or stalling, skip it instead of waiting for
+    # each call to fail; the breaker's probe loop closes it again.
+    if settings.mcp_fallback_to_psycopg2 and not mcp_breaker.allow():
+        return _psycopg_repo
+
+    return MCPRepository(BreakerGuardedClient(client, mcp_breaker))
 
 
 def get_psycopg_repository() -> PsycopgRepository:
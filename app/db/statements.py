@@ -0,0 +1,60 @@
+"""SQL statement builders shared by the psycopg2 and MCP repositories."""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def update_plan_items_status(
+    plan_id: int, status: str, current_status: str | None = None
+) -> tuple[str, list[Any]]:
+    """Build a set-based status update for every item of a plan.
+
+    With *current_status*, only items currently in that status are changed.
+    The statement returns the ``item_id`` of every updated row.
+    """
+    sql = "UPDATE plan_items SET status = %s WHERE plan_id = %s"
+    params: list[Any] = [status, plan_id]
+    if current_status is not None:
+        sql += " AND status = %s"
+        params.append(current_status)
+    return sql + " RETURNING item_id", params
+
+
+_PLAN_ITEM_COLUMNS = ("topic_id", "title", "due_date", "notes")
+
+
+def create_plan_with_items(title: str, items: list[dict[str, Any]]) -> tuple[str, list[Any]]:
+    """Build one statement inserting a plan and all of its items.
+
+    The plan and item INSERTs are data-modifying CTEs of a single statement,
+    so they commit or fail together in one round-trip. Items keep their input
+    order (``ord``), so ``item_ids`` lines up with *items*. Returns the SQL and
+    its ``%s`` parameters; the result row has ``plan_id`` and ``item_ids``.
+    """
+    if not items:
+        sql = (
+            "WITH new_plan AS ("
+            "INSERT INTO study_plan (title) VALUES (%s) RETURNING plan_id"
+            ") SELECT plan_id, ARRAY[]::integer[] AS item_ids FROM new_plan"
+        )
+        return sql, [title]
+    rows = []
+    params: list[Any] = [title]
+    for ord_, item in enumerate(items):
+        rows.append(f"(%s::integer, %s::text, %s::date, %s::text, {ord_})")
+        params.extend(item.get(column) for column in _PLAN_ITEM_COLUMNS)
+    sql = (
+        "WITH new_plan AS ("
+        "INSERT INTO study_plan (title) VALUES (%s) RETURNING plan_id"
+        "), new_items AS ("
+        "INSERT INTO plan_items (plan_id, topic_id, title, due_date, notes) "
+        "SELECT new_plan.plan_id, v.topic_id, v.title, v.due_date, v.notes "
+        f"FROM new_plan, (VALUES {', '.join(rows)}) AS v(topic_id, title, due_date, notes, ord) "
+        "ORDER BY v.ord "
+        "RETURNING item_id"
+        ") "
+        "SELECT plan_id, (SELECT array_agg(item_id ORDER BY item_id) FROM new_items) AS item_ids "
+        "FROM new_plan"
+    )
+    return sql, params
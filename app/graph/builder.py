@@ -25,9 +25,19 @@ def build_graph():
 
     Graph topology::
 
-        START → router → (conditional) → [retrieve_context / web_search / db]
-                                                ↓
-                                         specialist → format_response → END
+        START → router → (conditional fan-out) → { db ∥ retrieve_context ∥ web_search }
+                                                          ↓ (join)
+                                                 specialist → format_response → END
+
+    Context branches selected by ``route_after_router`` run concurrently in
+    one superstep; each routes to the same specialist, which LangGraph then
+    runs once after all of them finish. A QUIZ turn therefore overlaps the
+    DB pre-fetch with Chroma retrieval instead of running them back to back.
+
+    With ``rag_speculative_retrieval`` enabled, the router starts retrieval in
+    the background before its LLM call and hands it to ``retrieve_context``
+    (see ``app.tools.retrieve_context.SpeculativeRetrieval``); it is not a
+    graph node, so turns that do not need RAG never wait for it.
 
     Returns
     -------
@@ -75,7 +85,6 @@ def build_graph():
                                 {"planner": "planner", "tutor": "tutor",
                                  "quiz": "quiz", "research": "research", "db": "db"})
     graph.add_conditional_edges("db", route_after_db, {
-                                "retrieve_context": "retrieve_context",
                                 "quiz": "quiz",
                                 "format_response": "format_response",
                                 })
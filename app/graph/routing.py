@@ -7,10 +7,14 @@ from app.models.state import GraphState
 logger = logging.getLogger("uvicorn.error")
 
 
-def route_after_router(state: GraphState) -> str:
-    """Decide the next node after the router based on routing flags.
+def route_after_router(state: GraphState) -> str | list[str]:
+    """Decide the next node(s) after the router based on routing flags.
 
-    Returns one of: 'retrieve_context', 'web_search', 'db', or a specialist node.
+    Independent context gathering fans out: the QUIZ pre-fetch (``db``),
+    ``retrieve_context`` and ``web_search`` run as parallel branches in the
+    same superstep, and the specialist they all route to runs once with their
+    updates merged. For REVIEW / LOG_PROGRESS / plan saves ``db`` is the
+    specialist itself and runs alone.
 
     Parameters
     ----------
@@ -18,16 +22,27 @@ def route_after_router(state: GraphState) -> str:
 
     Returns
     -------
-    str
-        The name of the next node.
+    str | list[str]
+        The next node, or the context nodes to run in parallel.
     """
-    if state.get("needs_db"):
+    if state.get("needs_db") and state.get("intent") != "QUIZ":
         return "db"
+    branches = context_branches(state)
+    if not branches:
+        return route_to_specialist(state)
+    return branches if len(branches) > 1 else branches[0]
+
+
+def context_branches(state: GraphState) -> list[str]:
+    """Context nodes needed for this turn; they only write disjoint state keys."""
+    branches = []
+    if state.get("needs_db"):
+        branches.append("db")
     if state.get("needs_rag"):
-        return "retrieve_context"
+        branches.append("retrieve_context")
     if state.get("needs_web"):
-        return "web_search"
-    return route_to_specialist(state)
+        branches.append("web_search")
+    return branches
 
 
 def route_to_specialist(state: GraphState) -> str:
@@ -60,15 +75,13 @@ def route_to_specialist(state: GraphState) -> str:
     return "tutor"
 
 def route_after_db(state: GraphState) -> str:
-     """After db node: for QUIZ pre-fetch, continue to RAG or quiz. Otherwise format."""
-     intent = state.get("intent")
-     if intent == "QUIZ" and not state.get("quiz_results_saved"):
-         # Pre-quiz DB done → continue to RAG retrieval or quiz
-         if state.get("needs_rag"):
-             return "retrieve_context"
-         return "quiz"
-     # All other intents (REVIEW, LOG_PROGRESS, PLAN/SAVE_PLAN) + post-quiz DB
-     return "format_response"
+    """After db node: QUIZ pre-fetch joins the quiz node, everything else formats."""
+    intent = state.get("intent")
+    if intent == "QUIZ" and not state.get("quiz_results_saved"):
+        # Pre-quiz DB done; RAG (if needed) ran alongside it in the same step.
+        return "quiz"
+    # All other intents (REVIEW, LOG_PROGRESS, PLAN/SAVE_PLAN) + post-quiz DB
+    return "format_response"
 
 
 def route_after_quiz(state: GraphState) -> str:
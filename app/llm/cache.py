@@ -0,0 +1,202 @@
+"""Response cache for deterministic LLM prompts.
+
+Two tiers: an in-process LRU (microsecond hits) and an optional SQLite file in
+WAL mode that several worker processes can share. Entries expire after a TTL
+and each tier is bounded by entry count.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from app.config import settings
+from app.utils.metrics import register_metrics
+
+# ChatOllama attributes that change the completion for a given prompt.
+_OPTION_FIELDS = (
+    "base_url",
+    "format",
+    "temperature",
+    "top_p",
+    "top_k",
+    "seed",
+    "num_ctx",
+    "num_predict",
+    "repeat_penalty",
+    "stop",
+)
+
+
+def make_key(model: str, options: dict[str, Any], prompt: str) -> str:
+    """Hash (model, options, prompt) into a stable cache key."""
+    payload = json.dumps([model, options, prompt], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def key_for(llm: Any, prompt: str) -> str | None:
+    """Cache key for ``prompt`` on ``llm``, or None when ``llm`` is not cacheable.
+
+    Only real chat models (with a string ``model`` name) are cached; bound
+    runnables and test doubles are passed through untouched. Sampling models
+    (any ``temperature`` other than 0, including Ollama's default when unset)
+    are not cached either, since repeating the prompt should vary the answer.
+    """
+    model = getattr(llm, "model", None)
+    if not isinstance(model, str):
+        return None
+    if getattr(llm, "temperature", None) != 0:
+        return None
+    options = {name: getattr(llm, name, None) for name in _OPTION_FIELDS}
+    return make_key(model, options, prompt)
+
+
+class LLMResponseCache:
+    """Two-tier TTL cache mapping prompt keys to response text."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        sqlite_path: str = "",
+        sqlite_max_entries: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._sqlite_max_entries = sqlite_max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_writes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        if sqlite_path:
+            self._db = self._open_sqlite(sqlite_path)
+
+    @property
+    def has_disk_tier(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: str) -> str | None:
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+            value = self._get_disk(key, now)
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._put_memory(key, value, now)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._counters["writes"] += 1
+            self._put_memory(key, value, now)
+            self._put_disk(key, value, now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._memory),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl_seconds,
+                "disk_tier": self._db is not None,
+            }
+
+    def _put_memory(self, key: str, value: str, now: float) -> None:
+        self._memory[key] = (value, now + self._ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _open_sqlite(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        return db
+
+    def _get_disk(self, key: str, now: float) -> str | None:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def _put_disk(self, key: str, value: str, now: float) -> None:
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+            " expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+            (key, value, now + self._ttl_seconds, now),
+        )
+        self._db_writes += 1
+        # Sweep expired rows and trim to size periodically rather than per write.
+        if self._db_writes % 100 == 0:
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            cursor = self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self._sqlite_max_entries,),
+            )
+            self._counters["evictions"] += max(cursor.rowcount, 0)
+
+
+_CACHE: LLMResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _CACHE
+    if not settings.llm_cache_enabled:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMResponseCache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                sqlite_path=settings.llm_cache_sqlite_path,
+                sqlite_max_entries=settings.llm_cache_sqlite_max_entries,
+            )
+            register_metrics("llm_cache", _CACHE.stats)
+    return _CACHE
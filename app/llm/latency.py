@@ -0,0 +1,86 @@
+"""Per-profile LLM call latency tracking via a LangChain callback."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+_SAMPLE_WINDOW = 500
+
+
+class LatencyRecorder:
+    """Rolling latency samples and call/error counts keyed by profile name."""
+
+    def __init__(self, window: int = _SAMPLE_WINDOW) -> None:
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._calls: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+
+    def record(self, profile: str, seconds: float, *, error: bool = False) -> None:
+        with self._lock:
+            self._samples.setdefault(profile, deque(maxlen=self._window)).append(seconds)
+            self._calls[profile] = self._calls.get(profile, 0) + 1
+            if error:
+                self._errors[profile] = self._errors.get(profile, 0) + 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                profile: {
+                    "calls": self._calls[profile],
+                    "errors": self._errors.get(profile, 0),
+                    **_summarise(samples),
+                }
+                for profile, samples in self._samples.items()
+            }
+
+
+def _summarise(samples: deque[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pct(q: float) -> float:
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000, 1)
+
+    return {
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+class LatencyCallback(BaseCallbackHandler):
+    """Times every chat model run (sync, async, streamed, tool-calling)."""
+
+    run_inline = True
+
+    def __init__(self, profile: str, recorder: LatencyRecorder) -> None:
+        self._profile = profile
+        self._recorder = recorder
+        self._started: dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=False)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=True)
+
+    def _finish(self, run_id: UUID, *, error: bool) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self._recorder.record(self._profile, time.perf_counter() - started, error=error)
+
+
+latency_recorder = LatencyRecorder()
@@ -1,34 +1,114 @@
 """Factories for Ollama-backed LLM and embeddings."""
 
+import json
+import threading
+
+import httpx
 from langchain_ollama import ChatOllama, OllamaEmbeddings
+from pydantic import BaseModel
 
 from app.config import settings
+from app.llm.latency import LatencyCallback, latency_recorder
+from app.utils.metrics import register_metrics
+
+# Process-wide clients keyed by connection/model options. Each ChatOllama owns
+# a sync and an async HTTP client; sharing them keeps TCP connections to
+# Ollama alive across nodes and turns instead of reconnecting on every call.
+_CHAT_MODELS: dict[tuple, ChatOllama] = {}
+_EMBEDDINGS: dict[tuple, OllamaEmbeddings] = {}
+_LOCK = threading.Lock()
+
+register_metrics("llm_latency", latency_recorder.stats)
+
+
+def _client_kwargs(timeout: float | None) -> dict:
+    return {
+        "timeout": timeout,
+        "limits": httpx.Limits(
+            max_keepalive_connections=settings.ollama_max_keepalive_connections,
+            keepalive_expiry=settings.ollama_keepalive_expiry_seconds,
+        ),
+    }
 
 
-def get_chat_model():
-    """Return a ChatOllama instance configured from settings.
+def get_chat_model(profile: str = "default", *, output_schema: type[BaseModel] | None = None):
+    """Return the shared ChatOllama instance for a named model profile.
+
+    ``profile`` selects an entry of ``settings.ollama_profiles`` (router,
+    planner, quiz, tutor, db); unset fields fall back to ``ollama_model`` and
+    Ollama's own defaults. Instances are cached per resolved options, so every
+    node in a turn reuses the same pooled HTTP connections. Call latency is
+    recorded per profile and reported under ``llm_latency`` in ``/metrics``.
+
+    Parameters
+    ----------
+    profile : str
+        Profile name; unknown names use the defaults.
+    output_schema : type[pydantic.BaseModel] | None
+        When set (and ``llm_structured_output`` is enabled), the model's JSON
+        schema is sent as Ollama's ``format`` so decoding is constrained to
+        valid JSON for that schema.
 
     Returns
     -------
     langchain_ollama.ChatOllama
         A chat model connected to the local Ollama server.
     """
-    return ChatOllama(
-        base_url=settings.ollama_base_url,
-        model=settings.ollama_model,
-        request_timeout=settings.ollama_timeout_seconds,
+    options = settings.model_profile(profile)
+    model_name = options.model or settings.ollama_model
+    output_format = None
+    if output_schema is not None and settings.llm_structured_output:
+        output_format = output_schema.model_json_schema()
+    key = (
+        profile,
+        settings.ollama_base_url,
+        model_name,
+        settings.ollama_timeout_seconds,
+        options.num_ctx,
+        options.num_predict,
+        options.temperature,
+        options.keep_alive,
+        json.dumps(output_format, sort_keys=True) if output_format else None,
     )
+    with _LOCK:
+        model = _CHAT_MODELS.get(key)
+        if model is None:
+            model = _CHAT_MODELS[key] = ChatOllama(
+                base_url=settings.ollama_base_url,
+                model=model_name,
+                num_ctx=options.num_ctx,
+                num_predict=options.num_predict,
+                temperature=options.temperature,
+                keep_alive=options.keep_alive,
+                format=output_format,
+                client_kwargs=_client_kwargs(settings.ollama_timeout_seconds),
+                callbacks=[LatencyCallback(profile, latency_recorder)],
+            )
+    return model
 
 
 def get_embeddings():
-    """Return an OllamaEmbeddings instance configured from settings.
+    """Return the shared OllamaEmbeddings instance configured from settings.
 
     Returns
     -------
     langchain_ollama.OllamaEmbeddings
         An embedding model for vectorising documents and queries.
     """
-    return OllamaEmbeddings(
-        base_url=settings.ollama_base_url,
-        model=settings.ollama_embed_model,
-    )
+    key = (settings.ollama_base_url, settings.ollama_embed_model)
+    with _LOCK:
+        embeddings = _EMBEDDINGS.get(key)
+        if embeddings is None:
+            embeddings = _EMBEDDINGS[key] = OllamaEmbeddings(
+                base_url=settings.ollama_base_url,
+                model=settings.ollama_embed_model,
+                client_kwargs=_client_kwargs(None),
+            )
+    return embeddings
+
+
+def clear_model_cache() -> None:
+    """Drop cached clients (e.g. after changing Ollama settings at runtime)."""
+    with _LOCK:
+        _CHAT_MODELS.clear()
+        _EMBEDDINGS.clear()
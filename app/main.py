@@ -1,52 +1,238 @@
-"""FastAPI application with a single POST /chat endpoint."""
+"""FastAPI application exposing the /chat endpoints."""
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
+import asyncio
+import functools
+import json
 import logging
-import concurrent.futures
-import itertools
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.schemas.chat import ChatRequest, ChatResponse
 from app.graph.builder import build_graph
 from app.config import settings
 from app.mcp.client import extract_payload
 from app.mcp.manager import mcp_manager
-from app.db.repository_factory import get_repository
+from app.db.repository_factory import get_repository, mcp_breaker
+from app.quiz_bank.worker import quiz_bank_worker
+from app.session.store_factory import get_session_store
+from app.tools.write_behind import write_behind_worker
+from app.utils.admission import AdmissionController, AdmissionRejected
+from app.utils.keyed_lock import KeyedLock
+from app.utils.metrics import collect_metrics, register_metrics
 
 logger = logging.getLogger("uvicorn.error")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await mcp_manager.start()
+    # MCP comes up in the background; until it is ready, get_repository()
+    # serves DB calls via psycopg2 (see MCP_FALLBACK_TO_PSYCOPG2).
+    mcp_manager.start_background()
+    if settings.db_backend.lower() == "mcp":
+        mcp_breaker.start()
+    if settings.quiz_bank_enabled:
+        quiz_bank_worker.start()
+    if settings.quiz_write_behind:
+        write_behind_worker.start()
     yield
+    await quiz_bank_worker.stop()
+    if settings.quiz_write_behind:
+        # Flush queued quiz results while the DB connection is still up.
+        await write_behind_worker.stop()
+    await mcp_breaker.stop()
     await mcp_manager.stop()
 
 
 app = FastAPI(title="Learning Assistant", version="0.1.0", lifespan=lifespan)
 
 graph = build_graph()
-_PLAN_DRAFTS: dict[int, dict] = {}
-_SESSION_CACHE: dict[int, dict] = {}
-_SESSION_COUNTER = itertools.count(1)
+session_store = get_session_store()
+admission = AdmissionController(
+    max_in_flight=settings.chat_max_in_flight,
+    max_queue=settings.chat_max_queue,
+    queue_timeout_seconds=settings.chat_queue_timeout_seconds,
+    retry_after_seconds=settings.chat_retry_after_seconds,
+)
+register_metrics("admission", admission.stats)
+session_locks = KeyedLock()
+register_metrics("session_locks", session_locks.stats)
+
+
+# Nodes whose LLM output is user-facing text and can be streamed token by token.
+# The router and planner emit JSON and quiz generation carries the answer key,
+# so their results are only delivered in the final ``done`` event.
+_TOKEN_STREAM_NODES = frozenset({"tutor"})
 
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
     """Handle a user chat message.
 
-    Invokes the LangGraph compiled graph and returns the assistant reply.
+    Awaits the LangGraph compiled graph on the event loop and returns the
+    assistant reply. The graph task is cancelled once ``chat_timeout_seconds``
+    elapses, which aborts in-flight LLM awaits and skips the remaining nodes.
+    Graph runs are admission-controlled: once ``chat_max_in_flight`` runs are
+    active and the wait queue is full (or the queue wait exceeds
+    ``chat_queue_timeout_seconds``) the request is rejected with 503 and a
+    ``Retry-After`` header. Turns for the same ``session_id`` run one at a
+    time (load state -> graph -> save state) so concurrent requests cannot
+    overwrite each other's ``quiz_state`` or ``plan_draft``.
     """
     logger.info("Chat endpoint hit")
+    async with _session_turn(request.session_id):
+        session_id, state_input = await _prepare_turn(request)
+
+        await _admit()
+        logger.info("Graph invoke started")
+        try:
+            result = await asyncio.wait_for(
+                graph.ainvoke(state_input), timeout=settings.chat_timeout_seconds
+            )
+        except asyncio.TimeoutError as exc:
+            logger.error("Graph invoke timed out")
+            raise HTTPException(status_code=504, detail="Chat processing timed out") from exc
+        finally:
+            admission.release()
+        logger.info("Graph invoke finished")
+
+        return await _finish_turn(session_id, state_input, result)
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Handle a user chat message and stream progress as Server-Sent Events.
+
+    Emits ``node`` events as graph nodes complete (router decision, retrieval,
+    DB), ``token`` events while a streamable specialist generates, and a final
+    ``done`` event carrying the ``ChatResponse`` payload. A deadline overrun is
+    reported as an ``error`` event with status 504. Admission is decided before
+    the stream opens, so an overloaded server answers 503 like ``/chat``.
+    """
+    logger.info("Chat stream endpoint hit")
+    lock_key = request.session_id
+    if lock_key is not None:
+        await session_locks.acquire(lock_key)
+    admitted = False
+    try:
+        session_id, state_input = await _prepare_turn(request)
+        await _admit()
+        admitted = True
+        return _TurnStreamingResponse(
+            _stream_graph(session_id, state_input),
+            on_close=functools.partial(_release_turn, lock_key),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    except BaseException:
+        if admitted:
+            admission.release()
+        _release_session(lock_key)
+        raise
+
+
+class _TurnStreamingResponse(StreamingResponse):
+    """Streaming response that runs *on_close* however the response ends.
+
+    Starlette only iterates the body once the response is sent, so a client
+    that disconnects (or a send that fails) before the first chunk never runs
+    the generator's ``finally``. Cleanup therefore hangs off ``__call__``: the
+    body generator is closed first, then the turn's resources are released.
+    """
+
+    def __init__(self, content, *, on_close, **kwargs) -> None:
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                await self.body_iterator.aclose()
+            finally:
+                self._on_close()
+
+
+def _release_turn(lock_key: int | None) -> None:
+    """Free a streamed turn's admission slot and session lock."""
+    admission.release()
+    _release_session(lock_key)
+
+
+async def _stream_graph(session_id: int, state_input: dict):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.chat_timeout_seconds
+    stream = graph.astream(state_input, stream_mode=["updates", "messages", "values"])
+    result: dict = {}
+    logger.info("Graph stream started")
+    try:
+        while True:
+            try:
+                mode, chunk = await asyncio.wait_for(
+                    stream.__anext__(), timeout=max(deadline - loop.time(), 0)
+                )
+            except StopAsyncIteration:
+                break
+            if mode == "values":
+                result = chunk
+            elif mode == "updates":
+                for node, update in chunk.items():
+                    yield _sse("node", _describe_node_update(node, update or {}))
+            elif mode == "messages":
+                message, metadata = chunk
+                node = metadata.get("langgraph_node")
+                text = getattr(message, "content", "")
+                if node in _TOKEN_STREAM_NODES and isinstance(text, str) and text:
+                    yield _sse("token", {"node": node, "text": text})
+    except asyncio.TimeoutError:
+        logger.error("Graph stream timed out")
+        yield _sse("error", {"status_code": 504, "detail": "Chat processing timed out"})
+        return
+    finally:
+        await stream.aclose()
+    logger.info("Graph stream finished")
+
+    response = await _finish_turn(session_id, state_input, result)
+    yield _sse("done", response.model_dump())
+
+
+def _session_turn(session_id: int | None):
+    """Serialize turns for an existing session; new sessions need no lock."""
+    if session_id is None:
+        return nullcontext()
+    return session_locks.hold(session_id)
+
+
+def _release_session(lock_key: int | None) -> None:
+    if lock_key is not None:
+        session_locks.release(lock_key)
+
+
+async def _admit() -> None:
+    """Take a graph execution slot or fail fast with 503 + Retry-After."""
+    try:
+        await admission.acquire()
+    except AdmissionRejected as exc:
+        logger.warning("Chat request rejected by admission control: %s", exc.reason)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, retry later",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
+async def _prepare_turn(request: ChatRequest) -> tuple[int, dict]:
+    """Resolve the session and build the graph input from cached session state."""
     logger.info("Building graph state")
     if settings.db_backend.lower() == "mcp":
-        session_id = request.session_id or next(_SESSION_COUNTER)
+        session_id = request.session_id or await asyncio.to_thread(session_store.create_session)
         logger.info("MCP backend: session_id=%s", session_id)
     else:
         repo = get_repository()
-        session_id = request.session_id or repo.create_session()
-    plan_draft = _PLAN_DRAFTS.get(session_id)
-    last_state = _SESSION_CACHE.get(session_id, {})
+        session_id = request.session_id or await asyncio.to_thread(repo.create_session)
+    last_state = await asyncio.to_thread(session_store.get, session_id) or {}
+    plan_draft = last_state.get("plan_draft")
     last_intent = last_state.get("last_intent")
     last_db_context = last_state.get("last_db_context")
     last_quiz_state = last_state.get("quiz_state")
@@ -59,6 +245,8 @@ def chat(request: ChatRequest):
         "needs_web": False,
         "needs_db": False,
         "rag_context": "",
+        "rag_similarity": None,
+        "speculative_rag": None,
         "web_context": "",
         "db_context": last_db_context or {},
         "specialist_output": "",
@@ -73,39 +261,69 @@ def chat(request: ChatRequest):
         "last_db_context": last_db_context,
         "sub_intent": "",
     }
+    return session_id, state_input
 
-    logger.info("Graph invoke started")
-    try:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(graph.invoke, state_input)
-            done, _ = concurrent.futures.wait(
-                [future], timeout=settings.chat_timeout_seconds
-            )
-            if not done:
-                logger.error("Graph invoke timed out")
-                raise HTTPException(
-                    status_code=504, detail="Chat processing timed out"
-                )
-            result = future.result()
-    except concurrent.futures.TimeoutError as exc:
-        logger.error("Graph invoke timed out")
-        raise HTTPException(status_code=504, detail="Chat processing timed out") from exc
-    logger.info("Graph invoke finished")
+
+async def _finish_turn(session_id: int, state_input: dict, result: dict) -> ChatResponse:
+    """Persist per-session state from the graph result and build the response."""
     reply = result.get("final_response") or result.get("user_response") or ""
 
+    plan_draft = state_input["plan_draft"]
     if result.get("plan_confirmed"):
-        _PLAN_DRAFTS.pop(session_id, None)
+        plan_draft = None
     elif result.get("plan_draft"):
-        _PLAN_DRAFTS[session_id] = result["plan_draft"]
-    _SESSION_CACHE[session_id] = {
-        "last_intent": result.get("intent", last_intent),
-        "last_db_context": result.get("db_context", last_db_context),
-        "quiz_state": result.get("quiz_state", last_quiz_state),
-    }
+        plan_draft = result["plan_draft"]
+    await asyncio.to_thread(
+        session_store.put,
+        session_id,
+        {
+            "last_intent": result.get("intent", state_input["last_intent"]),
+            "last_db_context": result.get("db_context", state_input["last_db_context"]),
+            "quiz_state": result.get("quiz_state", state_input["quiz_state"]),
+            "plan_draft": plan_draft,
+        },
+    )
 
     return ChatResponse(session_id=session_id, reply=reply)
 
 
+def _describe_node_update(node: str, update: dict) -> dict:
+    """Summarise a node's state update for the ``node`` SSE event."""
+    event = {"node": node}
+    if node == "router":
+        for key in ("intent", "sub_intent", "needs_rag", "needs_web", "needs_db"):
+            event[key] = update.get(key)
+    elif node == "retrieve_context":
+        event["has_context"] = bool((update.get("rag_context") or "").strip())
+    elif node == "web_search":
+        event["has_context"] = bool((update.get("web_context") or "").strip())
+    return event
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.get("/metrics")
+async def metrics():
+    """Snapshot of component metrics (session store, limits, caches, pools)."""
+    return collect_metrics()
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 200 once the configured DB backend is available, else 503."""
+    status = mcp_manager.status
+    body = {
+        "ready": status in {"ready", "disabled"},
+        "db_backend": settings.db_backend.lower(),
+        "mcp": mcp_manager.stats(),
+    }
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 @app.get("/health/mcp")
 async def health_mcp():
     """Simple MCP health check (connectivity + query)."""
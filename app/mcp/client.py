@@ -3,10 +3,13 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import json
 import logging
 from typing import Any
 
+from app.db.errors import DBOutcomeUnknownError
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,8 +60,10 @@ class MCPClient:
         query_key: str = "query",
         params_key: str = "params",
         supports_params: bool = False,
+        timeout_seconds: float | None = None,
     ) -> None:
         self._session = session
+        self._timeout_seconds = timeout_seconds
         self._tool_name = tool_name
         self._query_key = query_key
         self._params_key = params_key
@@ -71,14 +76,25 @@ class MCPClient:
             self._loop = None
 
     def query(self, sql: str, params: list[Any] | None = None) -> Any:
-        """Execute a query via MCP and return structured content if available."""
+        """Execute a query via MCP and return structured content if available.
+
+        Raises :class:`DBOutcomeUnknownError` when the call takes longer than
+        ``timeout_seconds``. The wait is abandoned, but the server may still
+        run the statement.
+        """
         payload = self._run_async(self._call(sql, params or []))
         return extract_payload(payload)
 
     async def async_query(self, sql: str, params: list[Any] | None = None) -> Any:
-        result = await self._call(sql, params or [])
+        try:
+            result = await asyncio.wait_for(self._call(sql, params or []), self._timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            raise self._timeout_error() from exc
         return extract_payload(result)
 
+    def _timeout_error(self) -> DBOutcomeUnknownError:
+        return DBOutcomeUnknownError(f"MCP query exceeded {self._timeout_seconds}s deadline")
+
     async def _call(self, sql: str, params: list[Any]) -> Any:
         tool_args = {self._query_key: sql}
         if self._supports_params and self._params_key and params:
@@ -93,8 +109,16 @@ class MCPClient:
         except RuntimeError:
             if self._loop is not None and self._loop.is_running():
                 future = asyncio.run_coroutine_threadsafe(coro, self._loop)
-                return future.result()
-            return asyncio.run(coro)
+                try:
+                    return future.result(self._timeout_seconds)
+                except concurrent.futures.TimeoutError as exc:
+                    # Cancels the task on the session loop, not just our wait.
+                    future.cancel()
+                    raise self._timeout_error() from exc
+            try:
+                return asyncio.run(asyncio.wait_for(coro, self._timeout_seconds))
+            except asyncio.TimeoutError as exc:
+                raise self._timeout_error() from exc
 
         raise RuntimeError(
             "MCPClient.query() cannot be used inside a running event loop. "
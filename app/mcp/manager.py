@@ -6,62 +6,233 @@ import asyncio
 import logging
 import os
 import shlex
+import time
 from typing import Any
 
-from langchain_mcp_adapters import client as mcp_client
-
 from app.config import settings
-from app.mcp.client import MCPClient
+from app.mcp.pool import MCPClientPool, MCPSessionSlot, is_transport_failure
+from app.mcp.server_binary import resolve_server_command
+from app.utils.metrics import register_metrics
 
 logger = logging.getLogger(__name__)
 
 
 class MCPManager:
-    """Start/stop an MCP stdio server and keep a client session alive."""
+    """Start/stop a pool of MCP stdio servers and keep their sessions alive.
+
+    ``MCP_POOL_SIZE`` sessions (one ``pg-mcp-server`` process each) are
+    started together; ``get_client()`` returns a facade that sends every
+    query to the least-busy healthy session. A supervisor task pings idle
+    sessions, and dead or failing sessions are restarted in the background
+    with exponential backoff until they come back.
+    """
 
     def __init__(self) -> None:
-        self._session_cm = None
-        self._session = None
-        self._client: MCPClient | None = None
+        self._slots: list[MCPSessionSlot] = []
+        self._pool: MCPClientPool | None = None
         self._lock = asyncio.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._replacing: dict[int, asyncio.Task] = {}
+        self._supervisor: asyncio.Task | None = None
+        self._background_start: asyncio.Task | None = None
+        # Launch command, resolved by start() (see app.mcp.server_binary).
+        self._command: str = settings.mcp_server_command
+        self._args: list[str] = []
+        self._start_requested_at: float | None = None
+        self._ready_seconds: float | None = None
+        self._start_failures = 0
+
+    @property
+    def status(self) -> str:
+        """``disabled`` | ``stopped`` | ``starting`` | ``ready`` | ``degraded``."""
+        if settings.db_backend.lower() != "mcp":
+            return "disabled"
+        if self._pool is not None:
+            return "ready" if self._pool.has_healthy() else "degraded"
+        if self._background_start is not None and not self._background_start.done():
+            return "starting"
+        return "stopped"
+
+    def start_background(self) -> None:
+        """Start the pool without blocking; retries with backoff until it is up.
+
+        Until MCP is ready ``get_client()`` returns ``None``, so requests are
+        served by the psycopg2 fallback.
+        """
+        if settings.db_backend.lower() != "mcp":
+            return
+        if self._background_start is None or self._background_start.done():
+            self._start_requested_at = time.monotonic()
+            self._background_start = asyncio.create_task(
+                self._start_with_retry(), name="mcp-background-start"
+            )
+
+    async def _start_with_retry(self) -> None:
+        # Each attempt has a deadline: an npx that hangs (e.g. offline with an
+        # empty cache) must not leave the app "starting" forever.
+        delay = settings.mcp_restart_backoff_seconds
+        while True:
+            try:
+                await asyncio.wait_for(self.start(), settings.mcp_start_timeout_seconds)
+                return
+            except asyncio.TimeoutError:
+                self._start_failures += 1
+                logger.error(
+                    "MCP startup timed out after %.0fs (retry in %.1fs)",
+                    settings.mcp_start_timeout_seconds, delay,
+                )
+            except Exception:
+                self._start_failures += 1
+                logger.exception("MCP startup failed (retry in %.1fs)", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.mcp_restart_backoff_max_seconds)
 
     async def start(self) -> None:
         if settings.db_backend.lower() != "mcp":
             return
         async with self._lock:
-            if self._session is not None:
+            if self._slots:
                 return
-            connection = self._build_connection()
-            self._session_cm = mcp_client.create_session(connection)
-            self._session = await self._session_cm.__aenter__()
-            await self._session.initialize()
-            self._client = MCPClient(
-                self._session,
-                tool_name=settings.mcp_tool_name,
-                query_key=settings.mcp_query_key,
-                params_key=settings.mcp_params_key,
-                supports_params=settings.mcp_supports_params,
+            self._loop = asyncio.get_running_loop()
+            if self._start_requested_at is None:
+                self._start_requested_at = time.monotonic()
+            self._command = settings.mcp_server_command
+            self._args = _parse_args(settings.mcp_server_args)
+            if settings.mcp_resolve_binary:
+                self._command, self._args = await asyncio.to_thread(
+                    resolve_server_command, self._command, self._args, settings.mcp_binary_cache_path
+                )
+            client_kwargs = {
+                "tool_name": settings.mcp_tool_name,
+                "query_key": settings.mcp_query_key,
+                "params_key": settings.mcp_params_key,
+                "supports_params": settings.mcp_supports_params,
+                "timeout_seconds": settings.db_tool_timeout_seconds,
+            }
+            slots = [
+                MCPSessionSlot(index, self._build_connection, client_kwargs, on_ready=self._notify_ready)
+                for index in range(max(settings.mcp_pool_size, 1))
+            ]
+            try:
+                started = await asyncio.gather(*(slot.open() for slot in slots))
+            except BaseException:
+                await asyncio.gather(*(slot.close() for slot in slots), return_exceptions=True)
+                raise
+            if not any(started):
+                await asyncio.gather(*(slot.close() for slot in slots), return_exceptions=True)
+                raise slots[0].error or RuntimeError("MCP server failed to start")
+            self._slots = slots
+            self._pool = MCPClientPool(
+                slots,
+                self._schedule_replace,
+                max_failures=settings.mcp_session_max_failures,
+                replay_wait_seconds=settings.mcp_replay_wait_seconds,
+            )
+            for slot in slots:
+                if not slot.healthy:
+                    self._schedule_replace(slot)
+            self._supervisor = asyncio.create_task(self._supervise(), name="mcp-supervisor")
+            self._ready_seconds = time.monotonic() - self._start_requested_at
+            logger.info(
+                "MCP server started (%d/%d sessions) in %.2fs using %s",
+                sum(started), len(slots), self._ready_seconds, self._command,
             )
-            logger.info("MCP server started")
 
     async def stop(self) -> None:
+        background, self._background_start = self._background_start, None
+        if background is not None and not background.done():
+            background.cancel()
+            await asyncio.gather(background, return_exceptions=True)
         async with self._lock:
-            if self._session_cm is None:
+            if not self._slots:
                 return
-            await self._session_cm.__aexit__(None, None, None)
-            self._session_cm = None
-            self._session = None
-            self._client = None
+            tasks = list(self._replacing.values())
+            if self._supervisor is not None:
+                tasks.append(self._supervisor)
+                self._supervisor = None
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._replacing.clear()
+            await asyncio.gather(*(slot.close() for slot in self._slots))
+            self._slots = []
+            self._pool = None
+            self._start_requested_at = None
             logger.info("MCP server stopped")
 
-    def get_client(self) -> MCPClient | None:
-        return self._client
+    def get_client(self) -> MCPClientPool | None:
+        if self._pool is None or not self._pool.has_healthy():
+            return None
+        return self._pool
 
     def get_session(self):
-        return self._session
+        return self._pool.session() if self._pool is not None else None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "ready_seconds": round(self._ready_seconds, 3) if self._ready_seconds is not None else None,
+            "command": self._command,
+            "start_failures": self._start_failures,
+            "size": len(self._slots),
+            "healthy": sum(slot.healthy for slot in self._slots),
+            "replacing": len(self._replacing),
+            "replayed_reads": self._pool.replayed if self._pool is not None else 0,
+            "sessions": [slot.snapshot() for slot in self._slots],
+        }
+
+    def _schedule_replace(self, slot: MCPSessionSlot) -> None:
+        """Restart *slot* on the manager's loop; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._start_replace, slot)
+
+    def _start_replace(self, slot: MCPSessionSlot) -> None:
+        if slot.index in self._replacing or slot not in self._slots:
+            return
+        self._replacing[slot.index] = asyncio.create_task(
+            self._replace(slot), name=f"mcp-replace-{slot.index}"
+        )
+
+    async def _replace(self, slot: MCPSessionSlot) -> None:
+        """Restart *slot*, backing off exponentially until it comes back."""
+        delay = settings.mcp_restart_backoff_seconds
+        try:
+            while True:
+                await slot.close()
+                if await slot.open():
+                    logger.info("MCP session %d restarted", slot.index)
+                    return
+                logger.error(
+                    "MCP session %d failed to restart (retry in %.1fs): %s", slot.index, delay, slot.error
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.mcp_restart_backoff_max_seconds)
+        finally:
+            self._replacing.pop(slot.index, None)
+
+    async def _supervise(self) -> None:
+        """Detect sessions that died while idle and keep dead ones restarting."""
+        while True:
+            await asyncio.sleep(settings.mcp_supervisor_interval_seconds)
+            for slot in list(self._slots):
+                if not slot.healthy:
+                    self._start_replace(slot)
+                elif slot.in_flight == 0 and slot.client is not None:
+                    try:
+                        await slot.client.async_query("SELECT 1 AS ok")
+                    except Exception as exc:
+                        if is_transport_failure(exc):
+                            self._pool.mark_dead(slot)
+                        else:
+                            logger.warning("MCP idle check on session %d failed", slot.index, exc_info=True)
+
+    def _notify_ready(self) -> None:
+        if self._pool is not None:
+            self._pool.notify_ready()
 
     def _build_connection(self) -> dict[str, Any]:
-        args = _parse_args(settings.mcp_server_args)
         env = os.environ.copy()
         if settings.mcp_database_url:
             env["DATABASE_URL"] = settings.mcp_database_url
@@ -69,13 +240,14 @@ class MCPManager:
             env["DANGEROUSLY_ALLOW_WRITE_OPS"] = "true"
         return {
             "transport": "stdio",
-            "command": settings.mcp_server_command,
-            "args": args,
+            "command": self._command,
+            "args": list(self._args),
             "env": env,
         }
 
 
 mcp_manager = MCPManager()
+register_metrics("mcp_pool", mcp_manager.stats)
 
 
 def _parse_args(raw: str) -> list[str]:
@@ -0,0 +1,311 @@
+"""Pool of MCP stdio sessions with least-busy dispatch."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import anyio
+from langchain_mcp_adapters import client as mcp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from app.db.errors import DBTimeoutError
+from app.mcp.client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the stdio server or its pipes are gone, not that a query failed.
+_SESSION_DEATH_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    BrokenPipeError,
+    ConnectionError,
+    EOFError,
+)
+_WRITE_KEYWORDS_RE = re.compile(
+    r"\b(insert|update|delete|merge|truncate|create|alter|drop|grant|call|copy)\b", re.IGNORECASE
+)
+
+
+class NoHealthySessionError(RuntimeError):
+    """No MCP session could take the call (all are dead or restarting)."""
+
+
+def is_session_dead(exc: BaseException) -> bool:
+    """Return whether *exc* means the MCP session itself is unusable."""
+    if isinstance(exc, McpError):
+        return exc.error.code == CONNECTION_CLOSED
+    return isinstance(exc, _SESSION_DEATH_ERRORS)
+
+
+def is_transport_failure(exc: BaseException) -> bool:
+    """Return whether *exc* is a session/transport failure or a timeout.
+
+    Anything else (constraint violations, syntax errors, rejected writes, a
+    database that is down behind a healthy server) is an application error
+    reported by the tool and says nothing about the session's health.
+    """
+    return is_session_dead(exc) or isinstance(
+        exc, (NoHealthySessionError, DBTimeoutError, TimeoutError, asyncio.TimeoutError)
+    )
+
+
+def is_idempotent_read(sql: str) -> bool:
+    """Conservatively classify *sql* as a single read that is safe to re-run."""
+    text = sql.strip().rstrip(";").strip()
+    if ";" in text:
+        return False
+    first = text.split(None, 1)[0].lower() if text else ""
+    if first not in {"select", "with", "show"}:
+        return False
+    return not _WRITE_KEYWORDS_RE.search(text)
+
+
+class MCPSessionSlot:
+    """One ``pg-mcp-server`` process and its ``ClientSession``.
+
+    The session context is entered and exited by a single task (anyio cancel
+    scopes must be closed by the task that opened them), which lives until
+    :meth:`close` is called or the session fails to start.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        connection_factory: Callable[[], dict[str, Any]],
+        client_kwargs: dict[str, Any],
+        on_ready: Callable[[], None] | None = None,
+    ) -> None:
+        self.index = index
+        self._connection_factory = connection_factory
+        self._client_kwargs = client_kwargs
+        self._on_ready = on_ready
+        self.session = None
+        self.client: MCPClient | None = None
+        self.healthy = False
+        self.error: BaseException | None = None
+        # Dispatch bookkeeping, guarded by the owning pool's lock.
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.total_failures = 0
+        self.app_errors = 0
+        self.deaths = 0
+        self.starts = 0
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+        self._ready: asyncio.Event | None = None
+
+    async def open(self) -> bool:
+        """Start the server process and wait until the session is initialized."""
+        self._stop = asyncio.Event()
+        self._ready = asyncio.Event()
+        self.error = None
+        self.starts += 1
+        self._task = asyncio.create_task(self._serve(), name=f"mcp-session-{self.index}")
+        await self._ready.wait()
+        return self.healthy
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        if not self._ready.is_set():
+            # Still launching (e.g. npx resolving the package): abandon it.
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("MCP session %d did not close cleanly", self.index)
+
+    async def _serve(self) -> None:
+        try:
+            async with mcp_client.create_session(self._connection_factory()) as session:
+                await session.initialize()
+                self.session = session
+                self.client = MCPClient(session, **self._client_kwargs)
+                self.failures = 0
+                self.healthy = True
+                self._ready.set()
+                if self._on_ready is not None:
+                    self._on_ready()
+                await self._stop.wait()
+        except Exception as exc:
+            self.error = exc
+            logger.warning("MCP session %d stopped with error: %s", self.index, exc, exc_info=True)
+        finally:
+            self.healthy = False
+            self.session = None
+            self.client = None
+            self._ready.set()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "index": self.index,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "consecutive_failures": self.failures,
+            "failures": self.total_failures,
+            "app_errors": self.app_errors,
+            "deaths": self.deaths,
+            "restarts": max(self.starts - 1, 0),
+        }
+
+
+class MCPClientPool:
+    """``MCPClient``-compatible facade over several sessions.
+
+    Each query goes to the healthy slot with the fewest in-flight calls.
+    A slot is handed to *on_unhealthy* for replacement as soon as a call shows
+    that its session died, or after ``max_failures`` transport failures or
+    timeouts in a row. Application errors (bad SQL, constraint violations)
+    reset that count and are passed to the caller.
+    A read that was in flight on a dead session is replayed once on a healthy
+    one, waiting up to ``replay_wait_seconds`` for a session to come back.
+    """
+
+    def __init__(
+        self,
+        slots: list[MCPSessionSlot],
+        on_unhealthy: Callable[[MCPSessionSlot], None],
+        *,
+        max_failures: int = 3,
+        replay_wait_seconds: float = 5.0,
+    ) -> None:
+        self._slots = slots
+        self._on_unhealthy = on_unhealthy
+        self._max_failures = max_failures
+        self._replay_wait_seconds = replay_wait_seconds
+        self._cond = threading.Condition()
+        self.replayed = 0
+
+    def has_healthy(self) -> bool:
+        return any(slot.healthy for slot in self._slots)
+
+    def session(self):
+        """Session of the least-busy healthy slot (``None`` if there is none)."""
+        with self._cond:
+            slot = self._pick()
+            return slot.session if slot else None
+
+    def notify_ready(self) -> None:
+        """Wake queries waiting for a session; called when a slot (re)starts."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def mark_dead(self, slot: MCPSessionSlot) -> None:
+        with self._cond:
+            if not slot.healthy:
+                return
+            slot.healthy = False
+            slot.deaths += 1
+        logger.warning("MCP session %d died; scheduling restart", slot.index)
+        self._on_unhealthy(slot)
+
+    def query(self, sql: str, params: list[Any] | None = None) -> Any:
+        slot, client = self._checkout()
+        try:
+            result = client.query(sql, params)
+        except Exception as exc:
+            if not self._failed(slot, exc, sql):
+                raise
+            slot, client = self._checkout(wait_seconds=self._replay_wait_seconds)
+            try:
+                result = client.query(sql, params)
+            except Exception as retry_exc:
+                self._failed(slot, retry_exc, None)
+                raise
+        self._succeeded(slot)
+        return result
+
+    async def async_query(self, sql: str, params: list[Any] | None = None) -> Any:
+        slot, client = self._checkout()
+        try:
+            result = await client.async_query(sql, params)
+        except Exception as exc:
+            if not self._failed(slot, exc, sql):
+                raise
+            slot, client = await self._async_checkout(self._replay_wait_seconds)
+            try:
+                result = await client.async_query(sql, params)
+            except Exception as retry_exc:
+                self._failed(slot, retry_exc, None)
+                raise
+        self._succeeded(slot)
+        return result
+
+    def _pick(self) -> MCPSessionSlot | None:
+        candidates = [slot for slot in self._slots if slot.healthy and slot.client is not None]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda slot: (slot.in_flight, slot.calls))
+
+    def _checkout(self, wait_seconds: float = 0.0) -> tuple[MCPSessionSlot, MCPClient]:
+        deadline = time.monotonic() + wait_seconds
+        with self._cond:
+            while True:
+                slot = self._pick()
+                if slot is not None:
+                    slot.in_flight += 1
+                    slot.calls += 1
+                    return slot, slot.client
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise NoHealthySessionError("No healthy MCP session available")
+                self._cond.wait(remaining)
+
+    async def _async_checkout(self, wait_seconds: float) -> tuple[MCPSessionSlot, MCPClient]:
+        # The session loop cannot block on the condition, so poll it instead.
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            try:
+                return self._checkout()
+            except NoHealthySessionError:
+                if time.monotonic() >= deadline:
+                    raise
+            await asyncio.sleep(0.05)
+
+    def _succeeded(self, slot: MCPSessionSlot) -> None:
+        with self._cond:
+            slot.in_flight -= 1
+            slot.failures = 0
+
+    def _failed(self, slot: MCPSessionSlot, exc: Exception, replay_sql: str | None) -> bool:
+        """Record a failed call; return whether it should be replayed."""
+        if not is_transport_failure(exc):
+            with self._cond:
+                slot.in_flight -= 1
+                slot.failures = 0
+                slot.app_errors += 1
+            return False
+        dead = is_session_dead(exc)
+        tripped = False
+        with self._cond:
+            slot.in_flight -= 1
+            slot.failures += 1
+            slot.total_failures += 1
+            if not dead and slot.healthy and slot.failures >= self._max_failures:
+                slot.healthy = False
+                tripped = True
+        if dead:
+            self.mark_dead(slot)
+        elif tripped:
+            logger.warning("MCP session %d marked unhealthy after %d failures", slot.index, slot.failures)
+            self._on_unhealthy(slot)
+        replay = dead and replay_sql is not None and is_idempotent_read(replay_sql)
+        if replay:
+            with self._cond:
+                self.replayed += 1
+            logger.info("Replaying read from dead MCP session %d", slot.index)
+        return replay
@@ -0,0 +1,125 @@
+"""Resolve ``npx <package>`` MCP server commands to a cached local binary."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# npx options that take a value; everything else starting with "-" is a flag.
+_NPX_VALUE_OPTIONS = {"-p", "--package", "-c", "--call", "--cache", "--registry"}
+# npm reads its config from the environment in either case.
+_NPM_CACHE_ENV_VARS = ("npm_config_cache", "NPM_CONFIG_CACHE")
+
+
+def split_npx_package(args: list[str]) -> tuple[str, list[str]] | None:
+    """Return ``(package spec, server args)`` for an npx argument list."""
+    index = 0
+    while index < len(args):
+        arg = args[index]
+        if arg in _NPX_VALUE_OPTIONS:
+            return None  # --package/--call invocations are not resolved
+        if not arg.startswith("-"):
+            return arg, args[index + 1:]
+        index += 1
+    return None
+
+
+def parse_package_spec(spec: str) -> tuple[str, str | None]:
+    """Split ``name@version`` (including ``@scope/name@version``)."""
+    at = spec.rfind("@")
+    if at > 0:
+        return spec[:at], spec[at + 1:] or None
+    return spec, None
+
+
+def resolve_server_command(
+    command: str,
+    args: list[str],
+    cache_path: str,
+    *,
+    npm_cache_dir: str | None = None,
+) -> tuple[str, list[str]]:
+    """Return the command to launch, preferring an already-installed binary.
+
+    ``npx --yes <package>`` re-resolves (and may download) the package on
+    every start. When the package's bin can be found locally — a cached path
+    from an earlier boot, a global install on ``PATH`` or the npx cache
+    (``~/.npm/_npx``) — it is launched directly and its path is remembered in
+    *cache_path*. Otherwise the original command is returned unchanged, and
+    the binary npx installs is found on the next boot.
+    """
+    if Path(command).name != "npx":
+        return command, args
+    split = split_npx_package(args)
+    if split is None:
+        return command, args
+    spec, server_args = split
+    key = f"{command} {spec}"
+
+    cached = _read_cache(cache_path).get(key)
+    if cached and os.access(cached, os.X_OK):
+        return cached, server_args
+
+    name, version = parse_package_spec(spec)
+    binary = _find_binary(name, version, npm_cache_dir)
+    if binary is None:
+        logger.info("MCP server binary for %s not found locally; using npx", spec)
+        return command, args
+    _write_cache(cache_path, key, binary)
+    logger.info("Resolved MCP server %s to %s", spec, binary)
+    return binary, server_args
+
+
+def _find_binary(name: str, version: str | None, npm_cache_dir: str | None) -> str | None:
+    bin_name = name.rsplit("/", 1)[-1]
+    if version is None:
+        on_path = shutil.which(bin_name)
+        if on_path:
+            return on_path
+    env_cache = next((os.environ[name] for name in _NPM_CACHE_ENV_VARS if os.environ.get(name)), None)
+    cache_root = Path(npm_cache_dir or env_cache or Path.home() / ".npm")
+    for install in sorted((cache_root / "_npx").glob("*/node_modules"), key=_mtime, reverse=True):
+        candidate = install / ".bin" / bin_name
+        if not os.access(candidate, os.X_OK):
+            continue
+        if version is not None and _installed_version(install / name) != version:
+            continue
+        return str(candidate)
+    return None
+
+
+def _installed_version(package_dir: Path) -> str | None:
+    try:
+        return json.loads((package_dir / "package.json").read_text()).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _read_cache(cache_path: str) -> dict[str, str]:
+    try:
+        return json.loads(Path(cache_path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_path: str, key: str, binary: str) -> None:
+    entries = _read_cache(cache_path)
+    entries[key] = binary
+    try:
+        path = Path(cache_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(entries, indent=2))
+    except OSError as exc:
+        logger.warning("Could not cache MCP server binary path: %s", exc)
@@ -26,6 +26,10 @@ class GraphState(TypedDict):
         Whether a database read is required.
     rag_context : str
         Retrieved document chunks (populated by retrieve_context tool).
+    rag_similarity : float | None
+        Highest cosine similarity between the query and retrieved chunks.
+    speculative_rag : SpeculativeRetrieval | None
+        Background retrieval started by the router (speculative mode).
     web_context : str
         Web search results (populated by web_search tool).
     db_context : dict[str, Any]
@@ -66,6 +70,8 @@ class GraphState(TypedDict):
     needs_web: bool
     needs_db: bool
     rag_context: str
+    rag_similarity: float | None
+    speculative_rag: Any
     web_context: str
     db_context: dict[str, Any]
     last_intent: str | None
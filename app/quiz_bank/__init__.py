@@ -0,0 +1 @@
+"""Pre-generated quiz bank: serving, stats and the background refill worker."""
@@ -0,0 +1,151 @@
+"""Serve pre-generated quizzes from the quiz_bank table and track demand."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.quiz import QuizOutput
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+MIN_BANK_QUESTIONS = 3
+# Demand is tracked for at most this many topics; counts halve on every
+# refill pass so topics nobody asks about any more fall out.
+MAX_DEMAND_TOPICS = 256
+
+
+class QuizBankStats:
+    """Hit/miss counters, served-quiz staleness and refill bookkeeping."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses: Counter[str] = Counter()
+        self.generated = 0
+        self.rejected = 0
+        self.served_age_total = 0.0
+        self.served_age_max = 0.0
+        self.last_refill_at: float | None = None
+        self.last_refill_seconds: float | None = None
+        self.demand: Counter[tuple[int, str]] = Counter()
+
+    def record_hit(self, age_seconds: float) -> None:
+        with self._lock:
+            self.hits += 1
+            self.served_age_total += age_seconds
+            self.served_age_max = max(self.served_age_max, age_seconds)
+
+    def record_miss(self, reason: str) -> None:
+        with self._lock:
+            self.misses[reason] += 1
+
+    def record_demand(self, topic_id: int, topic_name: str) -> None:
+        with self._lock:
+            self.demand[(topic_id, topic_name)] += 1
+            if len(self.demand) > MAX_DEMAND_TOPICS:
+                self.demand = Counter(dict(self.demand.most_common(MAX_DEMAND_TOPICS)))
+
+    def record_refill(self, started: float, generated: int, rejected: int) -> None:
+        with self._lock:
+            self.generated += generated
+            self.rejected += rejected
+            self.last_refill_at = time.time()
+            self.last_refill_seconds = time.monotonic() - started
+            self.demand = Counter({key: count // 2 for key, count in self.demand.items() if count > 1})
+
+    def top_demand(self, limit: int) -> list[tuple[int, str]]:
+        with self._lock:
+            return [key for key, _count in self.demand.most_common(limit)]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + sum(self.misses.values())
+            return {
+                "enabled": settings.quiz_bank_enabled,
+                "hits": self.hits,
+                "misses": dict(self.misses),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "served_age_seconds_avg": (
+                    round(self.served_age_total / self.hits, 1) if self.hits else None
+                ),
+                "served_age_seconds_max": round(self.served_age_max, 1),
+                "generated": self.generated,
+                "rejected": self.rejected,
+                "demand_topics": len(self.demand),
+                "last_refill_at": self.last_refill_at,
+                "last_refill_seconds": self.last_refill_seconds,
+                "seconds_since_refill": (
+                    round(time.time() - self.last_refill_at, 1) if self.last_refill_at else None
+                ),
+            }
+
+
+quiz_bank_stats = QuizBankStats()
+register_metrics("quiz_bank", quiz_bank_stats.snapshot)
+
+
+def take_quiz(
+    repo,
+    topic_id: int | None,
+    topic_name: str,
+    has_wrong_questions: bool,
+    *,
+    question_count: int | None = None,
+    custom_format: bool = False,
+) -> dict[str, Any] | None:
+    """Claim a ready quiz for the topic, or None to fall back to live generation.
+
+    Quizzes that must re-include previously wrong questions are always
+    generated live, since a bank quiz cannot contain them. Bank quizzes are
+    multiple choice, so requests for another format are generated live too,
+    and a requested ``question_count`` only matches entries of that length.
+    """
+    if not settings.quiz_bank_enabled or not topic_id:
+        return None
+    quiz_bank_stats.record_demand(topic_id, topic_name)
+    if has_wrong_questions:
+        quiz_bank_stats.record_miss("wrong_questions")
+        return None
+    if custom_format:
+        quiz_bank_stats.record_miss("format")
+        return None
+    try:
+        row = repo.take_bank_quiz(
+            topic_id, settings.quiz_bank_max_age_seconds, question_count=question_count
+        )
+    except Exception:
+        logger.exception("Quiz bank lookup failed for topic_id=%s", topic_id)
+        quiz_bank_stats.record_miss("error")
+        return None
+    if not row:
+        quiz_bank_stats.record_miss("question_count" if question_count else "empty")
+        return None
+    quiz_bank_stats.record_hit(float(row.get("age_seconds") or 0.0))
+    logger.info("Quiz bank hit: topic_id=%s quiz_id=%s", topic_id, row.get("quiz_id"))
+    return row["quiz"]
+
+
+def validate_bank_quiz(quiz: QuizOutput) -> bool:
+    """Reject quizzes too short to serve or with blank/duplicate options."""
+    if len(quiz.questions) < MIN_BANK_QUESTIONS:
+        return False
+    for item in quiz.questions:
+        options = [option.strip().lower() for option in item.options]
+        if not item.question.strip() or not all(options) or len(set(options)) != len(options):
+            return False
+    return True
+
+
+def parse_bank_quiz(quiz: dict[str, Any]) -> QuizOutput | None:
+    try:
+        return QuizOutput.model_validate(quiz)
+    except ValidationError:
+        return None
@@ -0,0 +1,148 @@
+"""Background worker that keeps the quiz bank topped up per topic."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.db.repository_factory import get_repository
+from app.llm.ollama_client import get_chat_model
+from app.prompts.quiz import QUIZ_GENERATE_JSON_SYSTEM_PROMPT, QUIZ_GENERATE_USER_PROMPT
+from app.quiz_bank.bank import quiz_bank_stats, validate_bank_quiz
+from app.rag.retriever import search_with_similarity
+from app.schemas.quiz import QuizOutput
+from app.utils.llm_helpers import async_invoke_llm
+from app.utils.llm_parse import parse_json_with_schema
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class QuizBankWorker:
+    """Periodically pre-generate validated quizzes for likely topics.
+
+    Candidate topics, in priority order: topics requested recently on this
+    worker, the weakest topics by quiz score (``get_weak_topics``) and the
+    top-level sections of the knowledge base. Each candidate is refilled to
+    ``quiz_bank_target_per_topic`` fresh, unserved quizzes. Generation runs
+    one quiz at a time so live traffic keeps priority on Ollama.
+    """
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="quiz-bank-worker")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Quiz bank refill failed")
+            await asyncio.sleep(settings.quiz_bank_refill_interval_seconds)
+
+    async def refill_once(self, repo=None) -> int:
+        """Run one refill pass; returns the number of quizzes stored."""
+        started = time.monotonic()
+        repo = repo or get_repository()
+        max_age = settings.quiz_bank_max_age_seconds
+        await asyncio.to_thread(repo.purge_bank_quizzes, max_age)
+        candidates = await asyncio.to_thread(self._candidate_topics, repo)
+        generated = rejected = 0
+        for topic_id, topic_name in candidates:
+            available = await asyncio.to_thread(repo.count_bank_quizzes, topic_id, max_age)
+            for _ in range(settings.quiz_bank_target_per_topic - available):
+                quiz = await generate_bank_quiz(topic_name)
+                if quiz is None:
+                    rejected += 1
+                    continue
+                await asyncio.to_thread(repo.add_bank_quiz, topic_id, quiz.model_dump())
+                generated += 1
+        quiz_bank_stats.record_refill(started, generated, rejected)
+        logger.info(
+            "Quiz bank refill: topics=%d generated=%d rejected=%d",
+            len(candidates), generated, rejected,
+        )
+        return generated
+
+    def _candidate_topics(self, repo) -> list[tuple[int, str]]:
+        limit = settings.quiz_bank_max_topics
+        candidates: dict[str, int] = {}
+        for topic_id, name in quiz_bank_stats.top_demand(limit):
+            candidates.setdefault(name, topic_id)
+        for row in repo.get_weak_topics(limit) or []:
+            if row.get("topic_id") and row.get("name"):
+                candidates.setdefault(row["name"], int(row["topic_id"]))
+        if settings.quiz_bank_include_kb_sections:
+            for name in kb_section_topics(settings.kb_dir):
+                if len(candidates) >= limit:
+                    break
+                if name not in candidates:
+                    topic_id = repo.upsert_topic(name)
+                    if topic_id:
+                        candidates[name] = topic_id
+        return [(topic_id, name) for name, topic_id in list(candidates.items())[:limit]]
+
+
+def kb_section_topics(kb_dir: str) -> list[str]:
+    """Return the first ``# `` heading of each knowledge-base markdown file."""
+    topics: list[str] = []
+    for path in sorted(Path(kb_dir).glob("*.md")):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if line.startswith("# "):
+                topics.append(line[2:].strip())
+                break
+    return topics
+
+
+async def generate_bank_quiz(topic_name: str) -> QuizOutput | None:
+    """Generate one structured quiz for a topic; None if it fails validation."""
+    rag_context = await asyncio.to_thread(_topic_context, topic_name)
+    prompt = QUIZ_GENERATE_JSON_SYSTEM_PROMPT + "\n\n" + QUIZ_GENERATE_USER_PROMPT.format(
+        user_input=f"Quiz me on {topic_name}",
+        rag_context=rag_context,
+        wrong_questions="None",
+    )
+    llm = get_chat_model("quiz", output_schema=QuizOutput)
+    content = await async_invoke_llm(prompt, llm, cache=False)
+    try:
+        quiz = parse_json_with_schema(content, QuizOutput)
+    except (json.JSONDecodeError, ValidationError):
+        logger.info("Quiz bank: rejected unparseable quiz for topic=%s", topic_name)
+        return None
+    if not validate_bank_quiz(quiz):
+        logger.info("Quiz bank: rejected invalid quiz for topic=%s", topic_name)
+        return None
+    return quiz
+
+
+def _topic_context(topic_name: str) -> str:
+    try:
+        docs, similarity = search_with_similarity(topic_name)
+    except Exception:
+        logger.exception("Quiz bank: KB lookup failed for topic=%s", topic_name)
+        return ""
+    if not docs or similarity is None or similarity < settings.rag_relevance_threshold:
+        return ""
+    return "\n\n".join(doc.page_content.strip() for doc in docs)
+
+
+quiz_bank_worker = QuizBankWorker()
@@ -1,10 +1,58 @@
 """ChromaDB retriever factory."""
 
+from __future__ import annotations
+
+import logging
+
+import chromadb
+import numpy as np
+from chromadb.errors import NotFoundError
 from langchain_chroma import Chroma
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+from langchain_core.documents import Document
 
 from app.config import settings
 from app.llm.ollama_client import get_embeddings
 
+logger = logging.getLogger("uvicorn.error")
+
+# search_type="mmr" (Maximal Marginal Relevance) balances relevance with
+# diversity so retrieved chunks cover different aspects of the query.
+# fetch_k=12 fetches twice as many candidates as the final k=6 to give
+# the MMR re-ranker enough material to select diverse results from.
+_K = 6
+_FETCH_K = 12
+
+
+def _chroma_client():
+    return chromadb.PersistentClient(path=settings.chroma_persist_dir)
+
+
+def get_vectorstore() -> Chroma:
+    """Return the Chroma knowledge-base collection wired to Ollama embeddings."""
+    return Chroma(
+        collection_name=settings.chroma_collection,
+        client=_chroma_client(),
+        embedding_function=get_embeddings(),
+    )
+
+
+def get_collection():
+    """Return the raw ``chromadb`` collection behind ``get_vectorstore()``.
+
+    Embeddings are computed by the caller (Ollama), so no embedding function
+    is attached. Read-only: returns ``None`` when the knowledge base has not
+    been ingested yet instead of creating an empty collection.
+    """
+    try:
+        return _chroma_client().get_collection(settings.chroma_collection, embedding_function=None)
+    except NotFoundError:
+        logger.warning(
+            "Chroma collection '%s' not found in %s; run ingestion to enable RAG",
+            settings.chroma_collection, settings.chroma_persist_dir,
+        )
+        return None
+
 
 def get_retriever():
     """Create and return a LangChain retriever backed by ChromaDB.
@@ -14,17 +62,55 @@ def get_retriever():
     langchain_core.retrievers.BaseRetriever
         A retriever configured to query the knowledge-base collection.
     """
-    embeddings = get_embeddings()
-    chroma = Chroma(
-        collection_name=settings.chroma_collection,
-        persist_directory=settings.chroma_persist_dir,
-        embedding_function=embeddings,
-    )
-    # search_type="mmr" (Maximal Marginal Relevance) balances relevance with
-    # diversity so retrieved chunks cover different aspects of the query.
-    # fetch_k=12 fetches twice as many candidates as the final k=6 to give
-    # the MMR re-ranker enough material to select diverse results from.
-    return chroma.as_retriever(
+    return get_vectorstore().as_retriever(
         search_type="mmr",
-        search_kwargs={"k": 6, "fetch_k": 12},
+        search_kwargs={"k": _K, "fetch_k": _FETCH_K},
     )
+
+
+def search_with_similarity(
+    query: str, *, collection=None, embeddings=None
+) -> tuple[list[Document], float | None]:
+    """MMR search that also reports how similar the best chunk is to the query.
+
+    Performs the same query-embedding + MMR selection as ``get_retriever()``
+    but queries the ``chromadb`` collection directly for the candidate
+    embeddings, so the cosine similarity between the query and the selected
+    chunks comes for free (no extra embedding or LLM call).
+
+    Returns
+    -------
+    tuple[list[Document], float | None]
+        Selected documents and the highest query/chunk cosine similarity, or
+        ``None`` when nothing was retrieved (or the collection does not exist).
+    """
+    collection = collection or get_collection()
+    if collection is None:
+        return [], None
+    embeddings = embeddings or get_embeddings()
+    query_embedding = np.array(embeddings.embed_query(query), dtype=np.float32)
+    results = collection.query(
+        query_embeddings=[query_embedding.tolist()],
+        n_results=_FETCH_K,
+        include=["metadatas", "documents", "embeddings"],
+    )
+    documents = (results.get("documents") or [[]])[0]
+    if not documents:
+        return [], None
+    metadatas = (results.get("metadatas") or [[]])[0] or [None] * len(documents)
+    candidate_embeddings = np.array(results["embeddings"][0], dtype=np.float32)
+
+    selected = maximal_marginal_relevance(query_embedding, candidate_embeddings, k=_K)
+    docs = [
+        Document(page_content=documents[idx], metadata=metadatas[idx] or {})
+        for idx in selected
+    ]
+    similarity = max(_cosine(query_embedding, candidate_embeddings[idx]) for idx in selected)
+    return docs, similarity
+
+
+def _cosine(left: np.ndarray, right: np.ndarray) -> float:
+    denominator = float(np.linalg.norm(left) * np.linalg.norm(right))
+    if denominator == 0.0:
+        return 0.0
+    return float(np.dot(left, right) / denominator)
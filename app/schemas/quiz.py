@@ -0,0 +1,17 @@
+"""Schemas for structured quiz generation output."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class QuizQuestion(BaseModel):
+    question: str
+    options: list[str] = Field(min_length=4, max_length=4)
+    answer: Literal["A", "B", "C", "D"]
+
+
+class QuizOutput(BaseModel):
+    questions: list[QuizQuestion] = Field(min_length=1)
@@ -0,0 +1 @@
+"""Per-session conversation state storage."""
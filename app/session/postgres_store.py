@@ -0,0 +1,110 @@
+"""PostgreSQL-backed session store shared by all workers and hosts."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import zlib
+from typing import Any
+
+import psycopg2
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from app.db import repository as psycopg_repo
+from app.db.errors import DBTimeoutError
+from app.session.store import SessionState
+
+logger = logging.getLogger(__name__)
+
+# msgpack keeps int dict keys (quiz answer keys, plan_items by plan_id) and
+# dates intact, which a JSON round-trip would not.
+_SERDE = JsonPlusSerializer()
+# Expired rows are deleted at most this often, on the write path.
+_PURGE_INTERVAL_SECONDS = 300.0
+
+
+class PostgresSessionStore:
+    """Session store persisting each session's state as one ``BYTEA`` row.
+
+    Session ids are allocated from the ``sessions`` table, so ids are unique
+    across every worker process and host that shares the database. Like the
+    in-memory store, entries expire after ``ttl_seconds`` without access:
+    reads and writes slide ``expires_at`` forward, expired rows are invisible
+    to ``get`` and are deleted by :meth:`purge_expired`, which ``put`` runs
+    periodically.
+    """
+
+    def __init__(self, *, ttl_seconds: float, clock=time.monotonic) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._bytes_written = 0
+        self._purged = 0
+        self._last_purge = clock()
+
+    def create_session(self) -> int:
+        return psycopg_repo.create_session()
+
+    def get(self, session_id: int) -> SessionState | None:
+        row = psycopg_repo.load_session_state(session_id, self._ttl_seconds)
+        with self._lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return decode_state(*row) if row is not None else None
+
+    def put(self, session_id: int, state: SessionState) -> None:
+        serde_type, blob = encode_state(state)
+        psycopg_repo.save_session_state(session_id, serde_type, blob, self._ttl_seconds)
+        with self._lock:
+            self._writes += 1
+            self._bytes_written += len(blob)
+            purge_due = self._clock() - self._last_purge >= _PURGE_INTERVAL_SECONDS
+            if purge_due:
+                self._last_purge = self._clock()
+        if purge_due:
+            try:
+                self.purge_expired()
+            except (psycopg2.Error, DBTimeoutError) as exc:
+                logger.warning("Session state purge failed: %s", exc)
+
+    def delete(self, session_id: int) -> None:
+        psycopg_repo.delete_session_state(session_id)
+
+    def purge_expired(self) -> int:
+        """Delete rows idle for longer than the TTL; returns the number removed."""
+        purged = psycopg_repo.purge_expired_session_states()
+        with self._lock:
+            self._purged += purged
+        return purged
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "postgres",
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "bytes_written": self._bytes_written,
+                "purged": self._purged,
+            }
+
+
+def encode_state(state: SessionState) -> tuple[str, bytes]:
+    """Serialize a session state to ``(serde type tag, compressed payload)``.
+
+    The tag is usually ``msgpack`` but the serializer may fall back to another
+    encoding, so it is stored alongside the blob.
+    """
+    serde_type, payload = _SERDE.dumps_typed(state)
+    return serde_type, zlib.compress(payload)
+
+
+def decode_state(serde_type: str, blob: bytes) -> SessionState:
+    """Inverse of ``encode_state``."""
+    return _SERDE.loads_typed((serde_type, zlib.decompress(blob)))
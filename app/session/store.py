@@ -0,0 +1,151 @@
+"""Session state store interface and the in-memory LRU/TTL implementation."""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+SessionState = dict[str, Any]
+
+
+class SessionStore(Protocol):
+    """Storage for the state carried between turns of one chat session.
+
+    A session state holds ``last_intent``, ``last_db_context``, ``quiz_state``
+    and ``plan_draft``.
+    """
+
+    def create_session(self) -> int: ...
+
+    def get(self, session_id: int) -> SessionState | None: ...
+
+    def put(self, session_id: int, state: SessionState) -> None: ...
+
+    def delete(self, session_id: int) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class InMemorySessionStore:
+    """Bounded in-process store with LRU, idle-TTL and byte-budget eviction.
+
+    Entries are ordered by last access. ``put`` evicts the least recently
+    used sessions until both ``max_entries`` and ``max_bytes`` hold; ``get``
+    drops entries idle for longer than ``ttl_seconds``. Entry size is the
+    length of the entry's JSON encoding, which tracks the dominant cost
+    (quiz text and cached DB rows) closely enough for budgeting.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        max_bytes: int,
+        clock=time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        self._clock = clock
+        # session_id -> (state, size_bytes, last_access)
+        self._entries: OrderedDict[int, tuple[SessionState, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {"lru": 0, "ttl": 0, "bytes": 0}
+        self._counter = itertools.count(1)
+
+    def create_session(self) -> int:
+        """Allocate a process-local session id (not unique across workers)."""
+        return next(self._counter)
+
+    def get(self, session_id: int) -> SessionState | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self._misses += 1
+                return None
+            state, size, last_access = entry
+            now = self._clock()
+            if now - last_access > self._ttl_seconds:
+                self._remove(session_id)
+                self._evictions["ttl"] += 1
+                self._misses += 1
+                return None
+            self._entries[session_id] = (state, size, now)
+            self._entries.move_to_end(session_id)
+            self._hits += 1
+            # Callers (graph nodes) mutate db_context in place; hand out a copy
+            # so the stored entry and its accounted size stay in sync.
+            return copy.deepcopy(state)
+
+    def put(self, session_id: int, state: SessionState) -> None:
+        stored = copy.deepcopy(state)
+        size = _estimate_size(stored)
+        with self._lock:
+            self._remove(session_id)
+            self._entries[session_id] = (stored, size, self._clock())
+            self._bytes += size
+            self._evict_expired()
+            self._evict_over_budget()
+
+    def delete(self, session_id: int) -> None:
+        with self._lock:
+            self._remove(session_id)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self._max_entries,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": dict(self._evictions),
+            }
+
+    def _remove(self, session_id: int) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict_expired(self) -> None:
+        # Entries are in last-access order, so expired ones sit at the front.
+        now = self._clock()
+        while self._entries:
+            session_id, (_, _, last_access) = next(iter(self._entries.items()))
+            if now - last_access <= self._ttl_seconds:
+                break
+            self._remove(session_id)
+            self._evictions["ttl"] += 1
+
+    def _evict_over_budget(self) -> None:
+        # The entry just written sits at the back, so it is evicted last.
+        while len(self._entries) > 1 and (
+            len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+        ):
+            reason = "lru" if len(self._entries) > self._max_entries else "bytes"
+            self._remove(next(iter(self._entries)))
+            self._evictions[reason] += 1
+        if self._bytes > self._max_bytes:
+            logger.warning(
+                "Session state of %d bytes exceeds the %d byte budget",
+                self._bytes,
+                self._max_bytes,
+            )
+
+def _estimate_size(state: SessionState) -> int:
+    return len(json.dumps(state, default=str, ensure_ascii=False).encode("utf-8"))
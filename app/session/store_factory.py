@@ -0,0 +1,25 @@
+"""Session store backend selection."""
+
+from __future__ import annotations
+
+from app.config import settings
+from app.session.postgres_store import PostgresSessionStore
+from app.session.store import InMemorySessionStore, SessionStore
+from app.utils.metrics import register_metrics
+
+
+def get_session_store() -> SessionStore:
+    """Build the session store configured by ``SESSION_STORE_BACKEND``."""
+    backend = settings.session_store_backend.lower()
+    if backend == "postgres":
+        store: SessionStore = PostgresSessionStore(ttl_seconds=settings.session_ttl_seconds)
+    elif backend == "memory":
+        store = InMemorySessionStore(
+            max_entries=settings.session_max_entries,
+            ttl_seconds=settings.session_ttl_seconds,
+            max_bytes=settings.session_max_bytes,
+        )
+    else:
+        raise ValueError(f"Unknown session store backend: {settings.session_store_backend}")
+    register_metrics("session_store", store.stats)
+    return store
@@ -10,6 +10,8 @@ ErrorCode = Literal[
     "conflict",
     "unknown_tool",
     "db_error",
+    "db_timeout",
+    "db_write_unconfirmed",
     "permission_denied",
 ]
 
@@ -116,12 +116,17 @@ class SaveMessageInput(BaseToolModel):
 
 class QuizPreFetchInput(BaseToolModel):
     topic_name: str = Field(min_length=1)
+    # Requested quiz shape; bank quizzes are only served when they match it.
+    question_count: int | None = Field(default=None, ge=1)
+    custom_format: bool = False
 
 
 class QuizPostSaveInput(BaseToolModel):
     topic_id: int = Field(ge=1)
     wrong_answers: list[dict[str, Any]] = Field(default_factory=list)
     correct_retries: list[int] = Field(default_factory=list)
+    # Idempotency key of a queued save; attempts are stored as "<key>:<n>".
+    save_key: str | None = Field(default=None, min_length=1, max_length=64)
 
     @field_validator("correct_retries")
     @classmethod
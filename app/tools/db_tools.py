@@ -8,7 +8,9 @@ from typing import Any, get_args, get_origin
 
 from pydantic import BaseModel, ConfigDict, ValidationError
 
+from app.db.errors import DBOutcomeUnknownError, DBTimeoutError
 from app.db.repository_factory import get_repository
+from app.quiz_bank import bank as quiz_bank
 from app.tools import db_tool_models as m
 from app.tools.contracts import ToolResult, err, ok
 from app.tools.tool_registry import ToolSpec, get_tool, list_tools, register_tool
@@ -31,7 +33,19 @@ def _not_found(entity_type: str, query: dict[str, Any]) -> ToolResult:
     )
 
 
-def _db_error(exc: Exception) -> ToolResult:
+def _db_error(exc: Exception, *, replay_safe: bool = True) -> ToolResult:
+    if isinstance(exc, DBOutcomeUnknownError) and not replay_safe:
+        # The abandoned MCP statement may still commit, so retrying the write
+        # could apply it twice.
+        return err(
+            "db_write_unconfirmed",
+            "Database write timed out and may or may not have been applied",
+            {"exception": str(exc), "retryable": False},
+        )
+    if isinstance(exc, DBTimeoutError):
+        # Retryable: the statement was cancelled or never ran, or it is a read
+        # or an idempotent write.
+        return err("db_timeout", "Database call timed out", {"exception": str(exc), "retryable": True})
     return err("db_error", "Database error", {"exception": str(exc)})
 
 
@@ -79,9 +93,9 @@ def _strip_extras(model: type[BaseModel], payload: Any) -> Any:
 # --- Tool registration ---
 
 
-def tool(name: str, model: type[m.BaseToolModel]):
+def tool(name: str, model: type[m.BaseToolModel], *, writes: bool = False):
     def _wrap(fn):
-        register_tool(ToolSpec(name, model, fn))
+        register_tool(ToolSpec(name, model, fn, writes))
         return fn
 
     return _wrap
@@ -101,22 +115,28 @@ def _list_plan_items(repo, db_context: dict[str, Any], data: m.ListPlanItemsInpu
     return _list_plan_items_impl(repo, db_context, data.plan_id, data.plan_title)
 
 
-@tool("write_plan", m.WritePlanInput)
+@tool("write_plan", m.WritePlanInput, writes=True)
 def _write_plan(repo, db_context: dict[str, Any], data: m.WritePlanInput) -> ToolResult:
-    plan_id = repo.create_plan(data.title)
-    for item in data.items:
-        repo.add_plan_item(
-            plan_id=plan_id,
-            title=item.title,
-            topic_id=None,
-            due_date=item.due_date or None,
-            notes=item.notes or None,
-        )
+    created = repo.create_plan_with_items(
+        data.title,
+        [
+            {
+                "title": item.title,
+                "topic_id": None,
+                "due_date": item.due_date or None,
+                "notes": item.notes or None,
+            }
+            for item in data.items
+        ],
+    )
+    if created is None:
+        return err("db_error", "Plan was not created")
+    plan_id = created["plan_id"]
     db_context["created_plan_id"] = plan_id
     return ok({"created_plan_id": plan_id})
 
 
-@tool("add_plan_item", m.AddPlanItemInput)
+@tool("add_plan_item", m.AddPlanItemInput, writes=True)
 def _add_plan_item(repo, _db_context: dict[str, Any], data: m.AddPlanItemInput) -> ToolResult:
     plan_id = data.plan_id
     if plan_id == "latest":
@@ -133,7 +153,7 @@ def _add_plan_item(repo, _db_context: dict[str, Any], data: m.AddPlanItemInput)
     return ok({"item_id": item_id})
 
 
-@tool("update_item_status", m.UpdateItemStatusInput)
+@tool("update_item_status", m.UpdateItemStatusInput, writes=True)
 def _update_item_status(repo, db_context: dict[str, Any], data: m.UpdateItemStatusInput) -> ToolResult:
     if data.item_id is not None:
         repo.update_plan_item_status(data.item_id, data.status)
@@ -162,19 +182,19 @@ def _update_item_status(repo, db_context: dict[str, Any], data: m.UpdateItemStat
     return ok({"item_id": item_id, "status": data.status})
 
 
-@tool("update_plan_status", m.UpdatePlanStatusInput)
+@tool("update_plan_status", m.UpdatePlanStatusInput, writes=True)
 def _update_plan_status(repo, db_context: dict[str, Any], data: m.UpdatePlanStatusInput) -> ToolResult:
     plan_id, candidates = _resolve_plan_from_args(repo, db_context, data.plan_id, data.plan_title)
     if candidates and plan_id is None:
         return _conflict("plan", candidates)
     if plan_id is not None:
-        for item in repo.get_plan_items(plan_id):
-            repo.update_plan_item_status(item["item_id"], data.status)
+        item_ids = repo.update_plan_items_status(plan_id, data.status)
+        db_context["updated_item_ids"] = item_ids
         return ok({"plan_id": plan_id, "status": data.status})
     return _not_found("plan", {"plan_id": data.plan_id, "plan_title": data.plan_title})
 
 
-@tool("save_quiz_attempt", m.SaveQuizAttemptInput)
+@tool("save_quiz_attempt", m.SaveQuizAttemptInput, writes=True)
 def _save_quiz_attempt(repo, _db_context: dict[str, Any], data: m.SaveQuizAttemptInput) -> ToolResult:
     attempt_id = repo.save_quiz_attempt(
         topic_id=data.topic_id,
@@ -195,7 +215,7 @@ def _get_wrong_questions(repo, db_context: dict[str, Any], data: m.GetWrongQuest
     return ok({"wrong_questions": questions})
 
 
-@tool("delete_quiz_attempt", m.DeleteQuizAttemptInput)
+@tool("delete_quiz_attempt", m.DeleteQuizAttemptInput, writes=True)
 def _delete_quiz_attempt(repo, _db_context: dict[str, Any], data: m.DeleteQuizAttemptInput) -> ToolResult:
     repo.delete_quiz_attempt(data.attempt_id)
     return ok({"deleted_attempt_id": data.attempt_id})
@@ -215,7 +235,7 @@ def _get_due_flashcards(repo, db_context: dict[str, Any], data: m.GetDueFlashcar
     return ok({"due_flashcards": cards})
 
 
-@tool("create_flashcard", m.CreateFlashcardInput)
+@tool("create_flashcard", m.CreateFlashcardInput, writes=True)
 def _create_flashcard(repo, _db_context: dict[str, Any], data: m.CreateFlashcardInput) -> ToolResult:
     card_id = repo.create_flashcard(
         topic_id=data.topic_id,
@@ -225,7 +245,7 @@ def _create_flashcard(repo, _db_context: dict[str, Any], data: m.CreateFlashcard
     return ok({"card_id": card_id})
 
 
-@tool("update_flashcard_review", m.UpdateFlashcardReviewInput)
+@tool("update_flashcard_review", m.UpdateFlashcardReviewInput, writes=True)
 def _update_flashcard_review(repo, _db_context: dict[str, Any], data: m.UpdateFlashcardReviewInput) -> ToolResult:
     repo.update_flashcard_review(
         card_id=data.card_id,
@@ -242,7 +262,7 @@ def _get_messages(repo, db_context: dict[str, Any], data: m.GetMessagesInput) ->
     return ok({"messages": messages})
 
 
-@tool("save_message", m.SaveMessageInput)
+@tool("save_message", m.SaveMessageInput, writes=True)
 def _save_message(repo, _db_context: dict[str, Any], data: m.SaveMessageInput) -> ToolResult:
     msg_id = repo.save_message(
         session_id=data.session_id,
@@ -252,58 +272,52 @@ def _save_message(repo, _db_context: dict[str, Any], data: m.SaveMessageInput) -
     return ok({"message_id": msg_id})
 
 
-@tool("quiz_pre_fetch", m.QuizPreFetchInput)
+@tool("quiz_pre_fetch", m.QuizPreFetchInput, writes=True)
 def _quiz_pre_fetch(repo, db_context: dict[str, Any], data: m.QuizPreFetchInput) -> ToolResult:
     topic_id = repo.upsert_topic(data.topic_name)
     wrong_questions = repo.get_wrong_questions(topic_id) if topic_id else []
+    bank_quiz = quiz_bank.take_quiz(
+        repo,
+        topic_id,
+        data.topic_name,
+        bool(wrong_questions),
+        question_count=data.question_count,
+        custom_format=data.custom_format,
+    )
     db_context["wrong_questions"] = wrong_questions
     db_context["quiz_topic_id"] = topic_id
     db_context["quiz_topic_name"] = data.topic_name
+    db_context["bank_quiz"] = bank_quiz
     return ok(
         {
             "topic_id": topic_id,
             "topic_name": data.topic_name,
             "wrong_questions": wrong_questions,
+            "bank_quiz": bank_quiz,
         }
     )
 
 
-@tool("quiz_post_save", m.QuizPostSaveInput)
+@tool("quiz_post_save", m.QuizPostSaveInput, writes=True)
 def _quiz_post_save(repo, _db_context: dict[str, Any], data: m.QuizPostSaveInput) -> ToolResult:
-    saved_wrong = 0
-    deleted_correct = 0
-    failed_wrong = 0
-    failed_correct = 0
-    for entry in data.wrong_answers:
-        try:
+    # One unit of work: either every result is recorded or none is. That
+    # alone does not make a retry safe -- a timed-out MCP call may still have
+    # committed on the server -- so queued saves carry a save_key and each
+    # attempt row is keyed by it; a replay inserts nothing it already stored.
+    # Failures surface as db_error through execute_tool.
+    with repo.transaction():
+        for index, entry in enumerate(data.wrong_answers):
             repo.save_quiz_attempt(
                 topic_id=data.topic_id,
                 question=entry.get("question", ""),
                 user_answer=entry.get("user_answer"),
                 score=0.0,
                 feedback=None,
+                save_key=f"{data.save_key}:{index}" if data.save_key else None,
             )
-            saved_wrong += 1
-        except Exception:
-            failed_wrong += 1
-    for attempt_id in data.correct_retries:
-        try:
+        for attempt_id in data.correct_retries:
             repo.delete_quiz_attempt(attempt_id)
-            deleted_correct += 1
-        except Exception:
-            failed_correct += 1
-    if failed_wrong or failed_correct:
-        return err(
-            "db_error",
-            "Failed to save some quiz results",
-            {
-                "saved_wrong": saved_wrong,
-                "deleted_correct": deleted_correct,
-                "failed_wrong": failed_wrong,
-                "failed_correct": failed_correct,
-            },
-        )
-    return ok({"saved_wrong": saved_wrong, "deleted_correct": deleted_correct})
+    return ok({"saved_wrong": len(data.wrong_answers), "deleted_correct": len(data.correct_retries)})
 
 
 def execute_tool(
@@ -330,7 +344,9 @@ def execute_tool(
     try:
         return spec.handler(repo, db_context, data)
     except Exception as exc:
-        return _db_error(exc)
+        # Writes keyed by a save_key are idempotent and may be replayed.
+        replay_safe = not spec.writes or getattr(data, "save_key", None) is not None
+        return _db_error(exc, replay_safe=replay_safe)
 
 
 def _list_plan_items_impl(repo, db_context: dict[str, Any], plan_id: Any, plan_title: str | None) -> ToolResult:
@@ -1,16 +1,119 @@
 """RAG retrieval tool node."""
 
+import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
-from app.rag.retriever import get_retriever
+from app.rag.retriever import search_with_similarity
 
+from app.config import settings
 from app.models.state import GraphState
+from app.utils.constants import HAS_QUIZ_ANSWERS_RE
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class SpeculationStats:
+    """Counters for speculative retrieval: how much of it the router used."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = 0
+        self.consumed = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.consumed_seconds = 0.0
+
+    def record_run(self, seconds: float) -> None:
+        with self._lock:
+            self.started += 1
+            self.total_seconds += seconds
+
+    def record_consumed(self, seconds: float) -> None:
+        with self._lock:
+            self.consumed += 1
+            self.consumed_seconds += seconds
+
+    def record_skipped(self) -> None:
+        with self._lock:
+            self.skipped += 1
+
+    def record_cancelled(self) -> None:
+        with self._lock:
+            self.cancelled += 1
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            wasted = self.started - self.consumed
+            return {
+                "started": self.started,
+                "consumed": self.consumed,
+                "wasted": wasted,
+                "wasted_ratio": round(wasted / self.started, 3) if self.started else None,
+                "wasted_seconds": round(self.total_seconds - self.consumed_seconds, 3),
+                "skipped": self.skipped,
+                "cancelled": self.cancelled,
+                "errors": self.errors,
+            }
+
+
+speculation_stats = SpeculationStats()
+register_metrics("speculative_rag", speculation_stats.snapshot)
+
+# Speculative searches run here, off the graph's own path, so nothing in the
+# graph waits for one unless retrieve_context actually needs its result.
+_SPECULATION_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-rag")
+
+
+class SpeculativeRetrieval:
+    """Retrieval for ``query`` running in the background while the router decides.
+
+    The router keeps it in ``speculative_rag`` when it sets ``needs_rag`` and
+    ``retrieve_context_node`` waits for the result; otherwise it is discarded:
+    a search still queued is cancelled, and one already running finishes in
+    the background and is counted as wasted.
+    """
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.seconds = 0.0
+        self._future = _SPECULATION_POOL.submit(self._run)
+
+    def _run(self) -> dict | None:
+        started = time.monotonic()
+        try:
+            result = _retrieve(self.query)
+        except Exception:
+            speculation_stats.record_error()
+            logger.exception("Speculative retrieval failed")
+            return None
+        self.seconds = time.monotonic() - started
+        speculation_stats.record_run(self.seconds)
+        return result
+
+    def result(self) -> dict | None:
+        """Block until the search finishes; ``None`` if it failed."""
+        return self._future.result()
+
+    def discard(self) -> None:
+        if self._future.cancel():
+            speculation_stats.record_cancelled()
 
 
 def retrieve_context_node(state: GraphState) -> dict:
     """Query ChromaDB for relevant document chunks.
 
-    Populates: rag_context.
+    Populates: rag_context, rag_similarity.
 
     Parameters
     ----------
@@ -19,25 +122,49 @@ def retrieve_context_node(state: GraphState) -> dict:
     Returns
     -------
     dict
-        Partial state update with ``rag_context``.
+        Partial state update with ``rag_context`` and ``rag_similarity`` (best
+        query/chunk cosine similarity, used by the quiz relevance gate).
     """
     print("RETRIEVE HIT", flush=True)
     query = state.get("user_input", "")
+    speculative = state.get("speculative_rag")
+    if speculative is not None and speculative.query == query:
+        result = speculative.result()
+        if result is not None:
+            speculation_stats.record_consumed(speculative.seconds)
+            logger.info("Retrieve: using speculative result")
+            return {"rag_context": result["rag_context"], "rag_similarity": result["rag_similarity"]}
+    return _retrieve(query)
+
+
+def start_speculative_retrieval(state: GraphState) -> SpeculativeRetrieval | None:
+    """Start retrieval for ``user_input`` if speculation is enabled and useful.
+
+    Called by the router before its LLM call, so embedding and vector search
+    overlap with routing (see :class:`SpeculativeRetrieval`).
+    """
+    if not settings.rag_speculative_retrieval:
+        return None
+    query = state.get("user_input", "")
+    # Quiz answers take the router's no-LLM fast path and never need RAG.
+    if not query or (state.get("quiz_state") and HAS_QUIZ_ANSWERS_RE.search(query)):
+        speculation_stats.record_skipped()
+        return None
+    return SpeculativeRetrieval(query)
+
+
+def _retrieve(query: str) -> dict:
     if not query:
-        return {"rag_context": ""}
+        return {"rag_context": "", "rag_similarity": None}
 
-    retriever = get_retriever()
-    if hasattr(retriever, "invoke"):
-        docs = retriever.invoke(query)
-    else:
-        docs = retriever.get_relevant_documents(query)
+    docs, similarity = search_with_similarity(query)
 
     if not docs:
         print("RETRIEVE EMPTY", flush=True)
-        return {"rag_context": ""}
+        return {"rag_context": "", "rag_similarity": None}
 
     chunks: list[str] = []
-    print(f"RETRIEVE: {len(docs)} docs", flush=True)
+    print(f"RETRIEVE: {len(docs)} docs (similarity={similarity:.3f})", flush=True)
     for doc in docs:
         source = doc.metadata.get("source") or ""
         source_name = os.path.basename(source) if source else ""
@@ -53,4 +180,4 @@ def retrieve_context_node(state: GraphState) -> dict:
         else:
             chunks.append(doc.page_content.strip())
     joined_text = "\n\n".join(chunks).strip()
-    return {"rag_context": joined_text}
+    return {"rag_context": joined_text, "rag_similarity": similarity}
@@ -13,6 +13,7 @@ class ToolSpec:
     name: str
     input_model: type[BaseModel]
     handler: Callable[[Any, dict[str, Any], BaseModel], ToolResult]
+    writes: bool = False
 
 
 _TOOL_REGISTRY: dict[str, ToolSpec] = {}
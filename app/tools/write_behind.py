@@ -0,0 +1,231 @@
+"""Durable write-behind queue for DB tool calls (SQLite outbox + drainer)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.tools.contracts import ToolResult
+from app.tools.db_tools import execute_tool
+from app.utils.metrics import register_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+# Failures that will not succeed on retry go straight to the dead-letter state.
+_PERMANENT_ERRORS = frozenset(
+    {"validation_error", "unknown_tool", "permission_denied", "db_write_unconfirmed"}
+)
+
+
+class WriteBehindQueue:
+    """SQLite-backed outbox of ``(tool name, args)`` jobs.
+
+    Jobs survive restarts and are claimed with a lease inside an IMMEDIATE
+    transaction, so several worker processes can share one file without
+    running a job twice concurrently. Failed jobs are retried with
+    exponential backoff and parked as dead after ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = 20,
+        max_attempts: int = 8,
+        base_backoff_seconds: float = 1.0,
+        lease_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._base_backoff_seconds = base_backoff_seconds
+        self._lease_seconds = lease_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"enqueued": 0, "completed": 0, "retried": 0, "dead": 0}
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " job_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " tool TEXT NOT NULL,"
+            " args TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " last_error TEXT,"
+            " dead INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (dead, next_attempt_at)"
+        )
+
+    def enqueue(self, tool: str, args: dict[str, Any]) -> int:
+        now = self._clock()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (tool, args, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                (tool, json.dumps(args, ensure_ascii=False, default=str), now, now),
+            )
+            self._counters["enqueued"] += 1
+            return int(cursor.lastrowid)
+
+    def drain_once(self, execute: Callable[[str, dict[str, Any]], ToolResult]) -> int:
+        """Run one batch of due jobs through *execute*; returns jobs attempted."""
+        jobs = self._claim_batch()
+        for job_id, tool, args, attempts in jobs:
+            try:
+                result = execute(tool, json.loads(args))
+            except Exception as exc:  # executors normally return ToolResult errors
+                logger.exception("Write-behind job %s (%s) raised", job_id, tool)
+                result = {"ok": False, "error": {"code": "db_error", "message": str(exc)}}
+            if result.get("ok"):
+                self._complete(job_id)
+            else:
+                self._fail(job_id, attempts + 1, result.get("error") or {})
+        return len(jobs)
+
+    def pending(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM outbox WHERE dead = 0").fetchone()
+        return int(row[0])
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            pending, oldest = self._db.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE dead = 0"
+            ).fetchone()
+            dead_total = self._db.execute("SELECT COUNT(*) FROM outbox WHERE dead = 1").fetchone()[0]
+            return {
+                **self._counters,
+                "pending": int(pending),
+                "dead_total": int(dead_total),
+                "oldest_pending_seconds": round(now - oldest, 1) if oldest else None,
+            }
+
+    def _claim_batch(self) -> list[tuple[int, str, str, int]]:
+        now = self._clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                jobs = self._db.execute(
+                    "SELECT job_id, tool, args, attempts FROM outbox "
+                    "WHERE dead = 0 AND next_attempt_at <= ? ORDER BY job_id LIMIT ?",
+                    (now, self._batch_size),
+                ).fetchall()
+                if jobs:
+                    self._db.executemany(
+                        "UPDATE outbox SET next_attempt_at = ? WHERE job_id = ?",
+                        [(now + self._lease_seconds, job[0]) for job in jobs],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def _complete(self, job_id: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM outbox WHERE job_id = ?", (job_id,))
+            self._counters["completed"] += 1
+
+    def _fail(self, job_id: int, attempts: int, error: dict[str, Any]) -> None:
+        message = f"{error.get('code')}: {error.get('message')}"
+        dead = error.get("code") in _PERMANENT_ERRORS or attempts >= self._max_attempts
+        delay = self._base_backoff_seconds * (2 ** (attempts - 1))
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET attempts = ?, last_error = ?, dead = ?, next_attempt_at = ? "
+                "WHERE job_id = ?",
+                (attempts, message, int(dead), self._clock() + delay, job_id),
+            )
+            self._counters["dead" if dead else "retried"] += 1
+        log = logger.error if dead else logger.warning
+        log("Write-behind job %s failed (attempt %d, dead=%s): %s", job_id, attempts, dead, message)
+
+
+class WriteBehindWorker:
+    """Background task draining the queue; flushes what it can on shutdown."""
+
+    def __init__(self, queue_factory: Callable[[], WriteBehindQueue], execute) -> None:
+        self._queue_factory = queue_factory
+        self._execute = execute
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="write-behind-drainer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush(settings.write_behind_flush_timeout_seconds)
+
+    async def flush(self, timeout_seconds: float) -> int:
+        """Drain due jobs until none are left or the timeout elapses."""
+        queue = self._queue_factory()
+        deadline = time.monotonic() + timeout_seconds
+        drained = 0
+        while time.monotonic() < deadline:
+            attempted = await asyncio.to_thread(queue.drain_once, self._execute)
+            if not attempted:
+                break
+            drained += attempted
+        remaining = queue.pending()
+        if remaining:
+            logger.warning("Write-behind flush left %d job(s) for the next start", remaining)
+        return drained
+
+    async def _run(self) -> None:
+        queue = self._queue_factory()
+        while True:
+            try:
+                attempted = await asyncio.to_thread(queue.drain_once, self._execute)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Write-behind drain failed")
+                attempted = 0
+            if not attempted:
+                await asyncio.sleep(settings.write_behind_poll_seconds)
+
+
+_QUEUE: WriteBehindQueue | None = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """Return the process-wide outbox at ``settings.write_behind_path``."""
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = WriteBehindQueue(
+                settings.write_behind_path,
+                batch_size=settings.write_behind_batch_size,
+                max_attempts=settings.write_behind_max_attempts,
+            )
+            register_metrics("write_behind", _QUEUE.stats)
+    return _QUEUE
+
+
+def execute_job(tool: str, args: dict[str, Any]) -> ToolResult:
+    """Run a queued tool call against the configured repository."""
+    return execute_tool(tool, args, {})
+
+
+write_behind_worker = WriteBehindWorker(get_write_behind_queue, execute_job)
@@ -0,0 +1,116 @@
+"""Admission control for graph invocations: in-flight cap plus bounded queue."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limit concurrent graph runs and queue a bounded number of waiters.
+
+    Up to ``max_in_flight`` requests run at once. Further requests wait in a
+    FIFO queue of at most ``max_queue`` entries for up to
+    ``queue_timeout_seconds``. Anything beyond that is rejected immediately,
+    so bursts are shed instead of slowing every request past its deadline.
+    All state is touched only from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout_seconds: float,
+        retry_after_seconds: int,
+    ) -> None:
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._queue_timeout_seconds = queue_timeout_seconds
+        self._retry_after_seconds = retry_after_seconds
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._rejected = {"queue_full": 0, "queue_timeout": 0}
+        self._queued_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold an execution slot for the duration of the ``async with`` block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self) -> None:
+        if self._in_flight < self._max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._admitted += 1
+            return
+        if len(self._waiters) >= self._max_queue:
+            self._rejected["queue_full"] += 1
+            raise AdmissionRejected("queue_full", self._retry_after_seconds)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued_total += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self._queue_timeout_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release()
+            else:
+                waiter.cancel()
+            if isinstance(exc, asyncio.TimeoutError):
+                self._rejected["queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self._retry_after_seconds) from exc
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self._admitted += 1
+
+    def release(self) -> None:
+        # Hand the slot directly to the oldest live waiter so in_flight never
+        # dips below the cap while requests are queued.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "max_in_flight": self._max_in_flight,
+            "max_queue": self._max_queue,
+            "admitted": self._admitted,
+            "rejected": dict(self._rejected),
+            "queued_total": self._queued_total,
+            "wait_seconds_avg": (
+                self._wait_seconds_total / self._queued_total if self._queued_total else 0.0
+            ),
+            "wait_seconds_max": self._wait_seconds_max,
+        }
@@ -14,6 +14,14 @@ HAS_QUIZ_ANSWERS_RE = re.compile(r"\b\d+\s*[\).:-]?\s*[A-D]\b", re.IGNORECASE)
 # Used in quiz_agent _extract_answer_key when inline pattern finds nothing.
 LINE_START_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[:\)\.\-]\s*([A-D])\b", re.IGNORECASE)
 
+# Quiz requests asking for something other than plain multiple choice.
+# Used in db_agent (bank quizzes are MCQ-only) and quiz_agent (the structured
+# QuizOutput schema is MCQ-only, so these fall back to the free-text prompt).
+CUSTOM_QUIZ_FORMAT_RE = re.compile(
+    r"\b(true\s*(?:/|or)?\s*false|open[- ]ended|short[- ]answer|fill[- ]in(?:[- ]the[- ]blanks?)?|interview)\b",
+    re.IGNORECASE,
+)
+
 # Common English stopwords removed before keyword overlap matching.
 STOPWORDS: frozenset[str] = frozenset(
     {"the", "a", "an", "is", "of", "in", "to", "and", "or"}
@@ -0,0 +1,68 @@
+"""Per-key asyncio locks that are dropped once no task holds or awaits them."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Hashable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class _Entry:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    refs: int = 0
+
+
+class KeyedLock:
+    """Serialize work per key while different keys proceed in parallel.
+
+    Each key gets its own FIFO ``asyncio.Lock``. The entry is reference
+    counted by holders and waiters and removed when the count drops to zero,
+    so the table only ever contains keys with a turn in progress.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, _Entry] = {}
+        self._acquired = 0
+        self._contended = 0
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            self.release(key)
+
+    async def acquire(self, key: Hashable) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.refs += 1
+        if entry.lock.locked():
+            self._contended += 1
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            self._unref(key, entry)
+            raise
+        self._acquired += 1
+
+    def release(self, key: Hashable) -> None:
+        entry = self._entries[key]
+        entry.lock.release()
+        self._unref(key, entry)
+
+    def _unref(self, key: Hashable, entry: _Entry) -> None:
+        entry.refs -= 1
+        if entry.refs == 0:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active_keys": len(self._entries),
+            "acquired": self._acquired,
+            "contended": self._contended,
+        }
@@ -1,11 +1,64 @@
 """Shared LLM invocation helper."""
 
+import asyncio
+
+from app.llm.cache import get_llm_cache, key_for
 from app.llm.ollama_client import get_chat_model
 
 
-def invoke_llm(prompt: str, llm=None) -> str:
-    """Invoke the chat model and return the stripped response content string."""
+def invoke_llm(prompt: str, llm=None, *, cache: bool = True) -> str:
+    """Invoke the chat model and return the stripped response content string.
+
+    Responses are served from the LLM response cache when an identical
+    (model, options, prompt) was answered before; pass ``cache=False`` for
+    call sites whose output must vary between calls.
+    """
     if llm is None:
         llm = get_chat_model()
+    response_cache, key = _cache_lookup_target(llm, prompt, cache)
+    if key is not None:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
     response = llm.invoke(prompt)
-    return getattr(response, "content", str(response)).strip()
+    content = getattr(response, "content", str(response)).strip()
+    if key is not None:
+        response_cache.put(key, content)
+    return content
+
+
+async def async_invoke_llm(prompt: str, llm=None, *, cache: bool = True) -> str:
+    """Await the chat model and return the stripped response content string.
+
+    The HTTP request to Ollama is an ``await``, so cancelling the calling task
+    (e.g. when the per-request deadline in ``/chat`` fires) aborts the call.
+    Caching behaves as in ``invoke_llm``.
+    """
+    if llm is None:
+        llm = get_chat_model()
+    response_cache, key = _cache_lookup_target(llm, prompt, cache)
+    if key is not None:
+        cached = await _cache_call(response_cache, response_cache.get, key)
+        if cached is not None:
+            return cached
+    response = await llm.ainvoke(prompt)
+    content = getattr(response, "content", str(response)).strip()
+    if key is not None:
+        await _cache_call(response_cache, response_cache.put, key, content)
+    return content
+
+
+def _cache_lookup_target(llm, prompt: str, cache: bool):
+    if not cache:
+        return None, None
+    response_cache = get_llm_cache()
+    if response_cache is None:
+        return None, None
+    return response_cache, key_for(llm, prompt)
+
+
+async def _cache_call(response_cache, func, *args):
+    # The memory tier is fast enough for the event loop; SQLite I/O is not.
+    if response_cache.has_disk_tier:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
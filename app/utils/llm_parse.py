@@ -4,14 +4,39 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Type, TypeVar
+import threading
+from typing import Any, TypeVar
 
 from pydantic import BaseModel, ValidationError
 
+from app.utils.metrics import register_metrics
+
 T = TypeVar("T", bound=BaseModel)
 
+# Per-schema parse outcomes: clean first-pass parses, local repairs, and the
+# expensive LLM "fix the JSON" retries that structured output should make rare.
+_PARSE_COUNTS: dict[str, dict[str, int]] = {}
+_PARSE_COUNTS_LOCK = threading.Lock()
+
+
+def _record(schema: type[BaseModel], outcome: str) -> None:
+    with _PARSE_COUNTS_LOCK:
+        counts = _PARSE_COUNTS.setdefault(
+            schema.__name__, {"calls": 0, "clean": 0, "local_repairs": 0, "llm_retries": 0}
+        )
+        counts[outcome] += 1
+
+
+def parse_stats() -> dict[str, Any]:
+    """Snapshot of parse outcome counters keyed by schema name."""
+    with _PARSE_COUNTS_LOCK:
+        return {name: dict(counts) for name, counts in _PARSE_COUNTS.items()}
+
+
+register_metrics("llm_parse", parse_stats)
 
-def parse_json_with_schema(raw: str, schema: Type[T]) -> T:
+
+def parse_json_with_schema(raw: str, schema: type[T]) -> T:
     data = json.loads(raw)
     if isinstance(data, dict):
         intent = data.get("intent")
@@ -45,39 +70,70 @@ def _extract_json_object(raw: str) -> str | None:
     return None
 
 
-def parse_with_retry(raw: str, schema: Type[T], retry_fn) -> T:
+def parse_with_retry(raw: str, schema: type[T], retry_fn) -> T:
     """Parse JSON with schema; retry once using retry_fn if invalid."""
     # TODO: Consider stricter validation + logging of raw vs sanitized JSON for transparency.
+    _record(schema, "calls")
+    parsed = _parse_without_retry(raw, schema)
+    if parsed is not None:
+        return parsed
+    _record(schema, "llm_retries")
+    return _parse_retried(raw, retry_fn(raw), schema)
+
+
+async def async_parse_with_retry(raw: str, schema: type[T], retry_fn) -> T:
+    """Async variant of ``parse_with_retry``; *retry_fn* is awaited."""
+    _record(schema, "calls")
+    parsed = _parse_without_retry(raw, schema)
+    if parsed is not None:
+        return parsed
+    _record(schema, "llm_retries")
+    return _parse_retried(raw, await retry_fn(raw), schema)
+
+
+def _parse_without_retry(raw: str, schema: type[T]) -> T | None:
+    """Try the local repairs; return None when an LLM retry is needed."""
     if not raw or not raw.strip():
-        corrected = retry_fn(raw)
-        try:
-            return parse_json_with_schema(corrected, schema)
-        except json.JSONDecodeError:
-            return parse_json_with_schema(_sanitize_invalid_escapes(corrected), schema)
+        return None
     try:
-        return parse_json_with_schema(raw, schema)
+        parsed = parse_json_with_schema(raw, schema)
+        _record(schema, "clean")
+        return parsed
     except (json.JSONDecodeError, ValidationError):
         try:
-            return parse_json_with_schema(_sanitize_invalid_escapes(raw), schema)
+            parsed = parse_json_with_schema(_sanitize_invalid_escapes(raw), schema)
+            _record(schema, "local_repairs")
+            return parsed
         except json.JSONDecodeError:
             extracted = _extract_json_object(raw)
             if extracted:
                 try:
-                    return parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
+                    parsed = parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
+                    _record(schema, "local_repairs")
+                    return parsed
                 except (json.JSONDecodeError, ValidationError):
                     pass
-            corrected = retry_fn(raw)
-            if not corrected or not corrected.strip():
-                extracted = _extract_json_object(raw)
-                if extracted:
-                    return parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
-            try:
-                return parse_json_with_schema(corrected, schema)
-            except json.JSONDecodeError:
-                extracted = _extract_json_object(corrected)
-                if extracted:
-                    return parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
-                try:
-                    return parse_json_with_schema(_sanitize_invalid_escapes(corrected), schema)
-                except json.JSONDecodeError as exc:
-                    raise ValueError("Unable to parse JSON after retries.") from exc
+            return None
+
+
+def _parse_retried(raw: str, corrected: str, schema: type[T]) -> T:
+    """Parse the output of the retry call, falling back to repairs of *raw*."""
+    if not raw or not raw.strip():
+        try:
+            return parse_json_with_schema(corrected, schema)
+        except json.JSONDecodeError:
+            return parse_json_with_schema(_sanitize_invalid_escapes(corrected), schema)
+    if not corrected or not corrected.strip():
+        extracted = _extract_json_object(raw)
+        if extracted:
+            return parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
+    try:
+        return parse_json_with_schema(corrected, schema)
+    except json.JSONDecodeError:
+        extracted = _extract_json_object(corrected)
+        if extracted:
+            return parse_json_with_schema(_sanitize_invalid_escapes(extracted), schema)
+        try:
+            return parse_json_with_schema(_sanitize_invalid_escapes(corrected), schema)
+        except json.JSONDecodeError as exc:
+            raise ValueError("Unable to parse JSON after retries.") from exc
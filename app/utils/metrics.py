@@ -0,0 +1,20 @@
+"""Process-wide registry of component metrics exposed via ``GET /metrics``."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+MetricsCollector = Callable[[], dict[str, Any]]
+
+_COLLECTORS: dict[str, MetricsCollector] = {}
+
+
+def register_metrics(name: str, collector: MetricsCollector) -> None:
+    """Register (or replace) the snapshot function for component *name*."""
+    _COLLECTORS[name] = collector
+
+
+def collect_metrics() -> dict[str, dict[str, Any]]:
+    """Return a snapshot from every registered collector, keyed by name."""
+    return {name: collector() for name, collector in list(_COLLECTORS.items())}
@@ -6,6 +6,17 @@ CREATE TABLE IF NOT EXISTS sessions (
     started_at  TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Turn state carried between /chat requests (zlib-compressed serializer
+-- payload, tagged with the serializer type). Lets several app workers/hosts
+-- serve the same session. expires_at slides forward on every read/write.
+CREATE TABLE IF NOT EXISTS session_state (
+    session_id  INTEGER PRIMARY KEY,
+    serde_type  VARCHAR(32) NOT NULL DEFAULT 'msgpack',
+    state       BYTEA NOT NULL,
+    updated_at  TIMESTAMP NOT NULL DEFAULT NOW(),
+    expires_at  TIMESTAMP NOT NULL DEFAULT NOW() + INTERVAL '1 day'
+);
+
 CREATE TABLE IF NOT EXISTS messages (
     id          SERIAL PRIMARY KEY,
     session_id  INTEGER NOT NULL REFERENCES sessions(session_id),
@@ -44,7 +55,21 @@ CREATE TABLE IF NOT EXISTS quiz_attempts (
     user_answer TEXT,
     score       REAL,        -- 0.0 to 1.0
     feedback    TEXT,
-    created_at  TIMESTAMP NOT NULL DEFAULT NOW()
+    created_at  TIMESTAMP NOT NULL DEFAULT NOW(),
+    save_key    TEXT  -- idempotency key of a queued quiz_post_save row
+);
+-- quiz_attempts predates save_key; add it to existing databases.
+ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS save_key TEXT;
+
+-- Pre-generated MCQ quizzes (QuizOutput JSON) served instead of live generation.
+-- Each row is served at most once; the background worker keeps topics topped up.
+CREATE TABLE IF NOT EXISTS quiz_bank (
+    quiz_id     SERIAL PRIMARY KEY,
+    topic_id    INTEGER NOT NULL REFERENCES topics(topic_id),
+    quiz        JSONB NOT NULL,
+    question_count INTEGER NOT NULL DEFAULT 0,
+    created_at  TIMESTAMP NOT NULL DEFAULT NOW(),
+    served_at   TIMESTAMP
 );
 
 CREATE TABLE IF NOT EXISTS flashcards (
@@ -59,6 +84,9 @@ CREATE TABLE IF NOT EXISTS flashcards (
 
 -- Indexes
 CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id);
+CREATE INDEX IF NOT EXISTS idx_session_state_expires ON session_state(expires_at);
 CREATE INDEX IF NOT EXISTS idx_plan_items_plan   ON plan_items(plan_id);
 CREATE INDEX IF NOT EXISTS idx_quiz_topic        ON quiz_attempts(topic_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_attempts_save_key ON quiz_attempts(save_key);
+CREATE INDEX IF NOT EXISTS idx_quiz_bank_available ON quiz_bank(topic_id, created_at) WHERE served_at IS NULL;
 CREATE INDEX IF NOT EXISTS idx_flashcards_review ON flashcards(next_review_at);
@@ -0,0 +1,78 @@
+"""Benchmark per-call client overhead of the Ollama chat model factory.
+
+Compares building a fresh ChatOllama per call (the old behaviour) with the
+shared, connection-pooled instance from ``get_chat_model()``. With ``--live``
+it also sends real prompts so TCP/keep-alive reuse shows up in latency.
+
+Usage:
+    python scripts/bench_chat_model.py
+    python scripts/bench_chat_model.py --calls 500
+    python scripts/bench_chat_model.py --live 10
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain_ollama import ChatOllama
+
+from app.config import settings
+from app.llm.ollama_client import get_chat_model
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark chat model client reuse.")
+    parser.add_argument("--calls", type=int, default=200, help="Factory calls per variant.")
+    parser.add_argument(
+        "--live",
+        type=int,
+        default=0,
+        help="Also send N short prompts to Ollama with each variant.",
+    )
+    return parser.parse_args()
+
+
+def _fresh_model() -> ChatOllama:
+    return ChatOllama(
+        base_url=settings.ollama_base_url,
+        model=settings.ollama_model,
+        client_kwargs={"timeout": settings.ollama_timeout_seconds},
+    )
+
+
+def _time_calls(factory, calls: int, prompt: str | None = None) -> list[float]:
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        model = factory()
+        if prompt is not None:
+            model.invoke(prompt)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) > 1 else ordered[0]
+    print(
+        f"{label:<28} n={len(samples):<5} "
+        f"mean={statistics.mean(samples) * 1000:8.3f} ms  "
+        f"p95={p95 * 1000:8.3f} ms"
+    )
+
+
+def main() -> None:
+    args = _parse_args()
+    get_chat_model()  # warm the shared instance
+
+    _report("factory: fresh client", _time_calls(_fresh_model, args.calls))
+    _report("factory: shared client", _time_calls(get_chat_model, args.calls))
+
+    if args.live:
+        prompt = "Reply with the single word: ok"
+        _report("invoke: fresh client", _time_calls(_fresh_model, args.live, prompt))
+        _report("invoke: shared client", _time_calls(get_chat_model, args.live, prompt))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measure LLM latency per model profile against a running Ollama server.
+
+Sends a representative prompt for each profile (router classification, tutor
+explanation, ...) and prints the latency summary recorded by the profile's
+callback, the same numbers ``/metrics`` reports under ``llm_latency``.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_profiles.py
+    PYTHONPATH=. python scripts/bench_profiles.py --runs 10 --profiles router tutor
+    OLLAMA_PROFILES='{"router": {"model": "llama3.2:1b", "num_predict": 128}}' \
+        PYTHONPATH=. python scripts/bench_profiles.py --profiles router
+"""
+
+import argparse
+
+from app.config import settings
+from app.llm.latency import latency_recorder
+from app.llm.ollama_client import get_chat_model
+from app.prompts.router import ROUTER_SYSTEM_PROMPT, ROUTER_USER_PROMPT
+
+_PROMPTS = {
+    "router": ROUTER_SYSTEM_PROMPT
+    + "\n\n"
+    + ROUTER_USER_PROMPT.format(
+        user_input="explain recursion", last_intent=None, plan_draft_present=False
+    ),
+    "planner": "Create a 3-step study plan for learning SQL joins.",
+    "quiz": "Write 3 multiple-choice questions about Python lists with an answer key.",
+    "tutor": "Explain what a Python generator is in two sentences.",
+    "db": "Reply with the single word: ok",
+}
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark per-profile LLM latency.")
+    parser.add_argument("--runs", type=int, default=5, help="Calls per profile.")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=list(_PROMPTS),
+        help="Profiles to benchmark (default: all).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    for profile in args.profiles:
+        llm = get_chat_model(profile)
+        prompt = _PROMPTS.get(profile, _PROMPTS["db"])
+        llm.invoke(prompt)  # warm-up: loads the model into Ollama memory
+        for _ in range(args.runs):
+            llm.invoke(prompt)
+
+    stats = latency_recorder.stats()
+    for profile in args.profiles:
+        row = stats.get(profile, {})
+        model = settings.model_profile(profile).model or settings.ollama_model
+        print(
+            f"{profile:<8} model={model:<20} calls={row.get('calls', 0):<3} "
+            f"avg={row.get('avg_ms', 0):8.1f} ms  p50={row.get('p50_ms', 0):8.1f} ms  "
+            f"p95={row.get('p95_ms', 0):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
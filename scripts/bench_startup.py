@@ -0,0 +1,80 @@
+"""Measure cold-start time of the app and of the MCP server pool.
+
+Runs the FastAPI lifespan and reports two timings per variant: how long until
+the app can serve requests (the lifespan reaches ``yield``), and how long until
+MCP is ready (``/health/ready`` would return 200). Variants:
+
+* ``blocking``  — awaiting ``mcp_manager.start()`` before serving (old behaviour)
+* ``npx``       — background start via ``npx --yes <package>``
+* ``resolved``  — background start via the cached, pre-resolved server binary
+
+Needs the MCP server and PostgreSQL from .env (``DB_BACKEND=mcp``).
+
+Usage:
+    PYTHONPATH=. python scripts/bench_startup.py
+    PYTHONPATH=. python scripts/bench_startup.py --runs 5 --variants npx resolved
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.config import settings
+from app.main import app, lifespan
+from app.mcp.manager import mcp_manager
+
+_VARIANTS = ("blocking", "npx", "resolved")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark app and MCP cold-start time.")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per variant.")
+    parser.add_argument("--variants", nargs="+", choices=_VARIANTS, default=list(_VARIANTS))
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="Seconds to wait for MCP.")
+    return parser.parse_args()
+
+
+async def _wait_ready(timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while mcp_manager.status != "ready":
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"MCP not ready after {timeout:.0f}s ({mcp_manager.status})")
+        await asyncio.sleep(0.01)
+
+
+async def _cold_start(variant: str, ready_timeout: float) -> tuple[float, float]:
+    settings.mcp_resolve_binary = variant != "npx"
+    started = time.perf_counter()
+    if variant == "blocking":
+        await mcp_manager.start()
+        serving = ready = time.perf_counter() - started
+        await mcp_manager.stop()
+        return serving, ready
+    async with lifespan(app):
+        serving = time.perf_counter() - started
+        await _wait_ready(ready_timeout)
+        ready = time.perf_counter() - started
+    return serving, ready
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<22} n={len(samples):<3} "
+        f"mean={statistics.mean(samples) * 1000:9.1f} ms  "
+        f"max={max(samples) * 1000:9.1f} ms"
+    )
+
+
+async def _main() -> None:
+    args = _parse_args()
+    if settings.db_backend.lower() != "mcp":
+        raise SystemExit("Set DB_BACKEND=mcp to benchmark MCP startup.")
+    for variant in args.variants:
+        timings = [await _cold_start(variant, args.ready_timeout) for _ in range(args.runs)]
+        _report(f"{variant}: serving", [serving for serving, _ in timings])
+        _report(f"{variant}: mcp ready", [ready for _, ready in timings])
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,73 @@
+"""Tests for the graph admission controller."""
+
+import asyncio
+
+import pytest
+
+from app.utils.admission import AdmissionController, AdmissionRejected
+
+
+def _controller(**overrides):
+    options = {
+        "max_in_flight": 1,
+        "max_queue": 1,
+        "queue_timeout_seconds": 1.0,
+        "retry_after_seconds": 7,
+    }
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_queued_request_is_admitted_when_slot_frees():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 1
+        controller.release()
+        await waiter
+        stats = controller.stats()
+        assert stats["in_flight"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["admitted"] == 2
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_immediately_when_queue_full():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire()
+        assert excinfo.value.reason == "queue_full"
+        assert excinfo.value.retry_after == 7
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["rejected"]["queue_full"] == 1
+        assert controller.stats()["queue_depth"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_wait_times_out():
+    async def scenario():
+        controller = _controller(queue_timeout_seconds=0.01)
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire()
+        assert excinfo.value.reason == "queue_timeout"
+        stats = controller.stats()
+        assert stats["rejected"]["queue_timeout"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["wait_seconds_max"] > 0
+        controller.release()
+        assert controller.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+"""Tests for the MCP circuit breaker and breaker-aware repository selection."""
+
+import asyncio
+
+import pytest
+
+from app.db import repository_factory
+from app.db.circuit_breaker import BreakerGuardedClient, CircuitBreaker
+
+
+def test_breaker_trips_on_consecutive_failures_or_slow_calls():
+    breaker = CircuitBreaker(failure_threshold=3, slow_call_seconds=1.0)
+    breaker.record(0.1, ok=False)
+    breaker.record(0.1, ok=False)
+    breaker.record(0.1, ok=True)  # a fast success resets the streak
+    breaker.record(0.1, ok=False)
+    breaker.record(5.0, ok=True)  # slow
+    assert breaker.state == "closed"
+    breaker.record(0.1, ok=False)
+
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+    stats = breaker.stats()
+    assert stats["transitions"] == {"closed->open": 1}
+    assert (stats["failures"], stats["slow_calls"], stats["short_circuited"]) == (4, 1, 1)
+
+
+def test_probe_closes_the_breaker_only_on_success():
+    outcomes = [False, True]
+
+    async def _probe():
+        return outcomes.pop(0)
+
+    breaker = CircuitBreaker(failure_threshold=1, probe=_probe)
+    breaker.record(0.1, ok=False)
+
+    assert asyncio.run(breaker.probe_once()) is False
+    assert breaker.state == "open"
+    assert asyncio.run(breaker.probe_once()) is True
+    assert breaker.state == "closed"
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->closed": 1}
+
+
+def test_get_repository_uses_psycopg_while_breaker_is_open(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1)
+    monkeypatch.setattr(repository_factory, "mcp_breaker", breaker)
+    monkeypatch.setattr(repository_factory.settings, "db_backend", "mcp")
+    monkeypatch.setattr(repository_factory.settings, "mcp_fallback_to_psycopg2", True)
+
+    class _FailingClient:
+        def query(self, sql, params=None):
+            raise ConnectionError("MCP server not responding")
+
+    monkeypatch.setattr(repository_factory.mcp_manager, "get_client", lambda: _FailingClient())
+
+    repo = repository_factory.get_repository()
+    assert isinstance(repo, repository_factory.MCPRepository)
+    with pytest.raises(ConnectionError):
+        repo.get_plans()
+
+    assert repository_factory.get_repository() is repository_factory.get_psycopg_repository()
+
+
+def test_guarded_client_reports_async_outcomes():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    class _Client:
+        async def async_query(self, sql, params=None):
+            raise TimeoutError("slow")
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(BreakerGuardedClient(_Client(), breaker).async_query("SELECT 1"))
+    assert breaker.state == "open"
+
+
+def test_sql_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    class _Client:
+        def query(self, sql, params=None):
+            if sql.startswith("INSERT"):
+                raise RuntimeError("write operations are disabled")
+            raise RuntimeError('syntax error at or near "SELEC"')
+
+    guarded = BreakerGuardedClient(_Client(), breaker)
+    for sql in ("SELEC 1", "INSERT INTO topics (name) VALUES ('x')", "SELEC 1"):
+        with pytest.raises(RuntimeError):
+            guarded.query(sql)
+
+    assert breaker.state == "closed"
+    assert breaker.stats()["failures"] == 0
+    assert breaker.stats()["calls"] == 3
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from types import SimpleNamespace
 
 from app.agents import db_agent
@@ -9,10 +10,10 @@ from app.schemas.router import RouterOutput
 
 
 def test_router_plan_confirmation_sets_plan_confirmed(monkeypatch):
-    def fake_invoke(_prompt):
+    async def fake_ainvoke(_prompt):
         return SimpleNamespace(content="{}")
 
-    def fake_parse(_raw, _schema, _retry):
+    async def fake_parse(_raw, _schema, _retry):
         return RouterOutput(
             intent="PLAN",
             sub_intent="SAVE_PLAN",
@@ -23,11 +24,11 @@ def test_router_plan_confirmation_sets_plan_confirmed(monkeypatch):
             item_title=None,
         )
 
-    monkeypatch.setattr(router_agent, "get_chat_model", lambda: SimpleNamespace(invoke=fake_invoke))
-    monkeypatch.setattr(router_agent, "parse_with_retry", fake_parse)
+    monkeypatch.setattr(router_agent, "get_chat_model", lambda *_, **__: SimpleNamespace(ainvoke=fake_ainvoke))
+    monkeypatch.setattr(router_agent, "async_parse_with_retry", fake_parse)
 
     state = {"user_input": "yes", "plan_draft": {"title": "Plan X", "items": []}}
-    result = router_agent.router_node(state)
+    result = asyncio.run(router_agent.router_node(state))
 
     assert result["plan_confirmed"] is True
     assert result["needs_db"] is True
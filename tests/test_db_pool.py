@@ -0,0 +1,122 @@
+"""Tests for the thread-safe blocking psycopg2 connection pool."""
+
+import threading
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
+
+from app.db.connection import BlockingConnectionPool, PoolTimeout
+
+
+class _Conn:
+    def __init__(self, n, alive=True):
+        self.n = n
+        self.alive = alive
+        self.closed = 0
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        conn = self
+
+        class _Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                if not conn.alive:
+                    raise psycopg2.OperationalError("server closed the connection")
+
+        return _Cursor()
+
+    def close(self):
+        self.closed = 1
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _factory():
+    made = []
+
+    def _connect():
+        made.append(_Conn(len(made)))
+        return made[-1]
+
+    return _connect, made
+
+
+def test_exhausted_pool_blocks_until_a_connection_is_returned():
+    connect, made = _factory()
+    pool = BlockingConnectionPool(0, 1, connect, timeout=5.0)
+    first = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    waiter.start()
+    while pool.stats()["waiting"] == 0:
+        threading.Event().wait(0.001)
+    pool.putconn(first)
+    waiter.join(timeout=5)
+
+    assert got == [first]
+    assert len(made) == 1
+    stats = pool.stats()
+    assert (stats["waits"], stats["in_use"], stats["utilization"]) == (1, 1, 1.0)
+
+
+def test_checkout_times_out_when_no_connection_frees_up():
+    connect, _made = _factory()
+    pool = BlockingConnectionPool(0, 1, connect, timeout=0.01)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_checkout_recycles_old_and_replaces_dead_connections():
+    connect, made = _factory()
+    clock = _Clock()
+    pool = BlockingConnectionPool(1, 2, connect, max_age_seconds=100.0, ping_after_seconds=10.0, clock=clock)
+
+    clock.now = 20.0
+    made[0].alive = False  # idle past ping_after and dropped by the server
+    conn = pool.getconn()
+    assert conn is made[1] and made[0].closed
+
+    pool.putconn(conn)
+    clock.now = 150.0
+    conn = pool.getconn()
+    assert conn is made[2] and made[1].closed
+    stats = pool.stats()
+    assert (stats["health_check_failures"], stats["recycled"], stats["size"]) == (1, 1, 1)
+
+
+def test_putconn_rolls_back_open_transactions_and_drops_closed_connections():
+    connect, _ = _factory()
+    pool = BlockingConnectionPool(0, 2, connect)
+    a, b = pool.getconn(), pool.getconn()
+    a.status = TRANSACTION_STATUS_INERROR
+    b.closed = 1
+    pool.putconn(a)
+    pool.putconn(b)
+
+    assert a.rollbacks == 1
+    stats = pool.stats()
+    assert (stats["size"], stats["idle"]) == (1, 1)
+    assert pool.getconn() is a
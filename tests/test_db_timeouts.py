@@ -0,0 +1,123 @@
+"""Tests for per-call DB deadlines on the MCP and psycopg2 paths."""
+
+import asyncio
+import threading
+
+import pytest
+from psycopg2.errors import QueryCanceled
+
+from app.db import repository
+from app.db.errors import DBOutcomeUnknownError, DBTimeoutError
+from app.mcp.client import MCPClient
+from app.tools.db_tools import execute_tool
+
+
+class _HungSession:
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    async def call_tool(self, _name, _args):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+def test_sync_query_times_out_and_cancels_the_mcp_call():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    session = _HungSession()
+
+    async def _make_client():
+        return MCPClient(session, tool_name="query", timeout_seconds=0.05)
+
+    client = asyncio.run_coroutine_threadsafe(_make_client(), loop).result()
+    try:
+        with pytest.raises(DBOutcomeUnknownError):
+            client.query("SELECT pg_sleep(60)")
+        assert session.cancelled.wait(1)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(1)
+
+
+def test_async_query_times_out():
+    session = _HungSession()
+
+    async def _run():
+        client = MCPClient(session, tool_name="query", timeout_seconds=0.01)
+        with pytest.raises(DBTimeoutError):
+            await client.async_query("SELECT 1")
+
+    asyncio.run(_run())
+    assert session.cancelled.is_set()
+
+
+def test_statement_timeout_is_raised_as_db_timeout(monkeypatch):
+    class _Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, params):
+            raise QueryCanceled("canceling statement due to statement timeout")
+
+    class _Conn:
+        rollbacks = 0
+
+        def cursor(self, cursor_factory=None):
+            return _Cursor()
+
+        def rollback(self):
+            self.rollbacks += 1
+
+    conn = _Conn()
+    monkeypatch.setattr(repository, "get_connection", lambda: conn)
+    monkeypatch.setattr(repository, "put_connection", lambda _conn: None)
+
+    with pytest.raises(DBTimeoutError):
+        repository.get_plans()
+    assert conn.rollbacks == 1
+
+
+def test_execute_tool_maps_timeouts_to_retryable_error_code():
+    class _Repo:
+        def get_plans(self):
+            raise DBTimeoutError("MCP query exceeded 4s deadline")
+
+    result = execute_tool("list_plans", {}, {}, repo=_Repo())
+    assert result["ok"] is False
+    assert result["error"]["code"] == "db_timeout"
+    assert result["error"]["details"]["retryable"] is True
+
+
+def test_abandoned_mcp_writes_are_not_reported_as_retryable():
+    class _Repo:
+        def get_plans(self):
+            raise DBOutcomeUnknownError("MCP query exceeded 4s deadline")
+
+        def delete_quiz_attempt(self, _attempt_id):
+            raise DBOutcomeUnknownError("MCP query exceeded 4s deadline")
+
+    read = execute_tool("list_plans", {}, {}, repo=_Repo())
+    write = execute_tool("delete_quiz_attempt", {"attempt_id": 3}, {}, repo=_Repo())
+
+    assert (read["error"]["code"], read["error"]["details"]["retryable"]) == ("db_timeout", True)
+    assert (write["error"]["code"], write["error"]["details"]["retryable"]) == ("db_write_unconfirmed", False)
+
+
+def test_abandoned_keyed_quiz_save_stays_retryable():
+    class _Repo:
+        def transaction(self):
+            raise DBOutcomeUnknownError("MCP query exceeded 4s deadline")
+
+    args = {"topic_id": 1, "wrong_answers": [{"question": "Q1"}]}
+    unkeyed = execute_tool("quiz_post_save", args, {}, repo=_Repo())
+    keyed = execute_tool("quiz_post_save", {**args, "save_key": "job-1"}, {}, repo=_Repo())
+
+    assert unkeyed["error"]["code"] == "db_write_unconfirmed"
+    assert keyed["error"]["code"] == "db_timeout"
@@ -22,6 +22,7 @@ class FakeRepo:
         }
         self.created_plan_id = 100
         self.created_items: list[dict[str, Any]] = []
+        self.bulk_plan_writes = 0
 
     def get_plans(self):
         return list(self.plans)
@@ -52,6 +53,20 @@ class FakeRepo:
         )
         return item_id
 
+    def create_plan_with_items(self, title: str, items: list[dict[str, Any]]) -> dict[str, Any]:
+        self.bulk_plan_writes += 1
+        plan_id = self.create_plan(title)
+        item_ids = [self.add_plan_item(plan_id=plan_id, **item) for item in items]
+        return {"plan_id": plan_id, "item_ids": item_ids}
+
+    def update_plan_items_status(self, plan_id: int, status: str, current_status=None) -> list[int]:
+        updated = []
+        for item in self.plan_items.get(plan_id, []):
+            if current_status is None or item["status"] == current_status:
+                item["status"] = status
+                updated.append(item["item_id"])
+        return updated
+
     def update_plan_item_status(self, item_id: int, status: str) -> None:
         for items in self.plan_items.values():
             for item in items:
@@ -82,11 +97,12 @@ def test_list_plan_items_success_by_id():
 def test_write_plan_success():
     repo = FakeRepo()
     db_context = {}
-    payload = {"title": "New Plan", "items": [{"title": "First item"}]}
+    payload = {"title": "New Plan", "items": [{"title": "First item"}, {"title": "Second item"}]}
     result = execute_tool("write_plan", payload, db_context, repo=repo)
     assert result["ok"] is True
     assert result["data"]["created_plan_id"] == repo.created_plan_id
-    assert len(repo.created_items) == 1
+    assert [item["title"] for item in repo.created_items] == ["First item", "Second item"]
+    assert repo.bulk_plan_writes == 1
 
 
 def test_update_item_status_success_by_id():
@@ -98,6 +114,16 @@ def test_update_item_status_success_by_id():
     assert result["data"]["status"] == "done"
 
 
+def test_update_plan_status_updates_all_items_in_one_call():
+    repo = FakeRepo()
+    repo.update_plan_item_status = None  # per-item updates must not be used
+    db_context = {}
+    result = execute_tool("update_plan_status", {"plan_id": 1, "status": "done"}, db_context, repo=repo)
+    assert result == {"ok": True, "data": {"plan_id": 1, "status": "done"}}
+    assert [item["status"] for item in repo.plan_items[1]] == ["done", "done"]
+    assert db_context["updated_item_ids"] == [10, 11]
+
+
 @pytest.mark.parametrize(
     "tool_name,args",
     [
@@ -0,0 +1,189 @@
+"""Tests for the repository unit-of-work (transaction) API."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from app.db import repository
+from app.db.mcp_repository import MCPRepository
+from app.db.repository_factory import PsycopgRepository
+from app.tools.db_tools import execute_tool
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        if "fail" in sql:
+            raise RuntimeError("boom")
+        self.conn.statements.append(sql)
+
+    def fetchone(self):
+        return {"attempt_id": len(self.conn.statements)}
+
+
+class _Conn:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def pinned_conn(monkeypatch):
+    conn = _Conn()
+    checkouts = []
+    monkeypatch.setattr(repository, "get_connection", lambda: checkouts.append(conn) or conn)
+    monkeypatch.setattr(repository, "put_connection", lambda _conn: None)
+    return conn, checkouts
+
+
+def test_psycopg_transaction_pins_one_connection_and_commits_once(pinned_conn):
+    conn, checkouts = pinned_conn
+    repo = PsycopgRepository()
+
+    with repo.transaction():
+        assert repo.save_quiz_attempt(1, "Q1", "A", 0.0, None) == 1
+        repo.delete_quiz_attempt(7)
+
+    assert len(checkouts) == 1
+    assert (len(conn.statements), conn.commits, conn.rollbacks) == (2, 1, 0)
+
+
+def test_psycopg_transaction_rolls_back_everything_on_error(pinned_conn):
+    conn, _checkouts = pinned_conn
+
+    with pytest.raises(RuntimeError), repository.transaction():
+        repository.delete_quiz_attempt(7)
+        repository._execute("SELECT fail")
+
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+class _Client:
+    """Applies a script's statements atomically, like one implicit transaction."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.queries = []
+        self.committed = []
+
+    def query(self, sql, params=None):
+        self.queries.append(sql)
+        applied = []
+        for statement in sql.rstrip(";").split(";\n"):
+            if self.fail_on and self.fail_on in statement:
+                raise RuntimeError(f"statement failed: {statement}")
+            applied.append(statement)
+        self.committed.extend(applied)
+        return {"rows": []}
+
+
+def test_mcp_transaction_sends_a_single_script():
+    client = _Client()
+    repo = MCPRepository(client)
+
+    with repo.transaction():
+        assert repo.save_quiz_attempt(3, "What's a CTE?", "B", 0.0, None) is None
+        repo.delete_quiz_attempt(9)
+        assert client.queries == []
+
+    assert client.queries == [
+        (
+            "INSERT INTO quiz_attempts (topic_id, question, user_answer, score, feedback, save_key) "
+            "VALUES (3, 'What''s a CTE?', 'B', 0.0, NULL, NULL) ON CONFLICT (save_key) DO NOTHING "
+            "RETURNING attempt_id;\n"
+            "DELETE FROM quiz_attempts WHERE attempt_id = 9;"
+        )
+    ]
+
+
+def test_mcp_transaction_sends_nothing_when_block_raises():
+    client = _Client()
+    with pytest.raises(ValueError), MCPRepository(client).transaction() as repo:
+        repo.delete_quiz_attempt(9)
+        raise ValueError("abort")
+    assert client.queries == []
+
+
+def test_mcp_batch_failing_partway_is_one_call_with_no_separate_rollback():
+    client = _Client(fail_on="attempt_id = 5")
+
+    result = execute_tool(
+        "quiz_post_save",
+        {"topic_id": 1, "wrong_answers": [{"question": "Q1", "user_answer": "A"}], "correct_retries": [4, 5, 6]},
+        {},
+        repo=MCPRepository(client),
+    )
+
+    assert result["ok"] is False
+    assert result["error"]["code"] == "db_error"
+    assert len(client.queries) == 1
+    assert client.queries[0].count(";") == 4
+    assert "ROLLBACK" not in client.queries[0] and "BEGIN" not in client.queries[0]
+    assert client.committed == []
+
+
+def test_quiz_post_save_runs_as_one_unit_of_work():
+    events = []
+
+    class _Repo:
+        @contextmanager
+        def transaction(self):
+            events.append("begin")
+            yield self
+            events.append("commit")
+
+        def save_quiz_attempt(self, **kwargs):
+            events.append(("save", kwargs["question"]))
+
+        def delete_quiz_attempt(self, attempt_id):
+            events.append(("delete", attempt_id))
+
+    result = execute_tool(
+        "quiz_post_save",
+        {"topic_id": 1, "wrong_answers": [{"question": "Q1", "user_answer": "A"}], "correct_retries": [5]},
+        {},
+        repo=_Repo(),
+    )
+
+    assert result == {"ok": True, "data": {"saved_wrong": 1, "deleted_correct": 1}}
+    assert events == ["begin", ("save", "Q1"), ("delete", 5), "commit"]
+
+
+def test_replayed_quiz_post_save_stores_each_attempt_once():
+    stored: dict[str, str] = {}
+
+    class _Repo:
+        @contextmanager
+        def transaction(self):
+            yield self
+
+        def save_quiz_attempt(self, save_key=None, **kwargs):
+            # Mirrors INSERT ... ON CONFLICT (save_key) DO NOTHING.
+            stored.setdefault(save_key, kwargs["question"])
+
+        def delete_quiz_attempt(self, attempt_id):
+            pass
+
+    args = {"topic_id": 1, "wrong_answers": [{"question": "Q1"}, {"question": "Q2"}], "save_key": "job-1"}
+    for _ in range(2):  # e.g. the first run timed out after committing
+        assert execute_tool("quiz_post_save", dict(args), {}, repo=_Repo())["ok"] is True
+
+    assert stored == {"job-1:0": "Q1", "job-1:1": "Q2"}
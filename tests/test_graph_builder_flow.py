@@ -1,5 +1,8 @@
 """Integration-style tests for graph builder routing flow."""
 
+import asyncio
+import threading
+
 from app.graph import builder
 
 
@@ -71,3 +74,124 @@ def test_build_graph_web_path_routes_to_research(monkeypatch):
     result = graph.invoke(_base_state())
     assert result["final_response"] == "research response"
 
+
+
+def test_build_graph_ainvoke_runs_async_specialist(monkeypatch):
+    async def _router(_state):
+        return {"intent": "EXPLAIN", "needs_db": False, "needs_rag": False, "needs_web": False}
+
+    async def _tutor(_state):
+        return {"user_response": "async tutor response"}
+
+    monkeypatch.setattr(builder, "router_node", _router)
+    monkeypatch.setattr(builder, "tutor_node", _tutor)
+    monkeypatch.setattr(builder, "format_response_node", lambda state: {"final_response": state.get("user_response", "")})
+
+    graph = builder.build_graph()
+    result = asyncio.run(graph.ainvoke(_base_state()))
+    assert result["final_response"] == "async tutor response"
+
+
+def test_build_graph_quiz_runs_prefetch_and_retrieval_in_parallel(monkeypatch):
+    # Both branches must be inside the barrier at once, or it times out.
+    barrier = threading.Barrier(2, timeout=5)
+    quiz_calls = []
+
+    def _db(_state):
+        barrier.wait()
+        return {"db_context": {"quiz_topic_id": 7}}
+
+    def _retrieve(_state):
+        barrier.wait()
+        return {"rag_context": "kb", "rag_similarity": 0.9}
+
+    def _quiz(state):
+        quiz_calls.append((state["db_context"], state["rag_context"]))
+        return {"user_response": "quiz", "quiz_next_action": "format_response"}
+
+    monkeypatch.setattr(
+        builder,
+        "router_node",
+        lambda _state: {"intent": "QUIZ", "needs_db": True, "needs_rag": True, "needs_web": False},
+    )
+    monkeypatch.setattr(builder, "db_agent_node", _db)
+    monkeypatch.setattr(builder, "retrieve_context_node", _retrieve)
+    monkeypatch.setattr(builder, "quiz_node", _quiz)
+    monkeypatch.setattr(builder, "format_response_node", lambda state: {"final_response": state.get("user_response", "")})
+
+    graph = builder.build_graph()
+    result = asyncio.run(graph.ainvoke(_base_state()))
+    assert result["final_response"] == "quiz"
+    assert quiz_calls == [({"quiz_topic_id": 7}, "kb")]
+
+
+def _speculative_graph(monkeypatch, router_output, search_gate=None):
+    from langchain_core.documents import Document
+
+    from app.agents import router_agent
+    from app.schemas.router import RouterOutput
+    from app.tools import retrieve_context
+
+    searches = []
+
+    def _search(query):
+        searches.append(query)
+        if search_gate is not None:
+            search_gate.wait(timeout=5)
+        return [Document(page_content="LangGraph notes", metadata={"source": "kb/langgraph.md"})], 0.8
+
+    async def _invoke(*_args, **_kwargs):
+        return "{}"
+
+    async def _parse(*_args, **_kwargs):
+        return RouterOutput(sub_intent=None, needs_web=False, needs_db=False,
+                            plan_title=None, item_title=None, **router_output)
+
+    monkeypatch.setattr(retrieve_context.settings, "rag_speculative_retrieval", True)
+    monkeypatch.setattr(retrieve_context, "search_with_similarity", _search)
+    monkeypatch.setattr(router_agent, "get_chat_model", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(router_agent, "async_invoke_llm", _invoke)
+    monkeypatch.setattr(router_agent, "async_parse_with_retry", _parse)
+    monkeypatch.setattr(builder, "tutor_node", lambda state: {"user_response": state.get("rag_context") or "no context"})
+    monkeypatch.setattr(builder, "format_response_node", lambda state: {"final_response": state.get("user_response", "")})
+    return builder.build_graph(), searches, retrieve_context.speculation_stats
+
+
+def test_speculative_retrieval_is_consumed_when_router_needs_rag(monkeypatch):
+    graph, searches, stats = _speculative_graph(monkeypatch, {"intent": "EXPLAIN", "needs_rag": True})
+    before = stats.snapshot()
+
+    result = asyncio.run(graph.ainvoke(_base_state()))
+
+    assert result["final_response"] == "Source: langgraph.md\nLangGraph notes"
+    assert searches == ["hello"]
+    after = stats.snapshot()
+    assert (after["started"] - before["started"], after["consumed"] - before["consumed"]) == (1, 1)
+
+
+def test_turns_without_rag_do_not_wait_for_speculative_retrieval(monkeypatch):
+    gate = threading.Event()
+    graph, _searches, stats = _speculative_graph(
+        monkeypatch, {"intent": "EXPLAIN", "needs_rag": False}, search_gate=gate
+    )
+    before = stats.snapshot()
+
+    try:
+        result = asyncio.run(asyncio.wait_for(graph.ainvoke(_base_state()), timeout=2))
+    finally:
+        gate.set()
+
+    assert result["final_response"] == "no context"
+    assert result["speculative_rag"] is None
+
+    def _discarded():
+        after = stats.snapshot()
+        # Cancelled if still queued, otherwise it ran to completion unused.
+        return (after["cancelled"] - before["cancelled"]) + (after["wasted"] - before["wasted"])
+
+    for _ in range(100):
+        if _discarded():
+            break
+        threading.Event().wait(0.01)
+    assert _discarded() == 1
+    assert stats.snapshot()["consumed"] == before["consumed"]
@@ -1,11 +1,12 @@
 """Tests for graph routing after DB node."""
 
-from app.graph.routing import route_after_db
+from app.graph.routing import route_after_db, route_after_router
 
 
-def test_route_after_db_quiz_with_rag_goes_to_retrieve_context():
+def test_route_after_db_quiz_with_rag_joins_quiz():
+    # Retrieval already ran in parallel with the pre-fetch.
     state = {"intent": "QUIZ", "quiz_results_saved": False, "needs_rag": True}
-    assert route_after_db(state) == "retrieve_context"
+    assert route_after_db(state) == "quiz"
 
 
 def test_route_after_db_quiz_without_rag_goes_to_quiz():
@@ -17,3 +18,12 @@ def test_route_after_db_non_quiz_goes_to_format_response():
     state = {"intent": "REVIEW", "quiz_results_saved": False}
     assert route_after_db(state) == "format_response"
 
+
+def test_route_after_router_fans_out_quiz_context_branches():
+    state = {"intent": "QUIZ", "needs_db": True, "needs_rag": True, "needs_web": False}
+    assert route_after_router(state) == ["db", "retrieve_context"]
+
+
+def test_route_after_router_keeps_db_specialist_alone():
+    state = {"intent": "REVIEW", "needs_db": True, "needs_rag": True, "needs_web": False}
+    assert route_after_router(state) == "db"
@@ -0,0 +1,60 @@
+"""Tests for per-session turn serialization."""
+
+import asyncio
+
+from app.utils.keyed_lock import KeyedLock
+
+
+def test_same_key_runs_in_order_and_table_is_cleaned_up():
+    async def scenario():
+        locks = KeyedLock()
+        events = []
+
+        async def turn(name):
+            async with locks.hold(7):
+                events.append(f"{name}:start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name}:end")
+
+        await asyncio.gather(turn("a"), turn("b"), turn("c"))
+        assert events == ["a:start", "a:end", "b:start", "b:end", "c:start", "c:end"]
+        stats = locks.stats()
+        assert stats["active_keys"] == 0
+        assert stats["acquired"] == 3
+        assert stats["contended"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_in_parallel():
+    async def scenario():
+        locks = KeyedLock()
+        both_inside = asyncio.Event()
+        inside = 0
+
+        async def turn(key):
+            nonlocal inside
+            async with locks.hold(key):
+                inside += 1
+                if inside == 2:
+                    both_inside.set()
+                await asyncio.wait_for(both_inside.wait(), timeout=1)
+
+        await asyncio.gather(turn(1), turn(2))
+        assert locks.stats()["contended"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_entry():
+    async def scenario():
+        locks = KeyedLock()
+        await locks.acquire(3)
+        waiter = asyncio.create_task(locks.acquire(3))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        locks.release(3)
+        assert locks.stats()["active_keys"] == 0
+
+    asyncio.run(scenario())
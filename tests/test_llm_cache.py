@@ -0,0 +1,88 @@
+"""Tests for the LLM response cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.llm.cache import LLMResponseCache, key_for
+from app.utils import llm_helpers
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_tier_ttl_and_lru_eviction():
+    clock = _Clock()
+    cache = LLMResponseCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    clock.now += 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    writer = LLMResponseCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+    writer.put("k", "cached reply")
+
+    reader = LLMResponseCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+    assert reader.get("k") == "cached reply"
+    assert reader.get("k") == "cached reply"
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.stats()["memory_hits"] == 1
+
+
+def test_key_depends_on_model_options_and_prompt():
+    base = SimpleNamespace(model="llama3.2", temperature=0.0)
+    assert key_for(base, "p") == key_for(SimpleNamespace(model="llama3.2", temperature=0.0), "p")
+    assert key_for(base, "p") != key_for(base, "q")
+    assert key_for(SimpleNamespace(model="llama3.2", temperature=0.0, num_ctx=8192), "p") != key_for(base, "p")
+    assert key_for(SimpleNamespace(), "p") is None
+
+
+def test_async_invoke_llm_serves_hits_and_honours_opt_out(monkeypatch):
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(llm_helpers, "get_llm_cache", lambda: cache)
+    calls = []
+
+    async def fake_ainvoke(prompt):
+        calls.append(prompt)
+        return SimpleNamespace(content=f" reply {len(calls)} ")
+
+    llm = SimpleNamespace(model="llama3.2", temperature=0.0, ainvoke=fake_ainvoke)
+
+    assert asyncio.run(llm_helpers.async_invoke_llm("classify", llm)) == "reply 1"
+    assert asyncio.run(llm_helpers.async_invoke_llm("classify", llm)) == "reply 1"
+    assert asyncio.run(llm_helpers.async_invoke_llm("classify", llm, cache=False)) == "reply 2"
+    assert len(calls) == 2
+
+
+def test_sampling_profiles_bypass_the_cache(monkeypatch):
+    cache = LLMResponseCache(max_entries=10, ttl_seconds=60)
+    monkeypatch.setattr(llm_helpers, "get_llm_cache", lambda: cache)
+    calls = []
+
+    async def fake_ainvoke(prompt):
+        calls.append(prompt)
+        return SimpleNamespace(content=f"answer {len(calls)}")
+
+    for temperature in (None, 0.7):
+        llm = SimpleNamespace(model="llama3.2", temperature=temperature, ainvoke=fake_ainvoke)
+        assert key_for(llm, "explain recursion") is None
+        first = asyncio.run(llm_helpers.async_invoke_llm("explain recursion", llm))
+        second = asyncio.run(llm_helpers.async_invoke_llm("explain recursion", llm))
+        assert first != second
+
+    assert len(calls) == 4
+    assert cache.stats()["writes"] == 0
@@ -1,10 +1,13 @@
 """Tests for JSON parsing and retry behavior."""
 
+import asyncio
+
 import pytest
 from pydantic import ValidationError
 
 from app.schemas.router import RouterOutput
-from app.utils.llm_parse import parse_with_retry
+from app.utils import llm_parse
+from app.utils.llm_parse import async_parse_with_retry, parse_with_retry
 
 
 def test_parse_with_retry_recovers_from_malformed_json():
@@ -34,3 +37,39 @@ def test_parse_with_retry_rejects_invalid_schema_types():
 
     with pytest.raises(ValidationError):
         parse_with_retry(raw, RouterOutput, lambda _raw: raw)
+
+
+def test_async_parse_with_retry_awaits_retry_fn_only_when_needed():
+    valid = (
+        '{"intent":"QUIZ","sub_intent":null,"needs_rag":false,"needs_web":false,'
+        '"needs_db":true,"plan_title":null,"item_title":null}'
+    )
+    calls = {"count": 0}
+
+    async def _retry_fn(_bad_raw: str) -> str:
+        calls["count"] += 1
+        return valid
+
+    parsed = asyncio.run(async_parse_with_retry(valid, RouterOutput, _retry_fn))
+    assert parsed.intent == "QUIZ"
+    assert calls["count"] == 0
+
+    parsed = asyncio.run(async_parse_with_retry("not json", RouterOutput, _retry_fn))
+    assert parsed.intent == "QUIZ"
+    assert calls["count"] == 1
+
+
+def test_parse_stats_count_clean_repaired_and_llm_retried_parses():
+    valid = (
+        '{"intent":"QUIZ","sub_intent":null,"needs_rag":false,"needs_web":false,'
+        '"needs_db":true,"plan_title":null,"item_title":null}'
+    )
+    before = llm_parse.parse_stats().get("RouterOutput", {})
+
+    parse_with_retry(valid, RouterOutput, lambda _raw: valid)
+    parse_with_retry("Sure! " + valid + " Done.", RouterOutput, lambda _raw: valid)
+    parse_with_retry("not json", RouterOutput, lambda _raw: valid)
+
+    after = llm_parse.parse_stats()["RouterOutput"]
+    delta = {key: after[key] - before.get(key, 0) for key in after}
+    assert delta == {"calls": 3, "clean": 1, "local_repairs": 1, "llm_retries": 1}
@@ -1,6 +1,12 @@
 """Tests for FastAPI /chat endpoint contract."""
 
+import asyncio
+import json
+
+import pytest
 from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+from starlette.requests import ClientDisconnect
 
 import app.main as main
 
@@ -14,10 +20,23 @@ class _DummyGraph:
     def __init__(self, result):
         self._result = result
 
-    def invoke(self, _state):
+    async def ainvoke(self, _state):
         return dict(self._result)
 
 
+class _SlowGraph:
+    def __init__(self):
+        self.cancelled = False
+
+    async def ainvoke(self, _state):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"final_response": "should not return"}
+
+
 async def _noop_async():
     return None
 
@@ -47,16 +66,119 @@ def test_chat_endpoint_returns_504_on_timeout(monkeypatch):
     monkeypatch.setattr(main, "get_repository", lambda: _DummyRepo())
     monkeypatch.setattr(main.mcp_manager, "start", _noop_async)
     monkeypatch.setattr(main.mcp_manager, "stop", _noop_async)
+    monkeypatch.setattr(main.settings, "chat_timeout_seconds", 0.05)
+    slow_graph = _SlowGraph()
+    monkeypatch.setattr(main, "graph", slow_graph)
+
+    with TestClient(main.app) as client:
+        response = client.post("/chat", json={"message": "hello"})
+
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Chat processing timed out"
+    assert slow_graph.cancelled is True
+    assert main.admission.stats()["in_flight"] == 0
+
+
+def test_chat_endpoint_returns_503_when_overloaded(monkeypatch):
+    monkeypatch.setattr(main.settings, "db_backend", "psycopg2")
+    monkeypatch.setattr(main, "get_repository", lambda: _DummyRepo())
+    monkeypatch.setattr(main.mcp_manager, "start", _noop_async)
+    monkeypatch.setattr(main.mcp_manager, "stop", _noop_async)
+    monkeypatch.setattr(main, "graph", _DummyGraph({"final_response": "unused"}))
     monkeypatch.setattr(
         main,
-        "graph",
-        _DummyGraph({"final_response": "should not return", "intent": "EXPLAIN", "db_context": {}, "quiz_state": None}),
+        "admission",
+        main.AdmissionController(
+            max_in_flight=0, max_queue=0, queue_timeout_seconds=0.01, retry_after_seconds=3
+        ),
     )
-    monkeypatch.setattr(main.concurrent.futures, "wait", lambda *_args, **_kwargs: (set(), set()))
 
     with TestClient(main.app) as client:
         response = client.post("/chat", json={"message": "hello"})
+        stream_response = client.post("/chat/stream", json={"message": "hello"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert stream_response.status_code == 503
 
-    assert response.status_code == 504
-    assert response.json()["detail"] == "Chat processing timed out"
 
+class _StreamingGraph:
+    async def astream(self, _state, stream_mode=None):
+        yield "updates", {"router": {"intent": "EXPLAIN", "needs_rag": True, "needs_web": False, "needs_db": False}}
+        yield "updates", {"retrieve_context": {"rag_context": "kb chunk"}}
+        yield "messages", (AIMessageChunk(content="Hel"), {"langgraph_node": "tutor"})
+        yield "messages", (AIMessageChunk(content='{"intent"'), {"langgraph_node": "router"})
+        yield "messages", (AIMessageChunk(content="lo"), {"langgraph_node": "tutor"})
+        yield "values", {"final_response": "Hello", "intent": "EXPLAIN", "db_context": {}, "quiz_state": None}
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_emits_node_token_and_done_events(monkeypatch):
+    monkeypatch.setattr(main.settings, "db_backend", "psycopg2")
+    monkeypatch.setattr(main, "get_repository", lambda: _DummyRepo())
+    monkeypatch.setattr(main.mcp_manager, "start", _noop_async)
+    monkeypatch.setattr(main.mcp_manager, "stop", _noop_async)
+    monkeypatch.setattr(main, "graph", _StreamingGraph())
+
+    with TestClient(main.app) as client:
+        response = client.post("/chat/stream", json={"message": "explain graphs"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert events[0] == ("node", {"node": "router", "intent": "EXPLAIN", "sub_intent": None,
+                                  "needs_rag": True, "needs_web": False, "needs_db": False})
+    assert events[1] == ("node", {"node": "retrieve_context", "has_context": True})
+    assert [data["text"] for name, data in events if name == "token"] == ["Hel", "lo"]
+    assert events[-1] == ("done", {"session_id": 101, "reply": "Hello"})
+    assert main.session_store.get(101)["last_intent"] == "EXPLAIN"
+
+
+def test_health_ready_reports_503_until_mcp_is_available(monkeypatch):
+    monkeypatch.setattr(main.settings, "db_backend", "mcp")
+    monkeypatch.setattr(main.mcp_manager, "start_background", lambda: None)
+    monkeypatch.setattr(main.mcp_manager, "stop", _noop_async)
+    monkeypatch.setattr(main.mcp_breaker, "start", lambda: None)
+
+    with TestClient(main.app) as client:
+        not_ready = client.get("/health/ready")
+        monkeypatch.setattr(main.settings, "db_backend", "psycopg2")
+        ready = client.get("/health/ready")
+
+    assert not_ready.status_code == 503
+    assert not_ready.json()["ready"] is False
+    assert not_ready.json()["mcp"]["status"] == "stopped"
+    assert ready.status_code == 200
+    assert ready.json()["ready"] is True
+
+
+def test_chat_stream_releases_lock_and_slot_when_send_fails_before_streaming(monkeypatch):
+    monkeypatch.setattr(main.settings, "db_backend", "psycopg2")
+    monkeypatch.setattr(main, "get_repository", lambda: _DummyRepo())
+    monkeypatch.setattr(main, "graph", _StreamingGraph())
+
+    async def _disconnected_send(_message):
+        raise OSError("client went away")
+
+    async def _receive():
+        return {"type": "http.disconnect"}
+
+    async def _run():
+        response = await main.chat_stream(main.ChatRequest(message="hello", session_id=7))
+        assert main.admission.stats()["in_flight"] == 1
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, _receive, _disconnected_send)
+        # The next turn for the same session must not block on a leaked lock.
+        await asyncio.wait_for(main.session_locks.acquire(7), timeout=1)
+        main.session_locks.release(7)
+
+    asyncio.run(_run())
+    assert main.admission.stats()["in_flight"] == 0
+    assert main.session_locks.stats()["active_keys"] == 0
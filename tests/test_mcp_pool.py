@@ -0,0 +1,290 @@
+"""Tests for the pooled MCP sessions behind MCPManager."""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.db.errors import DBTimeoutError
+from app.mcp import manager as manager_module
+from app.mcp import pool as pool_module
+
+
+class _Session:
+    def __init__(self, number, gate=None, fail=False):
+        self.number = number
+        self.gate = gate
+        self.fail = fail
+        self.calls = 0
+
+    async def initialize(self):
+        return None
+
+    async def call_tool(self, _name, args):
+        self.calls += 1
+        if "bogus" in str(args):
+            raise RuntimeError('syntax error at or near "bogus"')
+        if self.fail:
+            raise ConnectionError("broken pipe")
+        if self.gate is not None:
+            await self.gate.wait()
+        return type("Result", (), {"structuredContent": {"rows": [{"session": self.number}]}})()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    created: list[_Session] = []
+    options = {"gate": None, "fail_first": False}
+
+    @asynccontextmanager
+    async def _create_session(_connection):
+        session = _Session(
+            len(created),
+            gate=options["gate"],
+            fail=options["fail_first"] and not created,
+        )
+        created.append(session)
+        yield session
+
+    monkeypatch.setattr(pool_module.mcp_client, "create_session", _create_session)
+    monkeypatch.setattr(manager_module.settings, "db_backend", "mcp")
+    monkeypatch.setattr(manager_module.settings, "mcp_pool_size", 2)
+    monkeypatch.setattr(manager_module.settings, "mcp_session_max_failures", 1)
+    monkeypatch.setattr(manager_module.settings, "mcp_resolve_binary", False)
+    return created, options
+
+
+def test_concurrent_queries_are_spread_across_sessions(sessions):
+    created, options = sessions
+
+    async def _run():
+        options["gate"] = asyncio.Event()
+        manager = manager_module.MCPManager()
+        await manager.start()
+        client = manager.get_client()
+        first = asyncio.create_task(client.async_query("SELECT 1"))
+        second = asyncio.create_task(client.async_query("SELECT 1"))
+        await asyncio.sleep(0)
+        assert [slot["in_flight"] for slot in manager.stats()["sessions"]] == [1, 1]
+        options["gate"].set()
+        results = await asyncio.gather(first, second)
+        await manager.stop()
+        return results
+
+    results = asyncio.run(_run())
+    assert sorted(r["rows"][0]["session"] for r in results) == [0, 1]
+    assert [s.calls for s in created] == [1, 1]
+
+
+def test_dead_session_is_restarted_and_in_flight_reads_are_replayed(sessions):
+    created, options = sessions
+    options["fail_first"] = True
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        await manager.start()
+        client = manager.get_client()
+        # The read hits the dead session 0 and is replayed on session 1.
+        result = await client.async_query("SELECT 1")
+        for _ in range(10):
+            await asyncio.sleep(0)
+        stats = manager.stats()
+        await manager.stop()
+        return result, stats
+
+    result, stats = asyncio.run(_run())
+    assert result["rows"][0]["session"] == 1
+    assert len(created) == 3
+    assert stats["healthy"] == 2
+    assert stats["replayed_reads"] == 1
+    assert (stats["sessions"][0]["deaths"], stats["sessions"][0]["restarts"]) == (1, 1)
+
+
+def test_sql_errors_do_not_mark_sessions_unhealthy(sessions):
+    created, _options = sessions
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        await manager.start()
+        client = manager.get_client()
+        try:
+            for _ in range(5):
+                with pytest.raises(RuntimeError, match="syntax error"):
+                    await client.async_query("SELECT bogus")
+            return manager.stats()
+        finally:
+            await manager.stop()
+
+    stats = asyncio.run(_run())
+    assert stats["healthy"] == 2
+    assert len(created) == 2
+    assert sum(slot["app_errors"] for slot in stats["sessions"]) == 5
+    assert sum(slot["failures"] for slot in stats["sessions"]) == 0
+
+
+def test_timeouts_count_toward_max_failures():
+    replaced = []
+    slot = pool_module.MCPSessionSlot(0, dict, {})
+    slot.healthy = True
+    slot.client = object()
+    pool = pool_module.MCPClientPool([slot], replaced.append, max_failures=2)
+
+    for exc in (DBTimeoutError("slow"), RuntimeError("constraint"), TimeoutError("slow")):
+        pool._checkout()
+        assert pool._failed(slot, exc, "SELECT 1") is False
+    assert (slot.healthy, replaced) == (True, [])
+
+    pool._checkout()
+    pool._failed(slot, DBTimeoutError("slow"), "SELECT 1")
+    assert (slot.healthy, replaced) == (False, [slot])
+
+
+def test_writes_on_a_dead_session_are_not_replayed(sessions):
+    _created, options = sessions
+    options["fail_first"] = True
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        await manager.start()
+        try:
+            with pytest.raises(ConnectionError):
+                await manager.get_client().async_query("DELETE FROM quiz_attempts WHERE attempt_id = 1")
+            return manager.stats()["replayed_reads"]
+        finally:
+            await manager.stop()
+
+    assert asyncio.run(_run()) == 0
+
+
+def test_restart_backs_off_until_the_server_comes_back(monkeypatch, sessions):
+    created, _options = sessions
+    monkeypatch.setattr(manager_module.settings, "mcp_pool_size", 1)
+    monkeypatch.setattr(manager_module.settings, "mcp_restart_backoff_seconds", 0.01)
+    attempts = {"left": 2}
+    real_open = pool_module.MCPSessionSlot.open
+
+    async def _flaky_open(slot):
+        if slot.starts and attempts["left"]:
+            attempts["left"] -= 1
+            slot.starts += 1
+            slot.healthy = False
+            return False
+        return await real_open(slot)
+
+    monkeypatch.setattr(pool_module.MCPSessionSlot, "open", _flaky_open)
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        await manager.start()
+        manager._pool.mark_dead(manager._slots[0])
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if manager.get_client() is not None:
+                break
+        stats = manager.stats()
+        await manager.stop()
+        return stats
+
+    stats = asyncio.run(_run())
+    assert stats["healthy"] == 1
+    assert stats["sessions"][0]["restarts"] == 3
+    assert len(created) == 2
+
+
+@pytest.mark.parametrize(
+    "sql,expected",
+    [
+        ("SELECT plan_id FROM study_plan", True),
+        ("WITH x AS (SELECT 1) SELECT * FROM x", True),
+        ("WITH new_plan AS (INSERT INTO study_plan (title) VALUES ('a') RETURNING plan_id) SELECT 1", False),
+        ("UPDATE plan_items SET status = 'done'", False),
+        ("BEGIN;\nDELETE FROM quiz_attempts;\nCOMMIT;", False),
+    ],
+)
+def test_only_single_reads_are_replayable(sql, expected):
+    assert pool_module.is_idempotent_read(sql) is expected
+
+
+def test_background_start_serves_fallback_until_sessions_are_ready(sessions, monkeypatch):
+    created, _options = sessions
+    launch = asyncio.Event()
+    original = pool_module.mcp_client.create_session
+
+    @asynccontextmanager
+    async def _slow_create_session(connection):
+        await launch.wait()
+        async with original(connection) as session:
+            yield session
+
+    monkeypatch.setattr(pool_module.mcp_client, "create_session", _slow_create_session)
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        manager.start_background()
+        await asyncio.sleep(0.01)
+        starting = (manager.status, manager.get_client())
+        launch.set()
+        for _ in range(100):
+            if manager.status == "ready":
+                break
+            await asyncio.sleep(0.01)
+        ready = (manager.status, manager.get_client() is not None, manager.stats()["ready_seconds"])
+        await manager.stop()
+        return starting, ready, manager.status
+
+    starting, ready, stopped = asyncio.run(_run())
+    assert starting == ("starting", None)
+    assert ready[:2] == ("ready", True)
+    assert ready[2] >= 0
+    assert stopped == "stopped"
+    assert len(created) == 2
+
+
+def test_stop_abandons_a_background_start_that_never_finishes(sessions, monkeypatch):
+    @asynccontextmanager
+    async def _hanging_create_session(_connection):
+        await asyncio.Event().wait()
+        yield None
+
+    monkeypatch.setattr(pool_module.mcp_client, "create_session", _hanging_create_session)
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        manager.start_background()
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(manager.stop(), timeout=1)
+        return manager.status
+
+    assert asyncio.run(_run()) == "stopped"
+
+
+def test_background_start_attempts_time_out_and_are_retried(sessions, monkeypatch):
+    launches = []
+
+    @asynccontextmanager
+    async def _hanging_create_session(_connection):
+        launches.append(1)
+        await asyncio.Event().wait()
+        yield None
+
+    monkeypatch.setattr(pool_module.mcp_client, "create_session", _hanging_create_session)
+    monkeypatch.setattr(manager_module.settings, "mcp_pool_size", 1)
+    monkeypatch.setattr(manager_module.settings, "mcp_start_timeout_seconds", 0.05)
+    monkeypatch.setattr(manager_module.settings, "mcp_restart_backoff_seconds", 0.01)
+
+    async def _run():
+        manager = manager_module.MCPManager()
+        manager.start_background()
+        for _ in range(100):
+            if manager.stats()["start_failures"] >= 2:
+                break
+            await asyncio.sleep(0.01)
+        status, stats = manager.status, manager.stats()
+        await asyncio.wait_for(manager.stop(), timeout=1)
+        return status, stats
+
+    status, stats = asyncio.run(_run())
+    assert status == "starting"
+    assert stats["start_failures"] >= 2
+    assert stats["size"] == 0
+    assert len(launches) >= 2
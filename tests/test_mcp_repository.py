@@ -0,0 +1,52 @@
+"""Tests for MCP repository bulk statements."""
+
+from app.db.mcp_repository import MCPRepository
+
+
+class _Client:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries: list[str] = []
+
+    def query(self, sql, params=None):
+        self.queries.append(sql)
+        return {"rows": self.rows}
+
+
+def test_create_plan_with_items_is_one_round_trip():
+    client = _Client([{"plan_id": 5, "item_ids": [11, 12]}])
+    repo = MCPRepository(client)
+
+    created = repo.create_plan_with_items(
+        "Learn SQL",
+        [
+            {"title": "Joins", "topic_id": None, "due_date": "2025-03-01", "notes": None},
+            {"title": "O'Reilly ch. 2", "topic_id": None, "due_date": None, "notes": "CTEs"},
+        ],
+    )
+
+    assert created == {"plan_id": 5, "item_ids": [11, 12]}
+    assert len(client.queries) == 1
+    sql = client.queries[0]
+    assert sql.startswith("WITH new_plan AS (INSERT INTO study_plan (title) VALUES ('Learn SQL')")
+    assert "(NULL::integer, 'Joins'::text, '2025-03-01'::date, NULL::text, 0)" in sql
+    assert "(NULL::integer, 'O''Reilly ch. 2'::text, NULL::date, 'CTEs'::text, 1)" in sql
+
+
+def test_create_plan_with_items_without_items_returns_empty_ids():
+    client = _Client([{"plan_id": 6, "item_ids": "{}"}])
+    created = MCPRepository(client).create_plan_with_items("Empty", [])
+    assert created == {"plan_id": 6, "item_ids": []}
+    assert "plan_items" not in client.queries[0]
+
+
+def test_update_plan_items_status_is_a_single_filtered_update():
+    client = _Client([{"item_id": 12}, {"item_id": 11}])
+    item_ids = MCPRepository(client).update_plan_items_status(3, "done", current_status="in_progress")
+    assert item_ids == [11, 12]
+    assert client.queries == [
+        (
+            "UPDATE plan_items SET status = 'done' WHERE plan_id = 3 "
+            "AND status = 'in_progress' RETURNING item_id"
+        )
+    ]
@@ -0,0 +1,72 @@
+"""Tests for resolving npx MCP server commands to a local binary."""
+
+import json
+import os
+
+from app.mcp import server_binary
+from app.mcp.server_binary import (
+    parse_package_spec,
+    resolve_server_command,
+    split_npx_package,
+)
+
+
+def _install(npm_cache, digest, name, version):
+    modules = npm_cache / "_npx" / digest / "node_modules"
+    package = modules / name
+    package.mkdir(parents=True)
+    (package / "package.json").write_text(json.dumps({"name": name, "version": version}))
+    binary = modules / ".bin" / name.rsplit("/", 1)[-1]
+    binary.parent.mkdir(parents=True, exist_ok=True)
+    binary.write_text("#!/bin/sh\n")
+    binary.chmod(0o755)
+    return str(binary)
+
+
+def test_split_and_parse_npx_package_specs():
+    assert split_npx_package(["--yes", "pg-mcp-server@1.2.0", "--transport", "stdio"]) == (
+        "pg-mcp-server@1.2.0",
+        ["--transport", "stdio"],
+    )
+    assert split_npx_package(["--package", "x", "y"]) is None
+    assert parse_package_spec("@scope/server@2.0.1") == ("@scope/server", "2.0.1")
+    assert parse_package_spec("@scope/server") == ("@scope/server", None)
+
+
+def test_pinned_version_resolves_from_npx_cache_and_is_cached(tmp_path, monkeypatch):
+    npm_cache = tmp_path / "npm"
+    _install(npm_cache, "old", "pg-mcp-server", "1.0.0")
+    wanted = _install(npm_cache, "new", "pg-mcp-server", "1.2.0")
+    cache_path = str(tmp_path / "data" / "binary.json")
+    args = ["--yes", "pg-mcp-server@1.2.0", "--transport", "stdio"]
+
+    command, server_args = resolve_server_command("npx", args, cache_path, npm_cache_dir=str(npm_cache))
+
+    assert (command, server_args) == (wanted, ["--transport", "stdio"])
+    with open(cache_path) as cache_file:
+        assert json.load(cache_file) == {"npx pg-mcp-server@1.2.0": wanted}
+
+    def _no_scan(*_args):
+        raise AssertionError("cached path should be used")
+
+    monkeypatch.setattr(server_binary, "_find_binary", _no_scan)
+    assert resolve_server_command("npx", args, cache_path)[0] == wanted
+
+
+def test_falls_back_to_npx_when_binary_is_missing_or_stale(tmp_path):
+    npm_cache = tmp_path / "npm"
+    stale = _install(npm_cache, "abc", "pg-mcp-server", "1.0.0")
+    cache_path = tmp_path / "binary.json"
+    cache_path.write_text(json.dumps({"npx pg-mcp-server@1.2.0": str(tmp_path / "gone")}))
+    args = ["--yes", "pg-mcp-server@1.2.0"]
+
+    assert resolve_server_command("npx", args, str(cache_path), npm_cache_dir=str(npm_cache)) == ("npx", args)
+    assert os.path.exists(stale)
+
+
+def test_non_npx_commands_are_passed_through(tmp_path):
+    args = ["--transport", "stdio"]
+    assert resolve_server_command("/usr/local/bin/pg-mcp-server", args, str(tmp_path / "c.json")) == (
+        "/usr/local/bin/pg-mcp-server",
+        args,
+    )
@@ -0,0 +1,81 @@
+"""Tests for shared Ollama client factories."""
+
+from app.config import Settings
+from app.llm import ollama_client
+
+
+def test_get_chat_model_reuses_instance_per_options(monkeypatch):
+    ollama_client.clear_model_cache()
+    first = ollama_client.get_chat_model()
+    assert ollama_client.get_chat_model() is first
+
+    monkeypatch.setattr(ollama_client.settings, "ollama_model", "other-model")
+    other = ollama_client.get_chat_model()
+    assert other is not first
+    assert other.model == "other-model"
+    ollama_client.clear_model_cache()
+
+
+def test_get_chat_model_applies_request_timeout(monkeypatch):
+    ollama_client.clear_model_cache()
+    monkeypatch.setattr(ollama_client.settings, "ollama_timeout_seconds", 7)
+    model = ollama_client.get_chat_model()
+    assert model._client._client.timeout.read == 7
+    ollama_client.clear_model_cache()
+
+
+def test_get_chat_model_resolves_named_profiles(monkeypatch):
+    ollama_client.clear_model_cache()
+    monkeypatch.setattr(
+        ollama_client.settings,
+        "ollama_profiles",
+        {"router": ollama_client.settings.model_profile("router").model_copy(update={"model": "tiny:1b"})},
+    )
+    router = ollama_client.get_chat_model("router")
+    assert router.model == "tiny:1b"
+    assert router.num_predict == 256
+    assert ollama_client.get_chat_model("tutor").model == ollama_client.settings.ollama_model
+    assert ollama_client.get_chat_model("router") is router
+    ollama_client.clear_model_cache()
+
+
+def test_ollama_profiles_env_merges_over_default_profiles(monkeypatch):
+    monkeypatch.setenv("OLLAMA_PROFILES", '{"router": {"model": "tiny:1b"}, "summary": {"num_ctx": 2048}}')
+    profiles = Settings(_env_file=None).ollama_profiles
+
+    assert profiles["router"].model == "tiny:1b"
+    assert (profiles["router"].temperature, profiles["router"].num_predict) == (0.0, 256)
+    assert profiles["quiz"].num_ctx == 8192
+    assert profiles["summary"].num_ctx == 2048
+
+
+def test_latency_callback_records_per_profile():
+    from uuid import uuid4
+
+    from app.llm.latency import LatencyCallback, LatencyRecorder
+
+    recorder = LatencyRecorder()
+    callback = LatencyCallback("router", recorder)
+    ok_run, failed_run = uuid4(), uuid4()
+    callback.on_chat_model_start({}, [], run_id=ok_run)
+    callback.on_llm_end(None, run_id=ok_run)
+    callback.on_chat_model_start({}, [], run_id=failed_run)
+    callback.on_llm_error(RuntimeError("boom"), run_id=failed_run)
+
+    stats = recorder.stats()["router"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["p95_ms"] >= 0
+
+
+def test_get_chat_model_sends_output_schema_as_format(monkeypatch):
+    from app.schemas.router import RouterOutput
+
+    ollama_client.clear_model_cache()
+    structured = ollama_client.get_chat_model("router", output_schema=RouterOutput)
+    assert structured.format == RouterOutput.model_json_schema()
+    assert ollama_client.get_chat_model("router").format is None
+
+    monkeypatch.setattr(ollama_client.settings, "llm_structured_output", False)
+    assert ollama_client.get_chat_model("router", output_schema=RouterOutput).format is None
+    ollama_client.clear_model_cache()
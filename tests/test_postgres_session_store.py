@@ -0,0 +1,88 @@
+"""Tests for the PostgreSQL-backed session store."""
+
+import zlib
+from datetime import datetime
+
+import psycopg2
+
+from app.session import postgres_store
+from app.session.postgres_store import PostgresSessionStore, decode_state, encode_state
+
+
+def test_encode_decode_round_trip_keeps_int_keys_and_datetimes():
+    state = {
+        "last_intent": "QUIZ",
+        "quiz_state": {"answer_key": {1: "A", 2: "C"}, "retry_attempt_ids": {2: 9001}},
+        "last_db_context": {
+            "plans": [{"plan_id": 7, "created_at": datetime(2025, 1, 2, 3, 4)}],
+            "plan_items": {7: [{"item_id": 1, "status": "pending"}]},
+        },
+        "plan_draft": None,
+    }
+
+    serde_type, blob = encode_state(state)
+
+    assert serde_type == "msgpack"
+    assert isinstance(blob, bytes)
+    assert decode_state(serde_type, blob) == state
+
+
+def test_decode_uses_the_stored_serde_type():
+    assert decode_state("json", zlib.compress(b'{"last_intent": "PLAN"}')) == {"last_intent": "PLAN"}
+
+
+def test_store_reads_and_writes_through_repository(monkeypatch):
+    rows: dict[int, tuple[str, bytes]] = {}
+    monkeypatch.setattr(postgres_store.psycopg_repo, "create_session", lambda: 42)
+    monkeypatch.setattr(postgres_store.psycopg_repo, "load_session_state", lambda sid, _ttl: rows.get(sid))
+    monkeypatch.setattr(
+        postgres_store.psycopg_repo,
+        "save_session_state",
+        lambda sid, serde_type, blob, _ttl: rows.__setitem__(sid, (serde_type, blob)),
+    )
+    monkeypatch.setattr(postgres_store.psycopg_repo, "delete_session_state", lambda sid: rows.pop(sid, None))
+
+    store = PostgresSessionStore(ttl_seconds=60)
+    session_id = store.create_session()
+    assert store.get(session_id) is None
+
+    store.put(session_id, {"quiz_state": {"answer_key": {1: "B"}}})
+    assert store.get(session_id) == {"quiz_state": {"answer_key": {1: "B"}}}
+
+    store.delete(session_id)
+    assert store.get(session_id) is None
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["writes"] == 1
+
+
+def test_put_purges_expired_rows_periodically(monkeypatch):
+    now = {"t": 0.0}
+    purges = {"count": 0}
+
+    def _purge():
+        purges["count"] += 1
+        if purges["count"] == 2:
+            raise psycopg2.OperationalError("connection lost")
+        return 3
+
+    saved = []
+    monkeypatch.setattr(postgres_store.psycopg_repo, "save_session_state", lambda *args: saved.append(args))
+    monkeypatch.setattr(postgres_store.psycopg_repo, "purge_expired_session_states", _purge)
+
+    store = PostgresSessionStore(ttl_seconds=600, clock=lambda: now["t"])
+    store.put(1, {"last_intent": "PLAN"})
+    assert purges["count"] == 0
+    assert saved[0][3] == 600
+
+    now["t"] = 301.0
+    store.put(1, {"last_intent": "QUIZ"})
+    store.put(1, {"last_intent": "QUIZ"})
+    assert purges["count"] == 1
+
+    now["t"] = 700.0
+    store.put(2, {"last_intent": "REVIEW"})  # a failed purge does not fail the write
+    assert purges["count"] == 2
+    assert len(saved) == 4
+    assert store.stats()["purged"] == 3
@@ -1,5 +1,7 @@
 """Tests for quiz answer-key recovery retries."""
 
+import asyncio
+
 import app.agents.quiz_agent as quiz_agent
 
 
@@ -14,16 +16,22 @@ def test_quiz_generation_appends_answer_key_when_initial_output_has_none(monkeyp
         "Answer key: 1:A, 2:B",
     ]
 
-    monkeypatch.setattr(quiz_agent, "get_chat_model", lambda: object())
-    monkeypatch.setattr(quiz_agent, "invoke_llm", lambda prompt, llm=None: responses.pop(0))
+    monkeypatch.setattr(quiz_agent, "get_chat_model", lambda *_, **__: object())
+
+    async def _fake_async_invoke_llm(prompt, llm=None, cache=True):
+        return responses.pop(0)
+
+    monkeypatch.setattr(quiz_agent, "async_invoke_llm", _fake_async_invoke_llm)
 
-    result = quiz_agent.quiz_node(
-        {
-            "user_input": "Quiz me on Python",
-            "db_context": {},
-            "rag_context": "",
-            "quiz_state": None,
-        }
+    result = asyncio.run(
+        quiz_agent.quiz_node(
+            {
+                "user_input": "Quiz me on Python",
+                "db_context": {},
+                "rag_context": "",
+                "quiz_state": None,
+            }
+        )
     )
 
     assert result["quiz_state"]["answer_key"] == {1: "A", 2: "B"}
@@ -50,21 +58,23 @@ def test_quiz_generation_regenerates_when_answer_key_count_stays_mismatched(monk
     ]
     prompts: list[str] = []
 
-    monkeypatch.setattr(quiz_agent, "get_chat_model", lambda: object())
+    monkeypatch.setattr(quiz_agent, "get_chat_model", lambda *_, **__: object())
 
-    def _fake_invoke(prompt, llm=None):
+    async def _fake_async_invoke_llm(prompt, llm=None, cache=True):
         prompts.append(prompt)
         return responses.pop(0)
 
-    monkeypatch.setattr(quiz_agent, "invoke_llm", _fake_invoke)
+    monkeypatch.setattr(quiz_agent, "async_invoke_llm", _fake_async_invoke_llm)
 
-    result = quiz_agent.quiz_node(
-        {
-            "user_input": "Quiz me on LangGraph",
-            "db_context": {},
-            "rag_context": "",
-            "quiz_state": None,
-        }
+    result = asyncio.run(
+        quiz_agent.quiz_node(
+            {
+                "user_input": "Quiz me on LangGraph",
+                "db_context": {},
+                "rag_context": "",
+                "quiz_state": None,
+            }
+        )
     )
 
     assert result["quiz_state"]["answer_key"] == {1: "B", 2: "C"}
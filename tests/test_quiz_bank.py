@@ -0,0 +1,174 @@
+"""Tests for the pre-generated quiz bank."""
+
+import asyncio
+
+from app.agents import db_agent, quiz_agent
+from app.quiz_bank import bank, worker
+from app.schemas.quiz import QuizOutput
+from app.tools.db_tools import execute_tool
+
+_QUIZ = {
+    "questions": [
+        {"question": f"Question {n}?", "options": ["w", "x", "y", "z"], "answer": "B"}
+        for n in (1, 2, 3)
+    ]
+}
+
+
+class _BankRepo:
+    def __init__(self, wrong_questions=None, available=0):
+        self.wrong_questions = wrong_questions or []
+        self.available = available
+        self.added: list[tuple[int, dict]] = []
+        self.taken_counts: list[int | None] = []
+
+    def upsert_topic(self, name, tags=None):
+        return {"LangGraph": 7}.get(name, 9)
+
+    def get_wrong_questions(self, topic_id):
+        return self.wrong_questions
+
+    def take_bank_quiz(self, topic_id, max_age_seconds, question_count=None):
+        self.taken_counts.append(question_count)
+        if question_count not in (None, len(_QUIZ["questions"])):
+            return None
+        return {"quiz_id": 1, "quiz": _QUIZ, "age_seconds": 120.0}
+
+    def get_weak_topics(self, limit=5):
+        return [{"topic_id": 3, "name": "Python", "avg_score": 0.2}]
+
+    def purge_bank_quizzes(self, max_age_seconds):
+        return None
+
+    def count_bank_quizzes(self, topic_id, max_age_seconds):
+        return self.available
+
+    def add_bank_quiz(self, topic_id, quiz):
+        self.added.append((topic_id, quiz))
+        return len(self.added)
+
+
+def test_quiz_pre_fetch_serves_bank_quiz_and_counts_hit(monkeypatch):
+    monkeypatch.setattr(bank.settings, "quiz_bank_enabled", True)
+    hits_before = bank.quiz_bank_stats.hits
+    db_context: dict = {}
+
+    result = execute_tool("quiz_pre_fetch", {"topic_name": "LangGraph"}, db_context, repo=_BankRepo())
+
+    assert result["ok"] is True
+    assert db_context["bank_quiz"] == _QUIZ
+    assert bank.quiz_bank_stats.hits == hits_before + 1
+    assert bank.quiz_bank_stats.snapshot()["served_age_seconds_max"] >= 120.0
+
+
+def test_quiz_pre_fetch_skips_bank_when_wrong_questions_must_be_retried(monkeypatch):
+    monkeypatch.setattr(bank.settings, "quiz_bank_enabled", True)
+    misses_before = bank.quiz_bank_stats.misses["wrong_questions"]
+    db_context: dict = {}
+    repo = _BankRepo(wrong_questions=[{"attempt_id": 1, "question": "Old?"}])
+
+    execute_tool("quiz_pre_fetch", {"topic_name": "LangGraph"}, db_context, repo=repo)
+
+    assert db_context["bank_quiz"] is None
+    assert bank.quiz_bank_stats.misses["wrong_questions"] == misses_before + 1
+
+
+def test_quiz_pre_fetch_only_serves_bank_quizzes_matching_the_request(monkeypatch):
+    monkeypatch.setattr(bank.settings, "quiz_bank_enabled", True)
+    captured = {}
+
+    def _execute(tool, args, db_context):
+        captured.update(args)
+        return execute_tool(tool, args, db_context, repo=repo)
+
+    monkeypatch.setattr(db_agent, "execute_tool", _execute)
+    repo = _BankRepo()
+    misses_before = dict(bank.quiz_bank_stats.misses)
+
+    state = {"user_input": "Quiz me on LangGraph with 10 questions"}
+    result = db_agent._handle_quiz_pre_fetch(state, {})
+    assert captured == {"topic_name": "LangGraph", "question_count": 10}
+    assert result["db_context"]["bank_quiz"] is None
+
+    result = db_agent._handle_quiz_pre_fetch({"user_input": "Quiz me on LangGraph, 3 questions"}, {})
+    assert result["db_context"]["bank_quiz"] == _QUIZ
+
+    captured.clear()
+    result = db_agent._handle_quiz_pre_fetch({"user_input": "Quiz me on LangGraph true/false"}, {})
+    assert captured["custom_format"] is True
+    assert result["db_context"]["bank_quiz"] is None
+
+    assert repo.taken_counts == [10, 3]
+    misses = bank.quiz_bank_stats.misses
+    assert misses["question_count"] == misses_before.get("question_count", 0) + 1
+    assert misses["format"] == misses_before.get("format", 0) + 1
+
+
+def test_demand_is_capped_and_decays_on_refill(monkeypatch):
+    monkeypatch.setattr(bank, "MAX_DEMAND_TOPICS", 3)
+    stats = bank.QuizBankStats()
+    for _ in range(4):
+        stats.record_demand(1, "SQL")
+    stats.record_demand(2, "Python")
+    stats.record_demand(2, "Python")
+    for topic_id in range(3, 10):
+        stats.record_demand(topic_id, f"topic {topic_id}")
+
+    assert len(stats.demand) == 3
+    assert stats.top_demand(2) == [(1, "SQL"), (2, "Python")]
+
+    stats.record_refill(0.0, generated=0, rejected=0)
+    assert dict(stats.demand) == {(1, "SQL"): 2, (2, "Python"): 1}
+    stats.record_refill(0.0, generated=0, rejected=0)
+    assert dict(stats.demand) == {(1, "SQL"): 1}
+
+
+def test_quiz_node_serves_bank_quiz_without_llm(monkeypatch):
+    async def _fail(*_args, **_kwargs):
+        raise AssertionError("LLM must not be called for a bank hit")
+
+    monkeypatch.setattr(quiz_agent, "async_invoke_llm", _fail)
+    state = {
+        "user_input": "Quiz me on LangGraph",
+        "db_context": {"quiz_topic_id": 7, "quiz_topic_name": "LangGraph", "bank_quiz": _QUIZ},
+        "rag_context": "",
+        "quiz_state": None,
+    }
+
+    result = asyncio.run(quiz_agent.quiz_node(state))
+
+    assert result["quiz_state"]["answer_key"] == {1: "B", 2: "B", 3: "B"}
+    assert result["quiz_state"]["topic_id"] == 7
+    assert "bank_quiz" not in result["db_context"]
+    assert result["user_response"].startswith("1. Question 1?\nA) w")
+
+
+def test_refill_tops_up_demand_weak_and_kb_topics(monkeypatch, tmp_path):
+    (tmp_path / "langgraph.md").write_text("# LangGraph\n\n## Core Idea\n", encoding="utf-8")
+    monkeypatch.setattr(worker.settings, "kb_dir", str(tmp_path))
+    monkeypatch.setattr(worker.settings, "quiz_bank_target_per_topic", 2)
+    monkeypatch.setattr(worker.settings, "quiz_bank_max_topics", 5)
+
+    async def _fake_generate(topic_name):
+        return QuizOutput.model_validate(_QUIZ)
+
+    monkeypatch.setattr(worker, "generate_bank_quiz", _fake_generate)
+    repo = _BankRepo(available=1)
+
+    generated = asyncio.run(worker.QuizBankWorker().refill_once(repo=repo))
+
+    topic_ids = {topic_id for topic_id, _quiz in repo.added}
+    assert {3, 7} <= topic_ids
+    assert generated == len(repo.added) == len(topic_ids)
+
+
+def test_validate_bank_quiz_rejects_short_or_duplicate_options():
+    assert bank.validate_bank_quiz(QuizOutput.model_validate(_QUIZ))
+    short = {"questions": _QUIZ["questions"][:2]}
+    assert not bank.validate_bank_quiz(QuizOutput.model_validate(short))
+    duplicate = {
+        "questions": [
+            {"question": "Q?", "options": ["a", "a", "b", "c"], "answer": "A"},
+        ] * 3
+    }
+    assert not bank.validate_bank_quiz(QuizOutput.model_validate(duplicate))
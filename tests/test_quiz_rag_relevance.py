@@ -1,5 +1,6 @@
 """Tests for agentic KB relevance gating in quiz generation."""
 
+import asyncio
 from types import SimpleNamespace
 
 import app.agents.quiz_agent as quiz_agent
@@ -18,7 +19,7 @@ class DummyLLM:
         return SimpleNamespace(content=self.quiz_text)
 
 
-def _run_quiz_with_relevance(monkeypatch, relevance: str, rag_context: str):
+def _run_quiz_with_relevance(monkeypatch, relevance: str, rag_context: str, similarity=None):
     quiz_text = (
         "1. What is Rails?\n"
         "A) A gem\n"
@@ -29,23 +30,23 @@ def _run_quiz_with_relevance(monkeypatch, relevance: str, rag_context: str):
     )
     dummy = DummyLLM(relevance=relevance, quiz_text=quiz_text)
 
-    def _fake_get_chat_model():
+    def _fake_get_chat_model(profile="default", **_kwargs):
         return dummy
 
     monkeypatch.setattr(quiz_agent, "get_chat_model", _fake_get_chat_model)
-    monkeypatch.setattr(
-        quiz_agent,
-        "invoke_llm",
-        lambda prompt, llm=None: dummy.invoke(prompt).content,
-    )
+    async def _fake_async_invoke_llm(prompt, llm=None, cache=True):
+        return dummy.invoke(prompt).content
+
+    monkeypatch.setattr(quiz_agent, "async_invoke_llm", _fake_async_invoke_llm)
 
     state = {
         "user_input": "Ruby on Rails",
         "db_context": {},
         "rag_context": rag_context,
+        "rag_similarity": similarity,
         "quiz_state": None,
     }
-    result = quiz_agent.quiz_node(state)
+    result = asyncio.run(quiz_agent.quiz_node(state))
     return result, dummy
 
 
@@ -62,3 +63,35 @@ def test_quiz_keeps_rag_context_when_relevant(monkeypatch):
     _, dummy = _run_quiz_with_relevance(monkeypatch, "YES", rag_context)
     generation_prompt = dummy.prompts[-1]
     assert rag_context in generation_prompt
+
+
+def _relevance_prompts(dummy):
+    return [prompt for prompt in dummy.prompts if "relevance judge" in prompt]
+
+
+def test_quiz_keeps_rag_context_above_similarity_threshold_without_llm(monkeypatch):
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_threshold", 0.5)
+    rag_context = "An MVC web framework written in Ruby."
+    _, dummy = _run_quiz_with_relevance(monkeypatch, "NO", rag_context, similarity=0.8)
+    assert _relevance_prompts(dummy) == []
+    assert rag_context in dummy.prompts[-1]
+
+
+def test_quiz_drops_low_similarity_context_without_llm(monkeypatch):
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_threshold", 0.5)
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_borderline", 0.4)
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_llm_check", True)
+    rag_context = "Unrelated KB content about Kubernetes."
+    _, dummy = _run_quiz_with_relevance(monkeypatch, "YES", rag_context, similarity=0.2)
+    assert _relevance_prompts(dummy) == []
+    assert rag_context not in dummy.prompts[-1]
+
+
+def test_quiz_asks_llm_for_borderline_similarity_when_opted_in(monkeypatch):
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_threshold", 0.5)
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_borderline", 0.4)
+    monkeypatch.setattr(quiz_agent.settings, "rag_relevance_llm_check", True)
+    rag_context = "An MVC web framework written in Ruby."
+    _, dummy = _run_quiz_with_relevance(monkeypatch, "YES", rag_context, similarity=0.45)
+    assert len(_relevance_prompts(dummy)) == 1
+    assert rag_context in dummy.prompts[-1]
@@ -1,5 +1,7 @@
 """Tests for quiz scoring and save payload behavior."""
 
+import asyncio
+
 import app.agents.quiz_agent as quiz_agent
 
 
@@ -10,7 +12,7 @@ def test_quiz_node_returns_error_when_answer_key_missing():
         "db_context": {},
     }
 
-    result = quiz_agent.quiz_node(state)
+    result = asyncio.run(quiz_agent.quiz_node(state))
 
     assert "I couldn't find an answer key" in result["user_response"]
     assert result["quiz_next_action"] == "format_response"
@@ -35,7 +37,7 @@ def test_quiz_node_scoring_builds_quiz_save_and_routes_to_db():
         "db_context": {},
     }
 
-    result = quiz_agent.quiz_node(state)
+    result = asyncio.run(quiz_agent.quiz_node(state))
     output = result["user_response"]
     quiz_save = result["db_context"]["quiz_save"]
 
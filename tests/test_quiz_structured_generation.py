@@ -0,0 +1,76 @@
+"""Tests for single-call structured quiz generation."""
+
+import asyncio
+import json
+
+from app.agents import quiz_agent
+from app.schemas.quiz import QuizOutput
+
+
+def _run_quiz(monkeypatch, responses: list[str], user_input: str = "Quiz me on Python") -> tuple[dict, list[str], list]:
+    prompts: list[str] = []
+    schemas: list = []
+
+    def _fake_get_chat_model(*_args, output_schema=None, **_kwargs):
+        schemas.append(output_schema)
+        return object()
+
+    monkeypatch.setattr(quiz_agent, "get_chat_model", _fake_get_chat_model)
+
+    async def _fake_async_invoke_llm(prompt, llm=None, cache=True):
+        prompts.append(prompt)
+        return responses.pop(0)
+
+    monkeypatch.setattr(quiz_agent, "async_invoke_llm", _fake_async_invoke_llm)
+    result = asyncio.run(
+        quiz_agent.quiz_node(
+            {"user_input": user_input, "db_context": {}, "rag_context": "", "quiz_state": None}
+        )
+    )
+    return result, prompts, schemas
+
+
+def test_structured_quiz_renders_text_and_answer_key_in_one_call(monkeypatch):
+    payload = {
+        "questions": [
+            {"question": "What is a list?", "options": ["A) Mutable", "Immutable", "A set", "A map"], "answer": "A"},
+            {"question": "What is a tuple?", "options": ["Mutable", "Immutable", "A set", "A map"], "answer": "B"},
+        ]
+    }
+
+    result, prompts, schemas = _run_quiz(monkeypatch, [json.dumps(payload)])
+    assert schemas[0] is QuizOutput
+
+    assert len(prompts) == 1
+    assert '"questions"' in prompts[0]
+    quiz_state = result["quiz_state"]
+    assert quiz_state["answer_key"] == {1: "A", 2: "B"}
+    assert quiz_state["question_count"] == 2
+    assert result["user_response"].startswith("1. What is a list?\nA) Mutable\nB) Immutable")
+    assert "2. What is a tuple?" in result["user_response"]
+
+
+def test_invalid_structured_quiz_regenerates_as_text(monkeypatch):
+    invalid = json.dumps({"questions": [{"question": "Q?", "options": ["x", "y"], "answer": "A"}]})
+    regenerated = "1. Q?\nA) a\nB) b\nC) c\nD) d\n\nAnswer key: 1:C"
+
+    result, prompts, _ = _run_quiz(monkeypatch, [invalid, regenerated])
+
+    assert len(prompts) == 2
+    assert "Regenerate the quiz as multiple-choice questions only." in prompts[1]
+    assert result["quiz_state"]["answer_key"] == {1: "C"}
+    assert "Answer key" not in result["user_response"]
+
+
+def test_custom_format_requests_use_the_free_text_prompt(monkeypatch):
+    text = "1. Explain the GIL.\n2. True or false: lists are immutable.\nAnswer key: 1:A, 2:B"
+
+    result, prompts, schemas = _run_quiz(
+        monkeypatch, [text], user_input="Interview me on Python, open-ended questions"
+    )
+
+    assert all(schema is None for schema in schemas)
+    assert len(prompts) == 1
+    assert '"questions"' not in prompts[0]
+    assert prompts[0].startswith(quiz_agent.QUIZ_GENERATE_SYSTEM_PROMPT)
+    assert result["quiz_state"]["answer_key"] == {1: "A", 2: "B"}
@@ -0,0 +1,51 @@
+"""Tests for retrieval with query/chunk similarity scores."""
+
+from types import SimpleNamespace
+
+import chromadb
+import pytest
+
+from app.rag import retriever
+from app.rag.retriever import search_with_similarity
+
+
+class _FakeCollection:
+    def __init__(self, results):
+        self.results = results
+        self.include = None
+
+    def query(self, query_embeddings, n_results, include):
+        self.include = include
+        return self.results
+
+
+_EMBEDDINGS = SimpleNamespace(embed_query=lambda _query: [1.0, 0.0])
+
+
+def test_search_with_similarity_reuses_candidate_embeddings():
+    collection = _FakeCollection(
+        {
+            "documents": [["exact match", "orthogonal"]],
+            "metadatas": [[{"source": "kb/a.md"}, None]],
+            "embeddings": [[[2.0, 0.0], [0.0, 1.0]]],
+        }
+    )
+
+    docs, similarity = search_with_similarity("query", collection=collection, embeddings=_EMBEDDINGS)
+
+    assert "embeddings" in collection.include
+    assert docs[0].page_content == "exact match"
+    assert docs[0].metadata == {"source": "kb/a.md"}
+    assert similarity == pytest.approx(1.0)
+
+
+def test_search_with_similarity_handles_empty_collection():
+    collection = _FakeCollection({"documents": [[]], "metadatas": [[]], "embeddings": [[]]})
+    assert search_with_similarity("query", collection=collection, embeddings=_EMBEDDINGS) == ([], None)
+
+
+def test_missing_collection_returns_no_context_without_creating_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(retriever.settings, "chroma_persist_dir", str(tmp_path))
+
+    assert search_with_similarity("query", embeddings=_EMBEDDINGS) == ([], None)
+    assert chromadb.PersistentClient(path=str(tmp_path)).list_collections() == []
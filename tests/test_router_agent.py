@@ -1,21 +1,37 @@
 """Tests for router agent normalization and fallbacks."""
 
+import asyncio
 from types import SimpleNamespace
 
 from app.agents import router_agent
 from app.schemas.router import RouterOutput
 
 
+async def _fake_async_invoke_llm(*_args, **_kwargs):
+    return "{}"
+
+
+def _parse_returning(parsed: RouterOutput):
+    async def _parse(*_args, **_kwargs):
+        return parsed
+
+    return _parse
+
+
+async def _parse_failing(*_args, **_kwargs):
+    raise ValueError("bad")
+
+
 def _stub_llm(monkeypatch):
-    monkeypatch.setattr(router_agent, "get_chat_model", lambda: SimpleNamespace())
-    monkeypatch.setattr(router_agent, "invoke_llm", lambda *_args, **_kwargs: "{}")
+    monkeypatch.setattr(router_agent, "get_chat_model", lambda *_, **__: SimpleNamespace())
+    monkeypatch.setattr(router_agent, "async_invoke_llm", _fake_async_invoke_llm)
 
 
 def test_router_falls_back_to_defaults_when_parse_fails(monkeypatch):
     _stub_llm(monkeypatch)
-    monkeypatch.setattr(router_agent, "parse_with_retry", lambda *_args, **_kwargs: (_ for _ in ()).throw(ValueError("bad")))
+    monkeypatch.setattr(router_agent, "async_parse_with_retry", _parse_failing)
 
-    result = router_agent.router_node({"user_input": "??"})
+    result = asyncio.run(router_agent.router_node({"user_input": "??"}))
 
     assert result["intent"] == "EXPLAIN"
     assert result["needs_rag"] is False
@@ -28,8 +44,8 @@ def test_router_latest_forces_web_and_disables_rag(monkeypatch):
     _stub_llm(monkeypatch)
     monkeypatch.setattr(
         router_agent,
-        "parse_with_retry",
-        lambda *_args, **_kwargs: RouterOutput(
+        "async_parse_with_retry",
+        _parse_returning(RouterOutput(
             intent="LATEST",
             sub_intent=None,
             needs_rag=True,
@@ -37,10 +53,10 @@ def test_router_latest_forces_web_and_disables_rag(monkeypatch):
             needs_db=False,
             plan_title=None,
             item_title=None,
-        ),
+        )),
     )
 
-    result = router_agent.router_node({"user_input": "latest langchain updates"})
+    result = asyncio.run(router_agent.router_node({"user_input": "latest langchain updates"}))
 
     assert result["intent"] == "LATEST"
     assert result["needs_web"] is True
@@ -52,8 +68,8 @@ def test_router_quiz_forces_db_true(monkeypatch):
     _stub_llm(monkeypatch)
     monkeypatch.setattr(
         router_agent,
-        "parse_with_retry",
-        lambda *_args, **_kwargs: RouterOutput(
+        "async_parse_with_retry",
+        _parse_returning(RouterOutput(
             intent="QUIZ",
             sub_intent=None,
             needs_rag=False,
@@ -61,10 +77,10 @@ def test_router_quiz_forces_db_true(monkeypatch):
             needs_db=False,
             plan_title=None,
             item_title=None,
-        ),
+        )),
     )
 
-    result = router_agent.router_node({"user_input": "quiz me on python"})
+    result = asyncio.run(router_agent.router_node({"user_input": "quiz me on python"}))
     assert result["needs_db"] is True
 
 
@@ -82,12 +98,12 @@ def test_router_review_and_log_progress_force_db_true(monkeypatch):
             item_title=None,
         )
 
-    monkeypatch.setattr(router_agent, "parse_with_retry", lambda *_args, **_kwargs: _parsed("REVIEW"))
-    review_result = router_agent.router_node({"user_input": "list my plans"})
+    monkeypatch.setattr(router_agent, "async_parse_with_retry", _parse_returning(_parsed("REVIEW")))
+    review_result = asyncio.run(router_agent.router_node({"user_input": "list my plans"}))
     assert review_result["needs_db"] is True
 
-    monkeypatch.setattr(router_agent, "parse_with_retry", lambda *_args, **_kwargs: _parsed("LOG_PROGRESS"))
-    progress_result = router_agent.router_node({"user_input": "I finished topic X"})
+    monkeypatch.setattr(router_agent, "async_parse_with_retry", _parse_returning(_parsed("LOG_PROGRESS")))
+    progress_result = asyncio.run(router_agent.router_node({"user_input": "I finished topic X"}))
     assert progress_result["needs_db"] is True
 
 
@@ -95,8 +111,8 @@ def test_router_copies_plan_and_item_titles_to_db_context(monkeypatch):
     _stub_llm(monkeypatch)
     monkeypatch.setattr(
         router_agent,
-        "parse_with_retry",
-        lambda *_args, **_kwargs: RouterOutput(
+        "async_parse_with_retry",
+        _parse_returning(RouterOutput(
             intent="LOG_PROGRESS",
             sub_intent=None,
             needs_rag=False,
@@ -104,10 +120,10 @@ def test_router_copies_plan_and_item_titles_to_db_context(monkeypatch):
             needs_db=True,
             plan_title="React Plan",
             item_title="Hooks",
-        ),
+        )),
     )
 
-    result = router_agent.router_node({"user_input": "I started Hooks", "db_context": {}})
+    result = asyncio.run(router_agent.router_node({"user_input": "I started Hooks", "db_context": {}}))
 
     assert result["db_context"]["requested_plan_title"] == "React Plan"
     assert result["db_context"]["requested_item_title"] == "Hooks"
@@ -0,0 +1,67 @@
+"""Tests for the bounded in-memory session store."""
+
+from app.session.store import InMemorySessionStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _store(clock=None, **overrides):
+    options = {"max_entries": 10, "ttl_seconds": 60, "max_bytes": 1_000_000}
+    options.update(overrides)
+    return InMemorySessionStore(clock=clock or _Clock(), **options)
+
+
+def test_get_returns_copy_so_callers_cannot_mutate_stored_state():
+    store = _store()
+    store.put(1, {"last_db_context": {"plans": []}})
+
+    state = store.get(1)
+    state["last_db_context"]["plans"].append({"plan_id": 1})
+
+    assert store.get(1)["last_db_context"]["plans"] == []
+    assert store.stats()["hits"] == 2
+
+
+def test_put_evicts_least_recently_used_when_entry_limit_reached():
+    store = _store(max_entries=2)
+    store.put(1, {"last_intent": "QUIZ"})
+    store.put(2, {"last_intent": "PLAN"})
+    store.get(1)
+    store.put(3, {"last_intent": "REVIEW"})
+
+    assert store.get(2) is None
+    assert store.get(1) is not None
+    assert store.get(3) is not None
+    assert store.stats()["evictions"]["lru"] == 1
+
+
+def test_idle_sessions_expire_after_ttl():
+    clock = _Clock()
+    store = _store(clock=clock, ttl_seconds=30)
+    store.put(1, {"quiz_state": {"answer_key": {1: "A"}}})
+
+    clock.now = 31
+
+    assert store.get(1) is None
+    stats = store.stats()
+    assert stats["evictions"]["ttl"] == 1
+    assert stats["entries"] == 0
+    assert stats["bytes"] == 0
+
+
+def test_byte_budget_evicts_oldest_but_keeps_latest_write():
+    store = _store(max_bytes=300)
+    store.put(1, {"quiz_state": {"quiz_text": "x" * 200}})
+    store.put(2, {"quiz_state": {"quiz_text": "y" * 200}})
+
+    assert store.get(1) is None
+    assert store.get(2)["quiz_state"]["quiz_text"] == "y" * 200
+    stats = store.stats()
+    assert stats["evictions"]["bytes"] == 1
+    assert 0 < stats["bytes"] <= 300
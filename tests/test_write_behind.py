@@ -0,0 +1,113 @@
+"""Tests for the write-behind outbox used for quiz result persistence."""
+
+import asyncio
+
+from app.agents import db_agent
+from app.tools.write_behind import WriteBehindQueue, WriteBehindWorker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_drain_runs_jobs_in_order_and_retries_with_backoff(tmp_path):
+    clock = _Clock()
+    queue = WriteBehindQueue(str(tmp_path / "wb" / "outbox.sqlite"), base_backoff_seconds=2.0, clock=clock)
+    queue.enqueue("quiz_post_save", {"topic_id": 1})
+    queue.enqueue("quiz_post_save", {"topic_id": 2})
+    calls = []
+    failures = {"left": 1}
+
+    def _execute(tool, args):
+        calls.append(args["topic_id"])
+        if args["topic_id"] == 2 and failures["left"]:
+            failures["left"] -= 1
+            return {"ok": False, "error": {"code": "db_error", "message": "down"}}
+        return {"ok": True, "data": {}}
+
+    assert queue.drain_once(_execute) == 2
+    assert calls == [1, 2]
+    assert queue.pending() == 1
+    # Backoff: the failed job is not due again until 2s later.
+    assert queue.drain_once(_execute) == 0
+    clock.now += 2.0
+    assert queue.drain_once(_execute) == 1
+    assert calls == [1, 2, 2]
+    stats = queue.stats()
+    assert (stats["pending"], stats["completed"], stats["retried"], stats["dead"]) == (0, 2, 1, 0)
+
+
+def test_permanent_errors_and_exhausted_retries_are_dead_lettered(tmp_path):
+    clock = _Clock()
+    queue = WriteBehindQueue(str(tmp_path / "outbox.sqlite"), max_attempts=2, base_backoff_seconds=0.0, clock=clock)
+    queue.enqueue("quiz_post_save", {"topic_id": "bad"})
+    queue.enqueue("quiz_post_save", {"topic_id": 3})
+
+    def _execute(tool, args):
+        if args["topic_id"] == "bad":
+            return {"ok": False, "error": {"code": "validation_error", "message": "invalid"}}
+        raise RuntimeError("connection reset")
+
+    queue.drain_once(_execute)
+    queue.drain_once(_execute)
+    stats = queue.stats()
+    assert stats["pending"] == 0
+    assert stats["dead_total"] == 2
+
+
+def test_unconfirmed_writes_are_dead_lettered_without_retry(tmp_path):
+    queue = WriteBehindQueue(str(tmp_path / "outbox.sqlite"), base_backoff_seconds=0.0, clock=_Clock())
+    queue.enqueue("quiz_post_save", {"topic_id": 3})
+    unconfirmed = {"ok": False, "error": {"code": "db_write_unconfirmed", "message": "may be applied"}}
+
+    assert queue.drain_once(lambda _tool, _args: unconfirmed) == 1
+    assert queue.drain_once(lambda _tool, _args: unconfirmed) == 0
+    stats = queue.stats()
+    assert (stats["retried"], stats["dead_total"]) == (0, 1)
+
+
+def test_jobs_survive_reopen_and_worker_flushes_on_stop(tmp_path):
+    path = str(tmp_path / "outbox.sqlite")
+    WriteBehindQueue(path).enqueue("quiz_post_save", {"topic_id": 5})
+    reopened = WriteBehindQueue(path)
+    done = []
+
+    def _execute(tool, args):
+        done.append((tool, args))
+        return {"ok": True, "data": {}}
+
+    worker = WriteBehindWorker(lambda: reopened, _execute)
+    asyncio.run(worker.stop())
+    assert done == [("quiz_post_save", {"topic_id": 5})]
+    assert reopened.pending() == 0
+
+
+def test_quiz_post_save_enqueues_and_returns_feedback_without_db(tmp_path, monkeypatch):
+    queue = WriteBehindQueue(str(tmp_path / "outbox.sqlite"))
+    monkeypatch.setattr(db_agent.settings, "quiz_write_behind", True)
+    monkeypatch.setattr(db_agent, "get_write_behind_queue", lambda: queue)
+
+    def _fail_execute(*_args, **_kwargs):
+        raise AssertionError("DB should not be touched in write-behind mode")
+
+    monkeypatch.setattr(db_agent, "execute_tool", _fail_execute)
+    state = {
+        "intent": "QUIZ",
+        "quiz_feedback": "Score: 2/3",
+        "db_context": {"quiz_save": {"topic_id": 4, "wrong_answers": [], "correct_retries": [7]}},
+    }
+    result = db_agent.db_agent_node(state)
+
+    assert result["quiz_results_saved"] is True
+    assert result["user_response"].startswith("Score: 2/3")
+    assert "quiz_save" not in result["db_context"]
+    assert queue.pending() == 1
+    seen = []
+    queue.drain_once(lambda tool, args: seen.append(args) or {"ok": True, "data": {}})
+    save_key = seen[0].pop("save_key")
+    assert len(save_key) == 32
+    assert seen == [{"topic_id": 4, "wrong_answers": [], "correct_retries": [7]}]